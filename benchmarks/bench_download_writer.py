@@ -0,0 +1,154 @@
+"""下载写入阶段基准测试
+
+在本地 HTTP 服务上同时下载多个文件, 对比不同 ``chunk_size`` 下的三种写入方式:
+
+- ``aiofiles``: 旧实现, 每个网络分块都通过 aiofiles 写入 (每次一次线程切换)
+- ``per-chunk``: ``write_buffer_size=0``, 每个分块立即提交给 I/O 线程
+- ``buffered``: 默认缓冲区, 攒够后用 ``os.pwritev`` 一次写入
+
+用法::
+
+    uv run python benchmarks/bench_download_writer.py
+    uv run python benchmarks/bench_download_writer.py --size-mb 64 --concurrency 24 --chunk-size 16384 65536
+"""
+
+import argparse
+import asyncio
+import contextlib
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import aiofiles
+import httpx
+
+from parsehub.utils.downloader import download
+from parsehub.utils.writer import DEFAULT_BUFFER_SIZE
+
+
+def _serve(size: int, ports: "multiprocessing.Queue[int]") -> None:
+    payload = memoryview(os.urandom(size))
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: object) -> None:
+            return
+
+        def do_GET(self) -> None:
+            start, end = 0, size - 1
+            if header := self.headers.get("Range"):
+                start_text, end_text = header.removeprefix("bytes=").split("-", 1)
+                start, end = int(start_text), min(int(end_text or end), end)
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            else:
+                self.send_response(200)
+            self.send_header("Content-Length", str(end - start + 1))
+            self.end_headers()
+            with contextlib.suppress(ConnectionError):
+                for offset in range(start, end + 1, 1024 * 1024):
+                    self.wfile.write(payload[offset : min(offset + 1024 * 1024, end + 1)])
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    ports.put(server.server_port)
+    server.serve_forever()
+
+
+@contextlib.contextmanager
+def payload_server(size: int) -> Iterator[str]:
+    """在独立进程中运行服务端, 避免与下载端争抢 GIL"""
+    ports: multiprocessing.Queue[int] = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve, args=(size, ports), daemon=True)
+    process.start()
+    try:
+        yield f"http://127.0.0.1:{ports.get(timeout=30)}/file.bin"
+    finally:
+        process.terminate()
+        process.join()
+
+
+async def legacy_aiofiles(url: str, path: Path, chunk_size: int, connections: int) -> None:
+    async with httpx.AsyncClient() as client, client.stream("GET", url) as response:
+        async with aiofiles.open(path, "wb") as f:
+            async for chunk in response.aiter_bytes(chunk_size=chunk_size):
+                await f.write(chunk)
+
+
+def segment_downloader(buffer_size: int) -> Callable[[str, Path, int, int], Awaitable[None]]:
+    async def run(url: str, path: Path, chunk_size: int, connections: int) -> None:
+        await download(
+            url,
+            path,
+            chunk_size=chunk_size,
+            connections=connections,
+            min_split_size=1024 * 1024,
+            write_buffer_size=buffer_size,
+        )
+
+    return run
+
+
+async def measure(
+    func: Callable[[str, Path, int, int], Awaitable[None]],
+    url: str,
+    *,
+    concurrency: int,
+    chunk_size: int,
+    connections: int,
+    repeat: int,
+) -> float:
+    timings = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            await asyncio.gather(
+                *(func(url, Path(tmp) / f"{i}.bin", chunk_size, connections) for i in range(concurrency))
+            )
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=32, help="单个文件大小 (MB)")
+    parser.add_argument("--concurrency", type=int, default=12, help="同时下载的文件数")
+    parser.add_argument("--connections", type=int, default=1, help="每个文件的连接数 (aiofiles 模式固定为 1)")
+    parser.add_argument("--chunk-size", type=int, nargs="+", default=[16 * 1024, 64 * 1024, 256 * 1024])
+    parser.add_argument("--buffer-size", type=int, default=DEFAULT_BUFFER_SIZE)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    modes = {
+        "aiofiles": legacy_aiofiles,
+        "per-chunk": segment_downloader(0),
+        "buffered": segment_downloader(args.buffer_size),
+    }
+    total_mb = args.size_mb * args.concurrency
+
+    with payload_server(args.size_mb * 1024 * 1024) as url:
+        print(f"{args.concurrency} x {args.size_mb} MB, connections={args.connections}")
+        print(f"{'chunk KB':>10}" + "".join(f"{name + ' MB/s':>18}" for name in modes))
+        for chunk_size in args.chunk_size:
+            row = f"{chunk_size // 1024:>10}"
+            for func in modes.values():
+                seconds = await measure(
+                    func,
+                    url,
+                    concurrency=args.concurrency,
+                    chunk_size=chunk_size,
+                    connections=args.connections,
+                    repeat=args.repeat,
+                )
+                row += f"{total_mb / seconds:>18.0f}"
+            print(row)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,164 @@
+"""内嵌状态 JSON 提取基准测试
+
+对比旧实现 (BeautifulSoup 构建 DOM / 逐字符括号匹配 / 正则 + html.unescape) 与 ``utils.embedded_state``。
+
+用法::
+
+    uv run python benchmarks/bench_embedded_state.py
+    # 使用保存的真实页面
+    uv run python benchmarks/bench_embedded_state.py --page xhs=note.html --page kuaishou=video.html
+"""
+
+import argparse
+import html
+import json
+import re
+import statistics
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from urllib.parse import quote, unquote
+
+from bs4 import BeautifulSoup
+
+from parsehub.utils.embedded_state import extract_embedded_json, find_script_text
+
+MARKERS = {
+    "xhs": "window.__INITIAL_STATE__=",
+    "kuaishou": "window.__APOLLO_STATE__",
+    "tiktok": "__UNIVERSAL_DATA_FOR_REHYDRATION__",
+    "pipix": "RENDER_DATA",
+}
+
+
+def _filler(size: int) -> str:
+    block = '<div class="feed-item"><a href="/explore/abc">相关推荐 related note</a></div>\n'
+    scripts = "<script>(function(){var t=Date.now();window.__t=t;})()</script>\n"
+    return (block * 20 + scripts) * max(1, size // (len(block) * 20 + len(scripts)))
+
+
+def _state(items: int) -> dict[str, Any]:
+    return {
+        "note": {
+            "firstNoteId": "n0",
+            "noteDetailMap": {
+                f"n{i}": {"note": {"title": f"标题 {i}", "desc": "正文 " * 20, "imageList": [{"w": 1080}] * 9}}
+                for i in range(items)
+            },
+        }
+    }
+
+
+def synthetic_pages() -> dict[str, bytes]:
+    state = json.dumps(_state(400), ensure_ascii=False)
+    js_state = state.replace('"w": 1080', '"w": 1080, "x": undefined')
+    head = "<html><head>" + _filler(150_000)
+    tail = "</head><body>" + _filler(400_000) + "</body></html>"
+    return {
+        "xhs": f"{head}<script>window.__INITIAL_STATE__={js_state}</script>{tail}".encode(),
+        "kuaishou": f"{head}<script>window.__APOLLO_STATE__ = {state};(function(){{}})()</script>{tail}".encode(),
+        "tiktok": (
+            f'{head}<script id="__UNIVERSAL_DATA_FOR_REHYDRATION__" type="application/json">'
+            f'{{"__DEFAULT_SCOPE__": {state}}}</script>{tail}'
+        ).encode(),
+        "pipix": f'{head}<script id="RENDER_DATA" type="application/json">{quote(state)}</script>{tail}'.encode(),
+    }
+
+
+def legacy_xhs(page: bytes) -> Any:
+    soup = BeautifulSoup(page.decode(), "lxml")
+    script = next(s for s in soup.find_all("script") if s.text.lstrip().startswith("window.__INITIAL_STATE__")).text
+    return json.loads(re.sub(r"\bundefined\b", "null", script.replace("window.__INITIAL_STATE__=", "")))
+
+
+def legacy_kuaishou(page: bytes) -> Any:
+    text = page.decode()
+    marker = "window.__APOLLO_STATE__"
+    start = text.find("{", text.find(marker) + len(marker))
+    depth = 0
+    in_string = escape = False
+    quote_char = ""
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == quote_char:
+                in_string = False
+            continue
+        if char in ("'", '"'):
+            in_string, quote_char = True, char
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return json.loads(text[start : i + 1])
+    return None
+
+
+def legacy_tiktok(page: bytes) -> Any:
+    pattern = r'<script[^>]+id=["\']__UNIVERSAL_DATA_FOR_REHYDRATION__["\'][^>]*>(?P<json>.*?)</script>'
+    match = re.search(pattern, page.decode(), re.DOTALL)
+    return json.loads(html.unescape(match.group("json")).strip()) if match else None
+
+
+def legacy_pipix(page: bytes) -> Any:
+    script = BeautifulSoup(page.decode(), "lxml").find("script", {"id": "RENDER_DATA"})
+    return json.loads(unquote(script.text)) if script else None
+
+
+def current(name: str) -> Callable[[bytes], Any]:
+    if name == "pipix":
+        return lambda page: json.loads(unquote(find_script_text(page, MARKERS[name]) or ""))
+    if name == "tiktok":
+        return lambda page: json.loads(find_script_text(page, MARKERS[name]) or "")
+    return lambda page: extract_embedded_json(page, MARKERS[name])
+
+
+LEGACY: dict[str, Callable[[bytes], Any]] = {
+    "xhs": legacy_xhs,
+    "kuaishou": legacy_kuaishou,
+    "tiktok": legacy_tiktok,
+    "pipix": legacy_pipix,
+}
+
+
+def measure(func: Callable[[bytes], Any], page: bytes, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(page)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page", action="append", default=[], help="<provider>=<保存的 HTML 路径>")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    pages = synthetic_pages()
+    for item in args.page:
+        name, _, path = item.partition("=")
+        if name not in MARKERS:
+            parser.error(f"未知 provider: {name}, 可选: {', '.join(MARKERS)}")
+        pages[name] = Path(path).read_bytes()
+
+    print(f"{'provider':<10}{'page KB':>10}{'legacy ms':>12}{'current ms':>12}{'speedup':>10}")
+    for name, page in pages.items():
+        new = current(name)
+        if LEGACY[name](page) != new(page):
+            raise SystemExit(f"{name}: 新旧实现结果不一致")
+        legacy_ms = measure(LEGACY[name], page, args.repeat)
+        current_ms = measure(new, page, args.repeat)
+        speedup = legacy_ms / current_ms
+        print(f"{name:<10}{len(page) / 1024:>10.0f}{legacy_ms:>12.2f}{current_ms:>12.2f}{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""CPU 密集任务卸载基准测试
+
+并发解析多篇公众号长文 (``WX._parse_html``: BeautifulSoup + markdownify + 转纯文本), 用 ``LoopLagMonitor``
+测量事件循环被阻塞的时间, 对比直接执行与线程池 / 进程池卸载。
+
+用法::
+
+    uv run python benchmarks/bench_offload.py
+    uv run python benchmarks/bench_offload.py --articles 8 --sections 200
+    # 使用保存的真实公众号页面
+    uv run python benchmarks/bench_offload.py --page article.html
+"""
+
+import argparse
+import asyncio
+import time
+from pathlib import Path
+from typing import Literal
+
+from parsehub.config import GlobalConfig
+from parsehub.provider_api.weixin import WX
+from parsehub.utils.offload import LoopLagMonitor, run_cpu_bound, shutdown_executors
+
+SECTION = """
+<section><h2><strong>第 {i} 节</strong></h2>
+<p><span>正文段落, 包含<strong>加粗文字</strong>、<em>斜体</em>和<a href="https://mp.weixin.qq.com/s/{i}">链接</a>。</span></p>
+<p><img class="rich_pages" data-src="https://mmbiz.qpic.cn/{i}.jpg"></p>
+<blockquote><p>引用一段话<br>第二行 &amp; 特殊字符</p></blockquote>
+<ul><li><p>列表项一 <code>inline_code()</code></p></li><li><p>列表项二</p></li></ul>
+</section>
+"""
+
+
+def synthetic_page(sections: int) -> str:
+    body = "".join(SECTION.format(i=i) for i in range(sections))
+    return f'<h1 class="rich_media_title">标题</h1><div class="rich_media_content">{body}</div>'
+
+
+async def run(mode: Literal["thread", "process"] | None, page: str, articles: int) -> tuple[float, float, float]:
+    GlobalConfig.cpu_offload = mode
+    # 预热线程池 / 进程池, 不计入子进程启动时间
+    await run_cpu_bound(WX._parse_html, page, size=len(page))
+    start = time.perf_counter()
+    async with LoopLagMonitor() as monitor:
+        await asyncio.gather(*(run_cpu_bound(WX._parse_html, page, size=len(page)) for _ in range(articles)))
+    return time.perf_counter() - start, monitor.max_lag, monitor.blocked
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page", help="保存的公众号 HTML 路径")
+    parser.add_argument("--sections", type=int, default=150, help="合成文章的小节数")
+    parser.add_argument("--articles", type=int, default=4, help="并发解析的文章数")
+    args = parser.parse_args()
+
+    page = Path(args.page).read_text(encoding="utf-8") if args.page else synthetic_page(args.sections)
+    print(f"page {len(page) / 1024:.0f} KB x {args.articles}, threshold {GlobalConfig.cpu_offload_threshold}")
+    print(f"{'mode':<10}{'wall ms':>10}{'max lag ms':>12}{'blocked ms':>12}")
+    modes: list[Literal["thread", "process"] | None] = [None, "thread", "process"]
+    try:
+        for mode in modes:
+            wall, max_lag, blocked = await run(mode, page, args.articles)
+            print(f"{mode or 'inline':<10}{wall * 1000:>10.0f}{max_lag * 1000:>12.1f}{blocked * 1000:>12.0f}")
+    finally:
+        shutdown_executors()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+"""markdown 转纯文本基准测试
+
+对比旧实现 (markdown 生成 HTML, 再用 BeautifulSoup 构建 DOM 提取文字) 与 ``utils.plaintext.markdown_to_text``。
+默认使用合成的公众号长文, 经 ``WXConverter`` 转为 markdown 后测试。
+
+用法::
+
+    uv run python benchmarks/bench_plaintext.py
+    # 使用保存的真实公众号页面
+    uv run python benchmarks/bench_plaintext.py --page article.html
+"""
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from bs4 import BeautifulSoup, Tag
+from markdown import markdown
+
+from parsehub.provider_api.weixin import WXConverter
+from parsehub.utils.plaintext import markdown_to_text
+
+SECTION = """
+<section><h2><strong>第 {i} 节 · 小标题</strong></h2>
+<p><span style="color: rgb(62, 62, 62);">正文段落, 包含<strong>加粗文字</strong>、<em>斜体</em>和
+<a href="https://mp.weixin.qq.com/s/{i}">文内链接</a>。5 * 3 = 15, snake_case 与 C:\\path 也会出现。</span></p>
+<p><img class="rich_pages" data-src="https://mmbiz.qpic.cn/{i}.jpg" src="https://mmbiz.qpic.cn/{i}.jpg"></p>
+<blockquote><p>引用一段话<br>第二行 &amp; 特殊字符 &lt;tag&gt;</p></blockquote>
+<ul><li><p>列表项一 <code>inline_code()</code></p></li><li><p>列表项二 <strong>重点</strong></p></li></ul>
+<ol><li>步骤一</li><li>步骤二</li></ol>
+<pre><code>def main():
+    print("hello")</code></pre>
+<p>——  全角标点，中文内容。emoji 😀 #话题#</p></section>
+"""
+
+
+def synthetic_article(sections: int) -> str:
+    body = "".join(SECTION.format(i=i) for i in range(sections))
+    return f'<div class="rich_media_content">{body}</div>'
+
+
+def to_markdown(page: str) -> str:
+    soup = BeautifulSoup(page, "lxml")
+    content = soup.find("div", {"class": "rich_media_content"})
+    if not isinstance(content, Tag):
+        raise SystemExit("页面中没有 rich_media_content")
+    return str(WXConverter(heading_style="ATX").convert(str(content)))
+
+
+def legacy(markdown_content: str) -> str:
+    return "".join(BeautifulSoup(markdown(markdown_content), "lxml").find_all(string=True))
+
+
+def measure(func: Callable[[str], str], markdown_content: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(markdown_content)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page", action="append", default=[], help="保存的公众号 HTML 路径")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    articles = {f"synthetic-{n}": to_markdown(synthetic_article(n)) for n in (10, 100, 400)}
+    for path in args.page:
+        articles[Path(path).name] = to_markdown(Path(path).read_text(encoding="utf-8"))
+
+    print(f"{'article':<20}{'md KB':>8}{'legacy ms':>12}{'current ms':>12}{'speedup':>10}")
+    for name, markdown_content in articles.items():
+        if legacy(markdown_content) != markdown_to_text(markdown_content):
+            raise SystemExit(f"{name}: 新旧实现结果不一致")
+        legacy_ms = measure(legacy, markdown_content, args.repeat)
+        current_ms = measure(markdown_to_text, markdown_content, args.repeat)
+        speedup = legacy_ms / current_ms
+        print(
+            f"{name:<20}{len(markdown_content.encode()) / 1024:>8.0f}"
+            f"{legacy_ms:>12.2f}{current_ms:>12.2f}{speedup:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
+import weakref
 from pathlib import Path
+from types import TracebackType
+from typing import Literal, Self
 
 from loguru import logger
 
@@ -6,15 +9,48 @@ from .errors import ParseError, UnknownPlatform
 from .parsers.base import BaseParser
 from .types import Platform
 from .types.callback import ProgressCallback
-from .types.result import AnyParseResult, DownloadResult
-from .utils.helpers import SecretCookie, run_sync
+from .types.result import AnyParseResult, DownloadResult, DownloadVariant
+from .utils.adaptive import Connections
+from .utils.helpers import LoopRunner, SecretCookie, run_sync
+from .utils.loop_clients import aclose_loop_clients
 
 logger.disable(__name__)
 
 
 class ParseHub:
-    def __init__(self) -> None:
+    def __init__(self, *, runner: LoopRunner | None = None) -> None:
+        """
+        :param runner: 同步 API 使用的后台事件循环, 为空时创建一个由当前实例持有的事件循环,
+            可传入同一个 LoopRunner 让多个实例共用
+        """
         self.parsers: list[type[BaseParser]] = BaseParser.get_registry()
+        self.runner = runner or LoopRunner()
+        self._owns_runner = runner is None
+        if self._owns_runner:
+            weakref.finalize(self, self.runner.close)
+
+    def close(self) -> None:
+        """关闭当前实例持有的后台事件循环, 外部传入的 runner 需由调用方自行关闭"""
+        if self._owns_runner:
+            self.runner.close()
+
+    async def aclose(self) -> None:
+        """关闭当前事件循环中平台接口和下载共用的 httpx 客户端
+
+        后台事件循环 (``close``) 停止时会自动关闭; 在自行管理的事件循环中使用异步 API 时, 可在循环结束前调用
+        """
+        await aclose_loop_clients()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
 
     async def parse(self, url: str, *, proxy: str | None = None, cookie: str | dict | None = None) -> AnyParseResult:
         """解析
@@ -42,7 +78,9 @@ class ParseHub:
         :param cookie: cookie
         :return: AnyParseResult
         """
-        return run_sync(self.parse(url, proxy=proxy, cookie=cookie))
+        result = run_sync(self.parse(url, proxy=proxy, cookie=cookie), self.runner)
+        result.runner = self.runner
+        return result
 
     async def download(
         self,
@@ -56,7 +94,8 @@ class ParseHub:
         parse_proxy: str | None = None,
         parse_cookie: str | dict | None = None,
         save_metadata: bool = False,
-        connections: int = 4,
+        connections: Connections = 4,
+        variant: DownloadVariant = "original",
     ) -> DownloadResult:
         """下载
         :param url: 分享文案 / 分享链接
@@ -68,7 +107,9 @@ class ParseHub:
         :param parse_proxy: 解析代理
         :param parse_cookie: 解析 cookie
         :param save_metadata: 保存解析结果为 metadata.json, 默认为 False
-        :param connections: 多线程下载连接数, 默认为 4
+        :param connections: 多线程下载连接数, 默认为 4; "auto" 时根据文件大小和吞吐自动调整
+        :param variant: 下载内容: "original" 原文件, "thumb" 仅缩略图,
+            "preview" 先返回缩略图, 原文件在后台下载 (await result.originals)
         :return: DownloadResult
 
         Note:
@@ -91,6 +132,7 @@ class ParseHub:
             proxy=proxy,
             save_metadata=save_metadata,
             connections=connections,
+            variant=variant,
         )
 
     def download_sync(
@@ -104,7 +146,8 @@ class ParseHub:
         parse_proxy: str | None = None,
         parse_cookie: str | dict | None = None,
         save_metadata: bool = False,
-        connections: int = 4,
+        connections: Connections = 4,
+        variant: Literal["original", "thumb"] = "original",
     ) -> DownloadResult:
         """
         同步下载
@@ -117,7 +160,8 @@ class ParseHub:
         :param parse_proxy: 解析代理
         :param parse_cookie: 解析 cookie
         :param save_metadata: 保存解析结果为 metadata.json, 默认为 False
-        :param connections: 多线程下载连接数, 默认为 4
+        :param connections: 多线程下载连接数, 默认为 4; "auto" 时根据文件大小和吞吐自动调整
+        :param variant: "original" 下载原文件, "thumb" 仅下载缩略图
         :return: DownloadResult
 
         Note:
@@ -143,7 +187,9 @@ class ParseHub:
                 parse_cookie=parse_cookie,
                 save_metadata=save_metadata,
                 connections=connections,
-            )
+                variant=variant,
+            ),
+            self.runner,
         )
 
     async def get_raw_url(self, url: str, proxy: str | None = None, clean_all: bool = True) -> str:
@@ -116,7 +116,12 @@ def _build_parser(prog: str) -> argparse.ArgumentParser:
     )
     download_parser.add_argument("-q", "--quiet", action="store_true", help="不输出状态和进度信息")
     download_parser.add_argument("--no-progress", action="store_true", help="不显示下载进度")
-    download_parser.add_argument("--connections", type=int, default=4, help="单文件分片下载连接数，设为 1 可禁用分片")
+    download_parser.add_argument(
+        "--connections",
+        type=_parse_connections,
+        default=4,
+        help="单文件分片下载连接数，设为 1 可禁用分片，auto 为根据吞吐自动调整",
+    )
     _add_json_options(download_parser)
     download_parser.set_defaults(func=_cmd_download)
 
@@ -395,6 +400,15 @@ def _platform_id(platform: Any) -> str | None:
     return None
 
 
+def _parse_connections(value: str) -> int | str:
+    if value.lower() == "auto":
+        return "auto"
+    try:
+        return int(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"无效的连接数: {value}") from e
+
+
 def _validate_platform(platform: str) -> str:
     platform = platform.lower()
     platform_ids = set(_supported_platform_ids())
@@ -1,14 +1,37 @@
 import sys
 from pathlib import Path
+from typing import Literal
 
 from pydantic import BaseModel, ConfigDict
 
+from ..utils.media_store import MediaStore
+
 
 class _GlobalConfig(BaseModel):
-    model_config = ConfigDict(validate_assignment=True)
+    model_config = ConfigDict(validate_assignment=True, arbitrary_types_allowed=True)
 
     default_save_dir: Path = Path(sys.argv[0]).parent / "downloads"
     """默认下载目录"""
+    progress_interval: float = 0.5
+    """下载进度回调的最小间隔 (秒), 0 表示每次更新都回调"""
+    download_max_connections: int = 32
+    """所有下载同时使用的最大连接数"""
+    download_max_connections_per_host: int = 8
+    """同一 host 同时使用的最大连接数"""
+    download_rate_limit: int | None = None
+    """所有下载的总限速 (字节/秒), 为空时不限速"""
+    proxy_rate_limits: dict[str, int] = {}
+    """按代理地址限速 (字节/秒), 使用该代理的下载共用限额"""
+    media_store: MediaStore | None = None
+    """本地媒体仓库, 设置后 ParseResult.download 相同媒体只下载一次"""
+    tiktok_hedge_delay: float | None = None
+    """TikTok 对冲解析: feed 接口超过该时间 (秒) 未返回时同时请求 Web 页面 (按 feed 平均耗时调整), 为空时不启用"""
+    cpu_offload: Literal["thread", "process"] | None = "thread"
+    """HTML 转 markdown 等 CPU 密集任务在线程池 / 进程池中执行, 为空时直接在事件循环中执行"""
+    cpu_offload_threshold: int = 32 * 1024
+    """输入小于该大小 (字符) 的 CPU 密集任务直接在事件循环中执行"""
+    cpu_offload_workers: int | None = None
+    """CPU 密集任务线程池 / 进程池的大小, 为空时使用 concurrent.futures 的默认值"""
 
 
 GlobalConfig = _GlobalConfig()
@@ -17,6 +17,12 @@ class DownloadError(ParseHubError):
     MSG = __doc__
 
 
+class SinkError(DownloadError):
+    """下载目标写入失败"""
+
+    MSG = __doc__
+
+
 class DeleteError(ParseHubError):
     """删除文件错误"""
 
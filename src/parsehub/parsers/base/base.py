@@ -2,7 +2,7 @@ import importlib
 import pkgutil
 import re
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, ClassVar
 from urllib.parse import parse_qs, urlencode, urlparse
 
 import httpx
@@ -10,7 +10,10 @@ import httpx
 from ... import parsers
 from ...types import AnyParseResult, ParseError
 from ...types.platform import Platform
+from ...utils.cache import TTLCache
 from ...utils.helpers import UA, SecretCookie, match_url
+from ...utils.instrumentation import HTTPX_EVENT_HOOKS, count, host_of, span
+from ...utils.loop_clients import proxy_key
 
 
 class BaseParser(ABC):
@@ -29,6 +32,11 @@ class BaseParser(ABC):
     """解析完成后需要清理的参数, 在解析完成前会保留这些参数, 优先级高于 __reserved_parameters__"""
     __redirect_keywords__: list[str] = []
     """如果链接包含其中之一, 则遵循重定向规则"""
+    __max_redirects__: int = 10
+    """短链接最多跟随的重定向次数"""
+
+    _redirect_cache: ClassVar[TTLCache[tuple[str, str, str], str]] = TTLCache(maxsize=2048, ttl=3600)
+    """短链接 -> 重定向后链接, 所有解析器共享"""
 
     def __init__(self, *, proxy: str | None = None, cookie: SecretCookie = SecretCookie()):
         self.proxy = proxy
@@ -63,11 +71,15 @@ class BaseParser(ABC):
         :param url: 分享文案 / 分享链接
         :return: 解析结果
         """
-        raw_url = await self.get_raw_url(url, clean_all=False)
-        result = await self._do_parse(raw_url)
-        result.platform = self.__platform__
-        raw_url_clean = self._clean_params(raw_url, self.__after_clean_parameters__)
-        result.raw_url = raw_url_clean
+        platform = self.__platform__.id if self.__platform__ else ""
+        with span("parse_stage", platform=platform, stage="raw_url"):
+            raw_url = await self.get_raw_url(url, clean_all=False)
+        with span("parse_stage", platform=platform, stage="parse"):
+            result = await self._do_parse(raw_url)
+        with span("parse_stage", platform=platform, stage="clean"):
+            result.platform = self.__platform__
+            raw_url_clean = self._clean_params(raw_url, self.__after_clean_parameters__)
+            result.raw_url = raw_url_clean
         return result
 
     @abstractmethod
@@ -112,18 +124,7 @@ class BaseParser(ABC):
             url = f"https://{url}"
 
         if any(x in url for x in self.__redirect_keywords__):
-            async with httpx.AsyncClient(proxy=self.proxy, timeout=30) as client:
-                try:
-                    r = await client.get(
-                        url,
-                        follow_redirects=True,
-                        headers={"User-Agent": UA} if headers is None else headers,
-                    )
-                except (httpx.ReadTimeout, httpx.ConnectTimeout) as e:
-                    raise ParseError("获取原始链接超时") from e
-                except Exception as e:
-                    raise ParseError("获取原始链接失败") from e
-                url = str(r.url)
+            url = await self._resolve_redirect(url, {"User-Agent": UA} if headers is None else headers)
 
         parsed_url = urlparse(url)
         query_params = parse_qs(parsed_url.query)
@@ -138,6 +139,40 @@ class BaseParser(ABC):
         new_query = urlencode(query_params, doseq=True)
         return parsed_url._replace(query=new_query).geturl()
 
+    async def _resolve_redirect(self, url: str, headers: dict) -> str:
+        """逐跳跟随 Location 重定向, 只读取响应头, 不下载落地页正文; 结果按 (链接, UA, 代理) 缓存"""
+        # 不同代理 (地区) 的短链接可能跳转到不同页面
+        cache_key = (url, headers.get("User-Agent", ""), proxy_key(self.proxy))
+        if cached := self._redirect_cache.get(cache_key):
+            return cached
+
+        with span("redirect", host=host_of(url)):
+            request = await self._follow_redirects(url, headers)
+
+        resolved = str(request.url)
+        self._redirect_cache.set(cache_key, resolved)
+        return resolved
+
+    async def _follow_redirects(self, url: str, headers: dict) -> httpx.Request:
+        """返回最后一跳的请求"""
+        async with httpx.AsyncClient(proxy=self.proxy, timeout=30, event_hooks=HTTPX_EVENT_HOOKS) as client:
+            try:
+                request = client.build_request("GET", url, headers=headers)
+                for hops in range(self.__max_redirects__ + 1):
+                    response = await client.send(request, stream=True)
+                    await response.aclose()
+                    if response.next_request is None:
+                        count("redirect_hops", hops, host=host_of(url))
+                        break
+                    request = response.next_request
+                else:
+                    raise httpx.TooManyRedirects("Exceeded maximum allowed redirects.", request=request)
+            except (httpx.ReadTimeout, httpx.ConnectTimeout) as e:
+                raise ParseError("获取原始链接超时") from e
+            except Exception as e:
+                raise ParseError("获取原始链接失败") from e
+        return request
+
     @staticmethod
     def _clean_params(url: str, params: list[str]) -> str:
         """清除链接中的指定参数"""
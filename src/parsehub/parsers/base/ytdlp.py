@@ -1,6 +1,7 @@
 import asyncio
 import json
 import os
+import shutil
 import signal
 import sys
 import tempfile
@@ -9,19 +10,26 @@ from collections.abc import Iterator
 from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, cast
+from typing import Any, ClassVar, cast
 
 from loguru import logger
 
 from ...types import (
     DownloadError,
     DownloadResult,
+    DownloadVariant,
     ParseError,
     ProgressCallback,
+    SinkFactory,
     VideoFile,
     VideoParseResult,
     VideoRef,
 )
+from ...utils.adaptive import Connections
+from ...utils.downloader import download_media, memory_data
+from ...utils.progress import ProgressAggregator
+from ...utils.ratelimit import effective_rate
+from ...utils.scheduler import DownloadPriority
 from .base import BaseParser
 
 # 用一个不会和 yt-dlp 普通日志冲突的前缀标记进度行，stdout/stderr 读取时只解析这类行。
@@ -39,6 +47,9 @@ PROGRESS_TEMPLATE = (
     "%(progress.fragment_count)s"
 )
 
+# 可以直接用 HTTP 下载的协议, 其余 (DASH / HLS 等) 需要 yt-dlp 处理分片和合并
+DIRECT_PROTOCOLS = {"http", "https"}
+
 # 子进程失败时只保留尾部日志用于错误信息，避免长输出占用过多内存或污染异常文本。
 TAIL_LINES = 100
 TAIL_CHARS = 16_000
@@ -284,46 +295,71 @@ async def _read_ytdlp_stream(
     stream: asyncio.StreamReader,
     tail: deque[str],
     progress: MonotonicDownloadProgress | None,
-    callback: ProgressCallback | None,
-    callback_args: tuple,
-    callback_kwargs: dict,
+    aggregator: ProgressAggregator | None,
 ) -> None:
     while line := await stream.readline():
         text = _decode_output(line)
         progress_data = _parse_progress_line(text)
-        if progress_data and progress and callback:
+        if progress_data and progress and aggregator:
             count = progress.update(progress_data)
             if count is not None:
-                await callback(count, 100, "bytes", *callback_args, **callback_kwargs)
+                aggregator.update(count, 100)
             continue
         tail.append(text)
 
 
+def _direct_format(info_json: dict[str, Any]) -> dict[str, Any] | None:
+    """yt-dlp 选中的格式为单个可直接下载的 HTTP 文件时返回该格式, 否则返回 None
+
+    需要合并音视频 (requested_formats)、分片协议、自定义分块下载 (downloader_options)
+    或携带 Cookie 的格式仍交给 yt-dlp 子进程处理。
+    """
+    if info_json.get("requested_formats") or info_json.get("fragments"):
+        return None
+    if not info_json.get("url") or info_json.get("protocol") not in DIRECT_PROTOCOLS:
+        return None
+    if info_json.get("downloader_options") or info_json.get("cookies"):
+        return None
+    return info_json
+
+
+def _ytdlp_connections(connections: Connections) -> int:
+    # yt-dlp 的 -N 是分片 (fragment) 并发数, 无法在下载过程中调整, 自适应模式使用默认值
+    return 4 if connections == "auto" else connections
+
+
 async def _run_ytdlp_download(
     info_json: dict[str, Any],
     cli_args: list[str],
     *,
     outtmpl: str,
-    connections: int,
+    connections: Connections,
     proxy: str | None = None,
     headers: dict | None = None,
     callback: ProgressCallback | None = None,
     callback_args: tuple = (),
     callback_kwargs: dict | None = None,
+    rate_limit: float | None = None,
 ) -> None:
     callback_kwargs = callback_kwargs or {}
     stdout_tail: deque[str] = deque(maxlen=TAIL_LINES)
     stderr_tail: deque[str] = deque(maxlen=TAIL_LINES)
     progress = MonotonicDownloadProgress(start=0, end=99) if callback else None
+    aggregator = (
+        ProgressAggregator(callback, args=("bytes", *callback_args), kwargs=callback_kwargs) if callback else None
+    )
 
     with _materialize_info_json(info_json) as info_path:
         argv = [*_yt_dlp_base_cmd(), *cli_args]
         if callback:
             argv = [arg for arg in argv if arg not in {"--quiet", "--no-progress"}]
             argv.extend(["--newline", "--progress-template", PROGRESS_TEMPLATE])
-        argv.extend(["--load-info-json", info_path, "-o", outtmpl, "-N", str(connections)])
+        argv.extend(["--load-info-json", info_path, "-o", outtmpl, "-N", str(_ytdlp_connections(connections))])
         if proxy:
             argv.extend(["--proxy", proxy])
+        # yt-dlp 在子进程中下载, 无法共用令牌桶, 按适用限额中的最小值限速
+        if rate := effective_rate(proxy, rate_limit):
+            argv.extend(["--limit-rate", str(int(rate))])
         for key, value in (headers or {}).items():
             argv.extend(["--add-header", f"{key}: {value}"])
 
@@ -337,17 +373,15 @@ async def _run_ytdlp_download(
             await _terminate_process(proc)
             raise RuntimeError("yt-dlp 子进程 stdout/stderr 未正确初始化")
 
-        stdout_task = asyncio.create_task(
-            _read_ytdlp_stream(proc.stdout, stdout_tail, progress, callback, callback_args, callback_kwargs)
-        )
-        stderr_task = asyncio.create_task(
-            _read_ytdlp_stream(proc.stderr, stderr_tail, progress, callback, callback_args, callback_kwargs)
-        )
+        stdout_task = asyncio.create_task(_read_ytdlp_stream(proc.stdout, stdout_tail, progress, aggregator))
+        stderr_task = asyncio.create_task(_read_ytdlp_stream(proc.stderr, stderr_tail, progress, aggregator))
         wait_task = asyncio.create_task(proc.wait())
 
         try:
             returncode = await wait_task
             await asyncio.gather(stdout_task, stderr_task)
+            if aggregator:
+                await aggregator.finish()
         except asyncio.CancelledError:
             await _terminate_process(proc)
             for task in (stdout_task, stderr_task, wait_task):
@@ -360,6 +394,9 @@ async def _run_ytdlp_download(
                 task.cancel()
             await asyncio.gather(stdout_task, stderr_task, wait_task, return_exceptions=True)
             raise
+        finally:
+            if aggregator:
+                aggregator.cancel()
 
     if returncode:
         raise RuntimeError(_ytdlp_error(returncode, stdout_tail, stderr_tail))
@@ -441,6 +478,8 @@ class YtParser(BaseParser, register=False):
         return [
             "--quiet",  # 不输出日志
             "--no-progress",  # 不输出下载进度
+            # 解析时使用和下载时相同的格式选择, info_json 中选中的格式即为下载的格式
+            *self._video_parse_result_type.format_args,
             "--no-playlist",
             "--dump-single-json",
             "--no-download",
@@ -449,6 +488,9 @@ class YtParser(BaseParser, register=False):
 
 
 class YtVideoParseResult(VideoParseResult):
+    format_args: ClassVar[list[str]] = []
+    """yt-dlp 格式选择参数, 解析和下载时都会使用"""
+
     def __init__(
         self,
         dl: "YtVideoInfo",
@@ -465,6 +507,7 @@ class YtVideoParseResult(VideoParseResult):
         return [
             "--quiet",  # 不输出日志
             "--no-progress",  # 不输出下载进度
+            *self.format_args,
         ]
 
     async def _do_download(
@@ -476,12 +519,46 @@ class YtVideoParseResult(VideoParseResult):
         callback_kwargs: dict | None = None,
         proxy: str | None = None,
         headers: dict | None = None,
-        connections: int = 4,
+        connections: Connections = 4,
+        sink: SinkFactory | None = None,
+        rate_limit: float | None = None,
+        variant: DownloadVariant = "original",
     ) -> "DownloadResult":
+        if variant == "thumb":
+            # 缩略图是普通图片, 走通用下载流程
+            return await super()._do_download(
+                output_dir=output_dir,
+                callback=callback,
+                callback_args=callback_args,
+                callback_kwargs=callback_kwargs,
+                proxy=proxy,
+                headers=headers,
+                connections=connections,
+                sink=sink,
+                rate_limit=rate_limit,
+                variant=variant,
+            )
+
         if callback_kwargs is None:
             callback_kwargs = {}
         output_dir_path = Path(output_dir)
 
+        if fmt := _direct_format(self.dl.info_json):
+            return await self._download_direct(
+                fmt,
+                output_dir=output_dir_path,
+                callback=callback,
+                callback_args=callback_args,
+                callback_kwargs=callback_kwargs,
+                proxy=proxy,
+                headers=headers,
+                connections=connections,
+                sink=sink,
+                rate_limit=rate_limit,
+            )
+
+        # yt-dlp 由子进程写入文件, 不使用 sink
+
         cli_args = self.cli_args.copy()
         outtmpl = f"{output_dir_path.joinpath(self.name)}.%(ext)s"
 
@@ -494,6 +571,7 @@ class YtVideoParseResult(VideoParseResult):
             callback=callback,
             callback_args=callback_args,
             callback_kwargs=callback_kwargs,
+            rate_limit=rate_limit,
         )
 
         v = [p for p in output_dir_path.glob(f"{self.name}.*") if p.is_file()]
@@ -514,17 +592,67 @@ class YtVideoParseResult(VideoParseResult):
             output_dir,
         )
 
+    async def _download_direct(
+        self,
+        fmt: dict[str, Any],
+        *,
+        output_dir: Path,
+        callback: ProgressCallback | None,
+        callback_args: tuple,
+        callback_kwargs: dict,
+        proxy: str | None,
+        headers: dict | None,
+        connections: Connections,
+        sink: SinkFactory | None,
+        rate_limit: float | None,
+    ) -> "DownloadResult":
+        """单个 HTTP 格式直接使用 SegmentDownloader 下载, 不启动 yt-dlp 子进程"""
+        progress = None
+        if callback:
+
+            async def progress(current: int, total: int) -> None:
+                await callback(current, total, "bytes", *callback_args, **callback_kwargs)
+
+        save_path = output_dir.joinpath(f"{self.name}.{fmt.get('ext') or 'mp4'}")
+        try:
+            path, media_sink = await download_media(
+                fmt["url"],
+                save_path,
+                sink,
+                headers={**(fmt.get("http_headers") or {}), **(headers or {})},
+                proxy=proxy,
+                progress=progress,
+                connections=connections,
+                priority=DownloadPriority.VIDEO,
+                rate_limit=rate_limit,
+            )
+        except Exception as e:
+            shutil.rmtree(output_dir, ignore_errors=True)
+            raise DownloadError(f"下载失败: {e}") from e
+
+        return DownloadResult(
+            VideoFile(
+                path=path,
+                height=fmt.get("height") or self.dl.height,
+                width=fmt.get("width") or self.dl.width,
+                duration=self.dl.duration,
+                data=memory_data(media_sink),
+            ),
+            output_dir,
+        )
+
     async def _run_download(
         self,
         cli_args: list[str],
         *,
         outtmpl: str,
-        connections: int,
+        connections: Connections,
         proxy: str | None = None,
         headers: dict | None = None,
         callback: ProgressCallback | None = None,
         callback_args: tuple = (),
         callback_kwargs: dict | None = None,
+        rate_limit: float | None = None,
     ) -> None:
         try:
             await _run_ytdlp_download(
@@ -537,6 +665,7 @@ class YtVideoParseResult(VideoParseResult):
                 callback=callback,
                 callback_args=callback_args,
                 callback_kwargs=callback_kwargs,
+                rate_limit=rate_limit,
             )
         except Exception as e:
             raise DownloadError(f"下载失败: {str(e)}") from e
@@ -10,15 +10,18 @@ from loguru import logger
 from ...provider_api.bilibili import BiliAPI, BiliDynamic
 from ...types import (
     DownloadResult,
+    DownloadVariant,
     ImageParseResult,
     ImageRef,
     LivePhotoRef,
     ParseError,
     Platform,
     ProgressCallback,
+    SinkFactory,
     VideoParseResult,
     VideoRef,
 )
+from ...utils.adaptive import Connections
 from ...utils.helpers import UA
 from ..base.base import BaseParser
 from ..base.ytdlp import YtParser, YtVideoParseResult
@@ -168,13 +171,7 @@ class BiliYtParse(YtParser, register=False):
 
 
 class BiliYtVideoParseResult(YtVideoParseResult):
-    @property
-    def cli_args(self) -> list[str]:
-        return [
-            *super().cli_args,
-            "-S",
-            "+codec:h264,filesize~500M",
-        ]
+    format_args = ["-S", "+codec:h264,filesize~500M"]
 
 
 class BiliVideoParseResult(VideoParseResult):
@@ -187,7 +184,10 @@ class BiliVideoParseResult(VideoParseResult):
         callback_kwargs: dict | None = None,
         proxy: str | None = None,
         headers: dict | None = None,
-        connections: int = 4,
+        connections: Connections = 4,
+        sink: SinkFactory | None = None,
+        rate_limit: float | None = None,
+        variant: DownloadVariant = "original",
     ) -> DownloadResult:
         headers = {"referer": "https://www.bilibili.com", "User-Agent": UA}
         return await super()._do_download(
@@ -198,6 +198,9 @@ class BiliVideoParseResult(VideoParseResult):
             proxy=proxy,
             headers=headers,
             connections=connections,
+            sink=sink,
+            rate_limit=rate_limit,
+            variant=variant,
         )
 
 
@@ -6,6 +6,7 @@ from ...provider_api.coolapk import Coolapk
 from ...types import (
     AniRef,
     DownloadResult,
+    DownloadVariant,
     ImageParseResult,
     ImageRef,
     MultimediaParseResult,
@@ -14,7 +15,9 @@ from ...types import (
     Platform,
     ProgressCallback,
     RichTextParseResult,
+    SinkFactory,
 )
+from ...utils.adaptive import Connections
 from ..base.base import BaseParser
 
 
@@ -69,7 +72,10 @@ class CoolapkParseResult(ParseResult):
         callback_kwargs: dict | None = None,
         proxy: str | None = None,
         headers: dict | None = None,
-        connections: int = 4,
+        connections: Connections = 4,
+        sink: SinkFactory | None = None,
+        rate_limit: float | None = None,
+        variant: DownloadVariant = "original",
     ) -> "DownloadResult":
         headers = {
             "Accept": (
@@ -85,6 +91,9 @@ class CoolapkParseResult(ParseResult):
             proxy=proxy,
             headers=headers,
             connections=connections,
+            sink=sink,
+            rate_limit=rate_limit,
+            variant=variant,
         )
 
 
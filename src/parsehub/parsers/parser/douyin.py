@@ -7,6 +7,7 @@ from ... import ProgressCallback
 from ...provider_api.douyin import DouyinMobileCrawler, DouyinMobileDevice, DouyinWebCrawler
 from ...types import (
     DownloadResult,
+    DownloadVariant,
     ImageParseResult,
     ImageRef,
     LivePhotoRef,
@@ -14,9 +15,11 @@ from ...types import (
     ParseError,
     ParseResult,
     Platform,
+    SinkFactory,
     VideoParseResult,
     VideoRef,
 )
+from ...utils.adaptive import Connections
 from ..base.base import BaseParser
 
 
@@ -90,7 +93,10 @@ class DouyinParseResult(ParseResult):
         callback_kwargs: dict | None = None,
         proxy: str | None = None,
         headers: dict | None = None,
-        connections: int = 4,
+        connections: Connections = 4,
+        sink: SinkFactory | None = None,
+        rate_limit: float | None = None,
+        variant: DownloadVariant = "original",
     ) -> "DownloadResult":
         headers = {
             "Referer": "https://www.douyin.com/",
@@ -103,6 +109,9 @@ class DouyinParseResult(ParseResult):
             proxy=proxy,
             headers=headers,
             connections=connections,
+            sink=sink,
+            rate_limit=rate_limit,
+            variant=variant,
         )
 
 
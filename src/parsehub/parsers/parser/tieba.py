@@ -4,6 +4,7 @@ import httpx
 
 from ...provider_api.tieba import TieBa, TieBaError, TieBaPostType, TieBaVideo
 from ...types import AniRef, ImageParseResult, ImageRef, ParseError, Platform, VideoParseResult, VideoRef
+from ...utils.instrumentation import HTTPX_EVENT_HOOKS
 from ..base.base import BaseParser
 
 
@@ -40,7 +41,7 @@ class TieBaParser(BaseParser):
                 images: list[ImageRef | AniRef] = []
                 if isinstance(tb.media, list):
                     for i in tb.media:
-                        async with httpx.AsyncClient(proxy=self.proxy) as cli:
+                        async with httpx.AsyncClient(proxy=self.proxy, event_hooks=HTTPX_EVENT_HOOKS) as cli:
                             try:
                                 r = await cli.head(i.url)
                                 r.raise_for_status()
@@ -4,16 +4,20 @@ from pathlib import Path
 from typing import Any, Self, Union
 
 from ... import ProgressCallback
+from ...config import GlobalConfig
 from ...provider_api.tiktok import TikTokWebCrawler
 from ...types import (
     DownloadResult,
+    DownloadVariant,
     ImageParseResult,
     ImageRef,
     ParseError,
     Platform,
+    SinkFactory,
     VideoParseResult,
     VideoRef,
 )
+from ...utils.adaptive import Connections
 from ..base.base import BaseParser
 
 
@@ -33,7 +37,9 @@ class TikTokParser(BaseParser):
                 return self._build_image_result(result)
 
     async def _fetch_api_result(self, url: str) -> "TikTokApiResult":
-        crawler = TikTokWebCrawler(proxy=self.proxy, cookie=self.cookie.get_value())
+        crawler = TikTokWebCrawler(
+            proxy=self.proxy, cookie=self.cookie.get_value(), hedge_delay=GlobalConfig.tiktok_hedge_delay
+        )
         try:
             response = await crawler.parse(url)
             return TikTokApiResult.parse(response)
@@ -69,7 +75,10 @@ class TikTokVideoParseResult(VideoParseResult):
         callback_kwargs: dict | None = None,
         proxy: str | None = None,
         headers: dict | None = None,
-        connections: int = 4,
+        connections: Connections = 4,
+        sink: SinkFactory | None = None,
+        rate_limit: float | None = None,
+        variant: DownloadVariant = "original",
     ) -> "DownloadResult":
         headers = {
             "Referer": "https://www.tiktok.com/",
@@ -82,6 +91,9 @@ class TikTokVideoParseResult(VideoParseResult):
             proxy=proxy,
             headers=headers,
             connections=connections,
+            sink=sink,
+            rate_limit=rate_limit,
+            variant=variant,
         )
 
 
@@ -14,6 +14,7 @@ from ...types import (
     VideoParseResult,
     VideoRef,
 )
+from ...utils.instrumentation import HTTPX_EVENT_HOOKS
 from ..base import BaseParser
 
 
@@ -67,7 +68,7 @@ class XHSParser(BaseParser):
                 raise ParseError("不支持的类型")
 
     async def get_ext_by_url(self, url: str) -> str:
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
+        async with httpx.AsyncClient(proxy=self.proxy, event_hooks=HTTPX_EVENT_HOOKS) as client:
             try:
                 response = await client.head(url, follow_redirects=True)
             except Exception:
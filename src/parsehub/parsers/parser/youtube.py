@@ -35,12 +35,12 @@ class YtbParse(YtParser):
 
 
 class YtbVideoParseResult(YtVideoParseResult):
+    format_args = ["-S", "+codec:h264,filesize~500M"]
+
     @property
     def cli_args(self) -> list[str]:
         return [
             *super().cli_args,
-            "-S",
-            "+codec:h264,filesize~500M",
             # "--write-subs", # 下载字幕
             # "--write-auto-subs", # 下载自动生成的字幕
             # "--sub-format", "ttml", # 字幕格式
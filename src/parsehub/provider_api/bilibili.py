@@ -12,6 +12,8 @@ from typing import Any, Self, cast
 
 import httpx
 
+from ..utils.instrumentation import HTTPX_EVENT_HOOKS, span
+
 USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36"
 )
@@ -152,7 +154,7 @@ class BiliAPI:
 
     def _get_client(self) -> httpx.AsyncClient:
         if self._client is None or getattr(self._client, "is_closed", False):
-            self._client = httpx.AsyncClient(proxy=self.proxy, headers=self.headers)
+            self._client = httpx.AsyncClient(proxy=self.proxy, headers=self.headers, event_hooks=HTTPX_EVENT_HOOKS)
         return self._client
 
     async def aclose(self):
@@ -522,6 +524,7 @@ class BiliWbiSigner:
         """对 img_key 和 sub_key 进行字符顺序打乱编码"""
         return reduce(lambda s, i: s + orig[i], self.MIXIN_KEY_ENC_TAB, "")[:32]
 
+    @span("sign", cpu=True, platform="bilibili")
     def sign_request_params(self, params: dict, img_key: str, sub_key: str) -> dict:
         """为请求参数进行 wbi 签名"""
         mixin_key = self.get_mixin_key(img_key + sub_key)
@@ -535,7 +538,7 @@ class BiliWbiSigner:
     @staticmethod
     async def fetch_wbi_keys() -> tuple[str, str]:
         """获取最新的 img_key 和 sub_key"""
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(event_hooks=HTTPX_EVENT_HOOKS) as client:
             try:
                 resp = await client.get(
                     "https://api.bilibili.com/x/web-interface/nav",
@@ -2,10 +2,11 @@ from dataclasses import dataclass
 
 import httpx
 from bs4 import BeautifulSoup
-from markdown import markdown
 from markdownify import MarkdownConverter
 
 from ..utils.helpers import UA
+from ..utils.instrumentation import HTTPX_EVENT_HOOKS
+from ..utils.plaintext import markdown_to_text
 
 
 @dataclass
@@ -17,7 +18,7 @@ class Coolapk:
 
     @classmethod
     async def parse(cls, url: str, proxy: str | None = None) -> "Coolapk":
-        async with httpx.AsyncClient(headers={"User-Agent": UA}, proxy=proxy) as client:
+        async with httpx.AsyncClient(headers={"User-Agent": UA}, proxy=proxy, event_hooks=HTTPX_EVENT_HOOKS) as client:
             result = await client.get(url)
         soup = BeautifulSoup(result.text, "lxml")
         # 酷安网页版不加载实况照片
@@ -29,7 +30,7 @@ class Coolapk:
                     raise ValueError("获取内容失败")
                 raise ValueError("获取内容失败, 分享时请保留 shareKey 或 s 参数")
             markdown_content = MarkdownConverter(heading_style="ATX").convert(str(content))
-            text_content = "".join(BeautifulSoup(markdown(markdown_content), "lxml").find_all(string=True))
+            text_content = markdown_to_text(markdown_content)
             imgs = [f"https:{i['src']}" for i in content.find_all("img", {"class": "message-image"})]
             return cls(title, markdown_content, text_content, imgs)
 
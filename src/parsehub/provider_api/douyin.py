@@ -20,6 +20,7 @@ from gmssl import func, sm3
 from SignerPy import get, sign, trace_id
 
 from ..errors import ParseError
+from ..utils.instrumentation import HTTPX_EVENT_HOOKS, span
 
 DEFAULT_USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
@@ -769,7 +770,11 @@ class DouyinWebCrawler:
 
     async def fetch_one_video(self, aweme_id: str) -> dict:
         async with httpx.AsyncClient(
-            headers=self._get_headers(), proxy=self.proxy, timeout=10, cookies=self.cookie
+            headers=self._get_headers(),
+            proxy=self.proxy,
+            timeout=10,
+            cookies=self.cookie,
+            event_hooks=HTTPX_EVENT_HOOKS,
         ) as client:
             params = {
                 "device_platform": "webapp",
@@ -799,7 +804,8 @@ class DouyinWebCrawler:
             }
             for attempt in range(3):
                 try:
-                    a_bogus = ABogus().get_value(params)
+                    with span("sign", cpu=True, platform="douyin"):
+                        a_bogus = ABogus().get_value(params)
                     endpoint = f"{POST_DETAIL}?{urlencode(params)}&a_bogus={quote(a_bogus, safe='')}"
                     response = await client.get(endpoint)
                     response.raise_for_status()
@@ -926,6 +932,7 @@ class DouyinMobileCrawler:
             params["openudid"] = self.device.openudid
         return params
 
+    @span("sign", cpu=True, platform="douyin")
     def _signed_headers(self, params: dict, profile: dict) -> dict[str, str]:
         query = urlencode(params)
         signed = sign(
@@ -1048,7 +1055,9 @@ class DouyinMobileCrawler:
 
     async def register_device(self, client: httpx.AsyncClient | None = None) -> DouyinMobileDevice:
         close_client = client is None
-        client = client or httpx.AsyncClient(proxy=self.proxy, timeout=20, follow_redirects=True)
+        client = client or httpx.AsyncClient(
+            proxy=self.proxy, timeout=20, follow_redirects=True, event_hooks=HTTPX_EVENT_HOOKS
+        )
         try:
             device = await self._request_registered_device(client)
             self.device = device
@@ -1065,7 +1074,9 @@ class DouyinMobileCrawler:
         count: int = MOBILE_DEVICE_POOL_SIZE,
     ) -> list[DouyinMobileDevice]:
         close_client = client is None
-        client = client or httpx.AsyncClient(proxy=self.proxy, timeout=20, follow_redirects=True)
+        client = client or httpx.AsyncClient(
+            proxy=self.proxy, timeout=20, follow_redirects=True, event_hooks=HTTPX_EVENT_HOOKS
+        )
         devices: list[DouyinMobileDevice] = []
         seen: set[tuple[str, str]] = set()
         last_error = "unknown"
@@ -1119,7 +1130,9 @@ class DouyinMobileCrawler:
 
     async def fetch_one_video(self, aweme_id: str) -> dict:
         last_error = "unknown"
-        async with httpx.AsyncClient(proxy=self.proxy, timeout=20, follow_redirects=True) as client:
+        async with httpx.AsyncClient(
+            proxy=self.proxy, timeout=20, follow_redirects=True, event_hooks=HTTPX_EVENT_HOOKS
+        ) as client:
             for _ in range(8):
                 await self._select_device(client)
                 params = self._mobile_query(aweme_id)
@@ -1195,7 +1208,9 @@ class DouyinMobileCrawler:
     async def _resolve_best_play_url(self, video_uri: str) -> dict | None:
         headers = {"User-Agent": PLAY_USER_AGENT, "Referer": "https://www.douyin.com/"}
         best: dict | None = None
-        async with httpx.AsyncClient(proxy=self.proxy, timeout=20, follow_redirects=True) as client:
+        async with httpx.AsyncClient(
+            proxy=self.proxy, timeout=20, follow_redirects=True, event_hooks=HTTPX_EVENT_HOOKS
+        ) as client:
             for ratio in MOBILE_PLAY_RATIOS:
                 api = f"https://aweme.snssdk.com/aweme/v1/play/?video_id={video_uri}&ratio={ratio}&line=0"
                 try:
@@ -4,10 +4,12 @@ import json
 from collections.abc import Iterator
 from dataclasses import dataclass
 from enum import StrEnum
-from typing import Any, cast
+from typing import Any, ClassVar, cast
 
 import httpx
 
+from .meta import MetaSessionManager, cookie_header, is_csrf_failure
+
 
 class InstagramAPIError(RuntimeError):
     """Instagram 接口请求或响应解析失败。"""
@@ -130,6 +132,7 @@ class InstagramAPI:
     GRAPHQL_URL = "https://www.instagram.com/graphql/query"
     INSTAGRAM_URL = "https://www.instagram.com/"
     SHORTCODE_DOC_ID = "27128499623469141"
+    SESSIONS: ClassVar[MetaSessionManager] = MetaSessionManager(INSTAGRAM_URL)
 
     DEFAULT_COOKIES = {
         "sessionid": "",
@@ -185,18 +188,15 @@ class InstagramAPI:
         return media
 
     async def _post_graphql(self, *, doc_id: str, variables: dict[str, Any]) -> dict[str, Any]:
-        async with self._new_client() as client:
-            await self._ensure_csrf_token(client)
-            data = {
-                "variables": json.dumps(variables, separators=(",", ":")),
-                "doc_id": doc_id,
-                "server_timestamps": "true",
-            }
-
-            try:
-                response = await client.post(self.GRAPHQL_URL, data=data, follow_redirects=False)
-            except httpx.HTTPError as exc:
-                raise InstagramAPIError(f"请求 Instagram GraphQL 失败: {exc}") from exc
+        data = {
+            "variables": json.dumps(variables, separators=(",", ":")),
+            "doc_id": doc_id,
+            "server_timestamps": "true",
+        }
+        response = await self._request_graphql(data)
+        if is_csrf_failure(response):
+            # 缓存的会话 Cookie 已失效, 重新获取后重试一次
+            response = await self._request_graphql(data, refresh=True)
 
         if response.status_code != 200:
             raise InstagramAPIError(f"Instagram GraphQL 返回 HTTP {response.status_code}: {response.text[:500]}")
@@ -333,27 +333,32 @@ class InstagramAPI:
             "height": int(candidate.get("height") or 0),
         }
 
-    async def _ensure_csrf_token(self, client: httpx.AsyncClient) -> None:
-        csrf_token = self._get_cookie_value(client, "csrftoken")
-        if not csrf_token:
-            try:
-                await client.get(self.INSTAGRAM_URL, follow_redirects=True)
-            except httpx.HTTPError as exc:
-                raise InstagramAPIError(f"获取 Instagram csrftoken 失败: {exc}") from exc
-            csrf_token = self._get_cookie_value(client, "csrftoken")
+    async def _request_graphql(self, data: dict[str, str], *, refresh: bool = False) -> httpx.Response:
+        headers = self._headers()
+        try:
+            cookies = await self.SESSIONS.cookies(
+                base=self.DEFAULT_COOKIES | self.cookie,
+                proxy=self.proxy,
+                headers=headers,
+                timeout=self.timeout,
+                refresh=refresh,
+            )
+        except httpx.HTTPError as exc:
+            raise InstagramAPIError(f"获取 Instagram csrftoken 失败: {exc}") from exc
 
-        if not csrf_token:
+        if not (csrf_token := cookies.get("csrftoken")):
             raise InstagramAPIError("无法获取 Instagram csrftoken")
-        client.headers["x-csrftoken"] = csrf_token
+        headers |= {"x-csrftoken": csrf_token, "Cookie": cookie_header(cookies)}
 
-    @staticmethod
-    def _get_cookie_value(client: httpx.AsyncClient, name: str) -> str:
-        values = [cookie.value for cookie in client.cookies.jar if cookie.name == name and cookie.value]
-        return values[-1] if values else ""
+        try:
+            return await self.SESSIONS.client(self.proxy).post(
+                self.GRAPHQL_URL, data=data, headers=headers, timeout=self.timeout, follow_redirects=False
+            )
+        except httpx.HTTPError as exc:
+            raise InstagramAPIError(f"请求 Instagram GraphQL 失败: {exc}") from exc
 
-    def _new_client(self) -> httpx.AsyncClient:
-        cookies = self.DEFAULT_COOKIES | self.cookie
-        headers = {
+    def _headers(self) -> dict[str, str]:
+        return {
             "Accept": "*/*",
             "Accept-Encoding": "gzip, deflate",
             "Accept-Language": "en-US,en;q=0.8",
@@ -363,12 +368,6 @@ class InstagramAPI:
             "authority": "www.instagram.com",
             "scheme": "https",
         }
-        return httpx.AsyncClient(
-            cookies=cookies,
-            headers=headers,
-            proxy=self.proxy,
-            timeout=self.timeout,
-        )
 
 
 __all__ = [
@@ -1,4 +1,5 @@
 # mypy: disable-error-code=no-untyped-def
+import asyncio
 import json
 from dataclasses import dataclass
 from typing import Any, Self, cast
@@ -8,7 +9,19 @@ import httpx
 from loguru import logger
 
 from .. import ParseError
+from ..utils.cache import TTLCache
+from ..utils.embedded_state import extract_embedded_json, fetch_until_script
 from ..utils.helpers import UA
+from ..utils.instrumentation import HTTPX_EVENT_HOOKS
+
+APOLLO_STATE_MARKER = "window.__APOLLO_STATE__"
+INIT_STATE_MARKER = "window.INIT_STATE"
+
+HEDGE_DELAY = 0.8
+"""上一个路由超过该时间 (秒) 仍未返回时, 同时尝试下一个路由"""
+
+# host -> 上次成功的 (路由, 请求头方案), 之后优先尝试
+_ROUTE_WINNERS: TTLCache[str, tuple[str, str]] = TTLCache(maxsize=256, ttl=6 * 3600)
 
 
 class KuaiShouAPI:
@@ -111,7 +124,9 @@ class KuaiShouAPI:
         }
         """,
         }
-        async with httpx.AsyncClient(proxy=self.proxy, headers=self.headers, cookies=self.cookie) as client:
+        async with httpx.AsyncClient(
+            proxy=self.proxy, headers=self.headers, cookies=self.cookie, event_hooks=HTTPX_EVENT_HOOKS
+        ) as client:
             response = await client.post(self.api_url, json=body)
             response.raise_for_status()
             raw_data = response.json()
@@ -248,22 +263,36 @@ class KuaishouParser:
             return False
         try:
             payload = json.loads(html_content)
-        except (TypeError, json.JSONDecodeError):
+        except (TypeError, ValueError):
             return False
         return payload.get("result") == 2
 
-    def _candidate_urls(self):
+    def _candidate_routes(self):
+        """(路由名, URL)"""
         if not self.video_id:
-            return [self.real_url]
-        candidates = [self.real_url]
+            return [("origin", self.real_url)]
+        candidates = [("origin", self.real_url)]
         if not self._is_fw_photo_url(self.real_url):
-            candidates.append(f"https://v.m.chenzhongtech.com/fw/photo/{self.video_id}")
-        deduped = []
-        for url in candidates:
-            if url and url not in deduped:
-                deduped.append(url)
+            candidates.append(("fw", f"https://v.m.chenzhongtech.com/fw/photo/{self.video_id}"))
+        deduped: list[tuple[str, str]] = []
+        for route, url in candidates:
+            if url and url not in (u for _, u in deduped):
+                deduped.append((route, url))
         return deduped
 
+    def _attempts(self):
+        """按 路由 x 请求头方案 展开的尝试顺序, 该 host 上次成功的组合排在最前"""
+        profiles = [("full", self.headers), ("light", self._build_lightweight_headers())]
+        attempts = [
+            (route, url, profile, headers) for route, url in self._candidate_routes() for profile, headers in profiles
+        ]
+        if winner := _ROUTE_WINNERS.get(self._host()):
+            attempts.sort(key=lambda attempt: (attempt[0], attempt[2]) != winner)
+        return attempts
+
+    def _host(self):
+        return urlparse(self.real_url).netloc.lower()
+
     @staticmethod
     def _is_fw_photo_url(url):
         if not url:
@@ -280,10 +309,14 @@ class KuaishouParser:
 
     async def _fetch_html_with_headers(self, url, headers):
         try:
-            async with httpx.AsyncClient(timeout=15, cookies=self.cookie, proxy=self.proxy) as client:
-                resp = await client.get(url, headers=headers)
-            resp.raise_for_status()
-            return resp.text
+            async with httpx.AsyncClient(
+                timeout=15, cookies=self.cookie, proxy=self.proxy, event_hooks=HTTPX_EVENT_HOOKS
+            ) as client:
+                # 只在 Apollo 数据读取完整后提前断开: 页面可能先出现 INIT_STATE, 此时继续读取,
+                # 否则 _identify_and_parse_data 优先使用的 Apollo 数据会被截断; 没有 Apollo 时读取完整网页
+                page = await fetch_until_script(client, url, [APOLLO_STATE_MARKER], headers=headers)
+            page.response.raise_for_status()
+            return page.content
         except httpx.RequestError as e:
             logger.error(f"Failed to get the page: {url}, Error: {e}")
             return None
@@ -325,59 +358,58 @@ class KuaishouParser:
         return False
 
     async def _try_parse_candidate(self, candidate_url, headers):
-        self.real_url = candidate_url
-        self.html_content = await self._fetch_html_with_headers(candidate_url, headers)
-        if self._is_blocked_payload(self.html_content):
+        """请求并解析一个候选路由, 成功时返回 (html, page_type, structured_data), 不修改实例状态"""
+        html_content = await self._fetch_html_with_headers(candidate_url, headers)
+        if self._is_blocked_payload(html_content):
             logger.warning(f"Kuaishou blocked route {candidate_url}, trying fallback")
-            return False
-        page_type, structured_data = self._identify_and_parse_data()
+            return None
+        page_type, structured_data = self._identify_and_parse_data(html_content)
         if page_type == "UNKNOWN" or not structured_data:
-            return False
+            return None
         if not self._is_valid_video_state(page_type, structured_data):
             logger.warning(f"Kuaishou route {candidate_url} returned incomplete video state, trying fallback")
-            return False
-        self.page_type = page_type
-        self.structured_data = structured_data
-        return True
+            return None
+        return html_content, page_type, structured_data
 
     async def _load_page_with_fallbacks(self):
-        for candidate_url in self._candidate_urls():
-            if await self._try_parse_candidate(candidate_url, self.headers):
-                return
-            if await self._try_parse_candidate(candidate_url, self._build_lightweight_headers()):
-                return
+        """对冲请求各候选路由: 上一个尝试超过 HEDGE_DELAY 未返回或失败时开始下一个, 取第一个有效结果"""
+        host = self._host()
+        attempts = self._attempts()
+        running: dict[asyncio.Task, tuple] = {}
+
+        def start():
+            attempt = attempts.pop(0)
+            route, url, profile, headers = attempt
+            running[asyncio.create_task(self._try_parse_candidate(url, headers))] = attempt
+
+        start()
+        try:
+            while running:
+                done, _ = await asyncio.wait(
+                    running, timeout=HEDGE_DELAY if attempts else None, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    route, url, profile, _ = running.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        logger.error(f"Kuaishou route {url} failed: {e}")
+                        continue
+                    if result:
+                        self.real_url = url
+                        self.html_content, self.page_type, self.structured_data = result
+                        _ROUTE_WINNERS.set(host, (route, profile))
+                        return
+                if attempts:
+                    start()
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+        _ROUTE_WINNERS.pop(host)
         self.page_type = "UNKNOWN"
         self.structured_data = {}
 
-    def _extract_json_object(self, text, start_index):
-        """稳健提取 JSON 对象：通过括号匹配解决额外数据报错"""
-        if start_index == -1 or not text:
-            return None
-        bracket_count = 0
-        in_string = False
-        escape_next = False
-        quote_char = ""
-        for i in range(start_index, len(text)):
-            char = text[i]
-            if in_string:
-                if escape_next:
-                    escape_next = False
-                elif char == "\\":
-                    escape_next = True
-                elif char == quote_char:
-                    in_string = False
-                continue
-            if char in ("'", '"'):
-                in_string = True
-                quote_char = char
-            elif char == "{":
-                bracket_count += 1
-            elif char == "}":
-                bracket_count -= 1
-                if bracket_count == 0:
-                    return text[start_index : i + 1]
-        return None
-
     def _find_nested_dict(self, data, required_keys):
         """在快手扁平状态里查找同时具备指定字段的节点。"""
         stack = [data]
@@ -466,32 +498,23 @@ class KuaishouParser:
             cdn = f"https://{cdn}"
         return f"{cdn}/{path.lstrip('/')}"
 
-    def _identify_and_parse_data(self):
+    @staticmethod
+    def _identify_and_parse_data(html_content):
         """识别快手不同的数据载体（Apollo 或 InitState）"""
-        if not self.html_content:
+        if not html_content:
             return "UNKNOWN", {}
         # 1. 视频详情页 (Apollo)
-        if "window.__APOLLO_STATE__" in self.html_content:
-            marker = "window.__APOLLO_STATE__"
-            start_pos = self.html_content.find(marker) + len(marker)
-            start_pos = self.html_content.find("{", start_pos)
-            json_str = self._extract_json_object(self.html_content, start_pos)
-            if json_str:
-                try:
-                    return "VIDEO", json.loads(json_str)
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Failed to decode Kuaishou Apollo data: {e}")
+        try:
+            if data := extract_embedded_json(html_content, APOLLO_STATE_MARKER):
+                return "VIDEO", data
+        except json.JSONDecodeError as e:
+            logger.warning(f"Failed to decode Kuaishou Apollo data: {e}")
         # 2. 某些图文或移动端适配页 (INIT_STATE)
-        if "window.INIT_STATE" in self.html_content:
-            marker = "window.INIT_STATE"
-            start_pos = self.html_content.find(marker) + len(marker)
-            start_pos = self.html_content.find("{", start_pos)
-            json_str = self._extract_json_object(self.html_content, start_pos)
-            if json_str:
-                try:
-                    return "ATLAS", json.loads(json_str, strict=False)
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Failed to decode Kuaishou INIT_STATE data: {e}")
+        try:
+            if data := extract_embedded_json(html_content, INIT_STATE_MARKER, strict=False):
+                return "ATLAS", data
+        except json.JSONDecodeError as e:
+            logger.warning(f"Failed to decode Kuaishou INIT_STATE data: {e}")
         return "UNKNOWN", {}
 
     def get_real_video_url(self):
@@ -0,0 +1,151 @@
+"""Instagram / Threads 共用的 Meta 会话
+
+匿名请求 GraphQL 前需要先访问一次首页拿到 csrftoken、mid、ig_did 等 Cookie。
+这些 Cookie 按 (代理, 用户 Cookie) 缓存一段时间, 只有接口返回 403 / CSRF 错误时才重新获取;
+GraphQL 请求共用同一个连接池, Cookie 和请求头在每个请求上单独设置。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import weakref
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+
+import httpx
+
+from ..utils.cache import TTLCache
+from ..utils.instrumentation import HTTPX_EVENT_HOOKS
+from ..utils.loop_clients import LoopClients, proxy_key
+
+BOOTSTRAP_COOKIES = ("csrftoken", "mid", "ig_did")
+"""访问首页时需要保存的 Cookie"""
+
+
+class _LoopState:
+    def __init__(self) -> None:
+        # 正在访问首页的会话, 完成后自动移除
+        self.bootstraps: dict[tuple[str, str], asyncio.Task[dict[str, str]]] = {}
+
+
+class MetaSessionManager:
+    """按 (代理, 用户 Cookie) 缓存首页下发的会话 Cookie, 并提供共用的 httpx 客户端"""
+
+    def __init__(self, home_url: str, *, ttl: float = 6 * 3600, maxsize: int = 256) -> None:
+        """
+        :param home_url: 获取会话 Cookie 时访问的首页
+        :param ttl: 会话 Cookie 的缓存时间 (秒)
+        :param maxsize: 最多缓存的会话数
+        """
+        self.home_url = home_url
+        self._sessions: TTLCache[tuple[str, str], dict[str, str]] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._states: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState] = weakref.WeakKeyDictionary()
+        self._clients = LoopClients(_new_client)
+
+    def client(self, proxy: str | None = None) -> httpx.AsyncClient:
+        """当前事件循环中按代理共用的客户端; 不保存 Cookie"""
+        return self._clients.get(proxy)
+
+    async def cookies(
+        self,
+        *,
+        base: dict[str, str],
+        proxy: str | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float = 30,
+        refresh: bool = False,
+    ) -> dict[str, str]:
+        """
+        返回请求使用的 Cookie
+        :param base: 默认 Cookie 与用户 Cookie 合并后的结果
+        :param proxy: 代理
+        :param headers: 访问首页时使用的请求头
+        :param timeout: 访问首页的超时时间
+        :param refresh: 丢弃缓存重新访问首页, 用于 403 / CSRF 错误后重试
+        :raise httpx.HTTPError: 访问首页失败
+        """
+        key = self._key(proxy, base)
+        if not refresh:
+            if (cached := self._sessions.get(key)) is not None:
+                return base | cached
+            if base.get("csrftoken"):
+                return base
+
+        # 同一会话同时只访问一次首页, 其他请求等待其结果
+        state = self._state()
+        if (task := state.bootstraps.get(key)) is None:
+            task = state.bootstraps[key] = asyncio.create_task(
+                self._bootstrap(key, base, proxy=proxy, headers=headers, timeout=timeout)
+            )
+            task.add_done_callback(lambda _: state.bootstraps.pop(key, None))
+        # 一个调用方被取消时不影响其他等待同一会话的调用方
+        return base | await asyncio.shield(task)
+
+    def clear(self) -> None:
+        self._sessions.clear()
+
+    async def aclose(self) -> None:
+        """关闭当前事件循环中的共用客户端"""
+        await self._clients.aclose()
+
+    async def _bootstrap(
+        self,
+        key: tuple[str, str],
+        base: dict[str, str],
+        *,
+        proxy: str | None,
+        headers: dict[str, str] | None,
+        timeout: float,
+    ) -> dict[str, str]:
+        # 不带旧的 csrftoken, 让服务端重新下发
+        cookies = {name: value for name, value in base.items() if name not in BOOTSTRAP_COOKIES}
+        response = await self.client(proxy).get(
+            self.home_url,
+            headers={**(headers or {}), "Cookie": cookie_header(cookies)},
+            timeout=timeout,
+            follow_redirects=True,
+        )
+        session: dict[str, str] = {}
+        for r in (*response.history, response):
+            for name, value in r.cookies.items():
+                if name in BOOTSTRAP_COOKIES and value:
+                    session[name] = value
+        if session.get("csrftoken"):
+            self._sessions.set(key, session)
+        return session
+
+    @staticmethod
+    def _key(proxy: str | None, base: dict[str, str]) -> tuple[str, str]:
+        # 用户 Cookie 中除会话 Cookie 外的部分决定身份, 匿名请求共用一个会话
+        identity = {name: value for name, value in base.items() if name not in BOOTSTRAP_COOKIES and value}
+        digest = hashlib.sha256(json.dumps(identity, sort_keys=True).encode()).hexdigest() if identity else ""
+        return proxy_key(proxy), digest
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        if (state := self._states.get(loop)) is None:
+            state = self._states[loop] = _LoopState()
+        return state
+
+
+def _new_client(proxy: str | httpx.Proxy | None) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        proxy=proxy,
+        cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+        event_hooks=HTTPX_EVENT_HOOKS,
+    )
+
+
+def cookie_header(cookies: dict[str, str]) -> str:
+    return "; ".join(f"{name}={value}" for name, value in cookies.items() if value)
+
+
+def is_csrf_failure(response: httpx.Response) -> bool:
+    """会话 Cookie 失效时接口返回 403, 或在错误信息中提示 CSRF"""
+    if response.status_code == 200:
+        return False
+    return response.status_code == 403 or "csrf" in response.text[:1000].lower()
+
+
+__all__ = ["MetaSessionManager"]
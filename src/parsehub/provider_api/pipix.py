@@ -5,9 +5,13 @@ from enum import Enum
 from urllib.parse import unquote
 
 import httpx
-from bs4 import BeautifulSoup
 
+from ..utils.embedded_state import fetch_until_script, find_script_text
 from ..utils.helpers import UA
+from ..utils.instrumentation import HTTPX_EVENT_HOOKS
+
+# <script> 的 id, 由 find_script_text 确认位于开始标签中, 不限制引号和属性顺序
+RENDER_DATA_MARKER = "RENDER_DATA"
 
 
 class Pipix:
@@ -15,18 +19,18 @@ class Pipix:
         self.proxy = proxy
 
     async def parse(self, t_url: str) -> "PipixPost":
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            resp = await client.get(t_url, headers={"User-Agent": UA})
-            resp.raise_for_status()
-            return self._parse_data(resp.text)
+        async with httpx.AsyncClient(proxy=self.proxy, event_hooks=HTTPX_EVENT_HOOKS) as client:
+            page = await fetch_until_script(
+                client, t_url, [RENDER_DATA_MARKER], script_tag=True, headers={"User-Agent": UA}
+            )
+        page.response.raise_for_status()
+        return self._parse_data(page.content)
 
     @staticmethod
-    def _parse_data(data: str) -> "PipixPost":
-        soup = BeautifulSoup(data, "lxml")
-        script = soup.find("script", {"id": "RENDER_DATA"})
-        if script is None:
+    def _parse_data(data: bytes) -> "PipixPost":
+        raw_data = find_script_text(data, RENDER_DATA_MARKER)
+        if raw_data is None:
             raise Exception("皮皮虾数据解析失败")
-        raw_data = script.text
         json_data = unquote(raw_data)
         json_dict = json.loads(json_data)
 
@@ -4,11 +4,12 @@ import json
 import re
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any
+from typing import Any, ClassVar
 
 import httpx
 
 from ..utils.helpers import UA
+from .meta import MetaSessionManager, cookie_header, is_csrf_failure
 
 
 class ThreadsAPIError(Exception):
@@ -18,6 +19,7 @@ class ThreadsAPIError(Exception):
 class ThreadsAPI:
     GRAPHQL_URL = "https://www.threads.com/graphql/query"
     THREADS_URL = "https://www.threads.com/"
+    SESSIONS: ClassVar[MetaSessionManager] = MetaSessionManager(THREADS_URL)
     # BarcelonaPostPageDirectQuery, 通过帖子 ID 获取帖子内容
     POST_DOC_ID = "27419285281047858"
     X_IG_APP_ID = "238260118697367"
@@ -98,17 +100,15 @@ class ThreadsAPI:
         return variables
 
     async def _post_graphql(self, *, doc_id: str, variables: dict[str, Any]) -> dict[str, Any]:
-        async with self._new_client() as client:
-            await self._ensure_csrf_token(client)
-            data = {
-                "variables": json.dumps(variables, separators=(",", ":")),
-                "doc_id": doc_id,
-                "server_timestamps": "true",
-            }
-            try:
-                response = await client.post(self.GRAPHQL_URL, data=data, follow_redirects=False)
-            except httpx.HTTPError as exc:
-                raise ThreadsAPIError(f"请求 Threads GraphQL 失败: {exc}") from exc
+        data = {
+            "variables": json.dumps(variables, separators=(",", ":")),
+            "doc_id": doc_id,
+            "server_timestamps": "true",
+        }
+        response = await self._request_graphql(data)
+        if is_csrf_failure(response):
+            # 缓存的会话 Cookie 已失效, 重新获取后重试一次
+            response = await self._request_graphql(data, refresh=True)
 
         if response.status_code != 200:
             raise ThreadsAPIError(f"Threads GraphQL 返回 HTTP {response.status_code}: {response.text[:500]}")
@@ -140,37 +140,38 @@ class ThreadsAPI:
         # 找不到精确匹配时退回第一条 (通常即目标帖子本身)
         return fallback
 
-    def _new_client(self) -> httpx.AsyncClient:
-        cookies = self.DEFAULT_COOKIES | self.cookie
-        headers = {
+    def _headers(self) -> dict[str, str]:
+        return {
             "Accept": "*/*",
             "Content-Type": "application/x-www-form-urlencoded",
             "Referer": self.THREADS_URL,
             "User-Agent": UA,
             "X-IG-App-ID": self.X_IG_APP_ID,
         }
-        return httpx.AsyncClient(
-            cookies=cookies,
-            headers=headers,
-            proxy=self.proxy,
-            timeout=self.timeout,
-        )
 
-    async def _ensure_csrf_token(self, client: httpx.AsyncClient) -> None:
-        csrf_token = self._get_cookie_value(client, "csrftoken")
-        if not csrf_token:
-            try:
-                await client.get(self.THREADS_URL, follow_redirects=True)
-            except httpx.HTTPError as exc:
-                raise ThreadsAPIError(f"获取 Threads csrftoken 失败: {exc}") from exc
-            csrf_token = self._get_cookie_value(client, "csrftoken")
-        if csrf_token:
-            client.headers["x-csrftoken"] = csrf_token
+    async def _request_graphql(self, data: dict[str, str], *, refresh: bool = False) -> httpx.Response:
+        headers = self._headers()
+        try:
+            cookies = await self.SESSIONS.cookies(
+                base=self.DEFAULT_COOKIES | self.cookie,
+                proxy=self.proxy,
+                headers=headers,
+                timeout=self.timeout,
+                refresh=refresh,
+            )
+        except httpx.HTTPError as exc:
+            raise ThreadsAPIError(f"获取 Threads csrftoken 失败: {exc}") from exc
+
+        if csrf_token := cookies.get("csrftoken"):
+            headers["x-csrftoken"] = csrf_token
+        headers["Cookie"] = cookie_header(cookies)
 
-    @staticmethod
-    def _get_cookie_value(client: httpx.AsyncClient, name: str) -> str:
-        values = [cookie.value for cookie in client.cookies.jar if cookie.name == name and cookie.value]
-        return values[-1] if values else ""
+        try:
+            return await self.SESSIONS.client(self.proxy).post(
+                self.GRAPHQL_URL, data=data, headers=headers, timeout=self.timeout, follow_redirects=False
+            )
+        except httpx.HTTPError as exc:
+            raise ThreadsAPIError(f"请求 Threads GraphQL 失败: {exc}") from exc
 
     @classmethod
     def shortcode_to_pk(cls, code: str) -> int:
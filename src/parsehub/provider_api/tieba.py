@@ -2,12 +2,24 @@ import hashlib
 import re
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, cast
+from typing import Any, ClassVar, cast
 
 import httpx
 
+from ..utils.cache import TTLCache
+from ..utils.instrumentation import HTTPX_EVENT_HOOKS
+from ..utils.loop_clients import LoopClients, proxy_key
+
+# 当前事件循环中按代理共用的客户端, 获取 tbs 和帖子内容复用同一连接池
+_clients = LoopClients(lambda proxy: httpx.AsyncClient(proxy=proxy, timeout=30, event_hooks=HTTPX_EVENT_HOOKS))
+
 
 class TieBa:
+    TBS_URL = "http://tieba.baidu.com/dc/common/tbs"
+    PAGE_URL = "https://tieba.baidu.com/c/f/pb/page_pc"
+    # 匿名 tbs 与帖子无关, 按代理缓存; 接口返回 tbs / 签名错误时重新获取
+    _tbs_cache: ClassVar[TTLCache[str, str]] = TTLCache(maxsize=64, ttl=1800)
+
     def __init__(self, proxy: str | None = None):
         self.proxy = proxy
 
@@ -22,12 +34,17 @@ class TieBa:
         salt = "36770b1f34c9bbf2e7d1a99d2b82fa9e"
         return hashlib.md5((base_str + salt).encode("utf-8")).hexdigest()
 
-    async def fetch_tbs(self) -> str:
-        async with httpx.AsyncClient(proxy=self.proxy) as cli:
-            result = await cli.get("http://tieba.baidu.com/dc/common/tbs")
-            result.raise_for_status()
-        result = result.json()
-        if tbs := result.get("tbs"):
+    async def fetch_tbs(self, *, refresh: bool = False) -> str:
+        """获取匿名 tbs, 优先使用缓存
+        :param refresh: 忽略缓存重新获取
+        """
+        key = proxy_key(self.proxy)
+        if not refresh and (tbs := self._tbs_cache.get(key)):
+            return tbs
+        response = await _clients.get(self.proxy).get(self.TBS_URL)
+        response.raise_for_status()
+        if tbs := response.json().get("tbs"):
+            self._tbs_cache.set(key, str(tbs))
             return str(tbs)
         raise TieBaError("获取 tbs 失败")
 
@@ -39,7 +56,15 @@ class TieBa:
 
     async def fetch_post_data(self, url: str) -> dict:
         kz = self.get_kz(url)
-        tbs = await self.fetch_tbs()
+        result = await self._fetch_page(kz, await self.fetch_tbs())
+        if result["error_code"] and self._is_tbs_error(result):
+            # 缓存的 tbs 已失效
+            result = await self._fetch_page(kz, await self.fetch_tbs(refresh=True))
+        if result["error_code"]:
+            raise TieBaError(em if (em := result["error_msg"]) else "获取帖子内容失败")
+        return result
+
+    async def _fetch_page(self, kz: str, tbs: str) -> dict[str, Any]:
         data = {
             "pn": "1",
             "lz": "0",
@@ -54,13 +79,14 @@ class TieBa:
             "_client_type": "20",
         }
         data["sign"] = self.gen_sign(data)
-        async with httpx.AsyncClient(proxy=self.proxy, timeout=30) as cli:
-            result = await cli.post("https://tieba.baidu.com/c/f/pb/page_pc", data=data)
-            result.raise_for_status()
-            result = result.json()
-        if result["error_code"]:
-            raise TieBaError(em if (em := result["error_msg"]) else "获取帖子内容失败")
-        return cast(dict[str, Any], result)
+        response = await _clients.get(self.proxy).post(self.PAGE_URL, data=data)
+        response.raise_for_status()
+        return cast(dict[str, Any], response.json())
+
+    @staticmethod
+    def _is_tbs_error(result: dict[str, Any]) -> bool:
+        message = str(result.get("error_msg") or "").lower()
+        return any(keyword in message for keyword in ("tbs", "sign", "签名"))
 
 
 class TieBaPostType(Enum):
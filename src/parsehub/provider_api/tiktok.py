@@ -2,20 +2,22 @@ import asyncio
 import html
 import json
 import re
-from typing import Any, NamedTuple, cast
+import time
+from collections.abc import Awaitable
+from typing import Any, Literal, NamedTuple, cast
 from urllib.parse import urlencode, urlparse
 
 import httpx
 
+from ..utils.embedded_state import fetch_until_script, find_script_text
 from ..utils.helpers import UA
+from ..utils.instrumentation import HTTPX_EVENT_HOOKS
 
 TIKTOK_APP_FEED = "https://api22-normal-c-alisg.tiktokv.com/aweme/v1/feed/"
 
 FACEBOOK_EXTERNAL_HIT_UA = "facebookexternalhit/1.1 (+http://www.facebook.com/externalhit_uatext.php)"
-UNIVERSAL_DATA_RE = re.compile(
-    r'<script[^>]+id=["\']__UNIVERSAL_DATA_FOR_REHYDRATION__["\'][^>]*>(?P<json>.*?)</script>',
-    re.DOTALL,
-)
+# <script> 的 id, 由 find_script_text 确认位于开始标签中, 不限制引号和属性顺序
+UNIVERSAL_DATA_MARKER = "__UNIVERSAL_DATA_FOR_REHYDRATION__"
 
 TIKTOK_HEADERS = {
     "User-Agent": UA,
@@ -36,6 +38,39 @@ class TikTokItemRef(NamedTuple):
     aweme_id: str
 
 
+FetchPath = Literal["feed", "web"]
+
+
+class PathStats:
+    """feed / web 两条获取路径的成功率和成功请求的耗时 (指数滑动平均), 用于调整对冲延迟"""
+
+    def __init__(self, alpha: float = 0.2) -> None:
+        self.alpha = alpha
+        self.success_rate: dict[FetchPath, float] = {"feed": 1.0, "web": 1.0}
+        self.latency: dict[FetchPath, float | None] = {"feed": None, "web": None}
+
+    def record(self, path: FetchPath, ok: bool, elapsed: float) -> None:
+        self.success_rate[path] += self.alpha * (ok - self.success_rate[path])
+        if ok:
+            latency = self.latency[path]
+            self.latency[path] = elapsed if latency is None else latency + self.alpha * (elapsed - latency)
+
+    def hedge_delay(self, base: float) -> float:
+        """
+        对冲延迟: 以 feed 平均耗时的 2 倍为准 (限制在 base 的 1/4 ~ 4 倍, 尚无记录时为 base),
+        feed 成功率越低越早启动 web; web 自身成功率低时推迟, 最多为 base 的 4 倍
+        :param base: 配置的对冲延迟 (秒)
+        """
+        delay = base
+        if (latency := self.latency["feed"]) is not None:
+            delay = min(max(latency * 2, base / 4), base * 4)
+        delay *= self.success_rate["feed"] / max(self.success_rate["web"], 0.25)
+        return min(delay, base * 4)
+
+
+_PATH_STATS = PathStats()
+
+
 class TikTokWebCrawler:
     _ITEM = re.compile(r"/(?P<media_type>video|photo)/(?P<aweme_id>\d+)")
     _URL = re.compile(r"https?://\S+")
@@ -47,7 +82,12 @@ class TikTokWebCrawler:
         user_agent: str | None = None,
         max_retries: int = 3,
         timeout: int = 15,
+        hedge_delay: float | None = None,
     ):
+        """
+        :param hedge_delay: 启用对冲: feed 接口超过该时间 (秒) 仍未返回时同时请求 Web 页面, 取先成功的结果;
+            实际延迟会根据 feed 的平均耗时和两条路径的历史成功率调整。为空时 feed 失败后才请求 Web 页面
+        """
         self.headers = dict(TIKTOK_HEADERS)
         if user_agent:
             self.headers["User-Agent"] = user_agent
@@ -57,28 +97,76 @@ class TikTokWebCrawler:
         self.proxy = proxy
         self.max_retries = max_retries
         self.timeout = timeout
+        self.hedge_delay = hedge_delay
 
     async def parse(self, url: str) -> dict:
-        item_ref = None
+        if self.hedge_delay is not None:
+            return await self._parse_hedged(url, self.hedge_delay)
+
+        refs: list[TikTokItemRef] = []
         primary_error: Exception | None = None
 
         try:
-            resolved_url = await self.resolve_url(url)
-            item_ref = self.extract_item_ref_from_url(resolved_url)
-            if not item_ref:
-                raise ValueError(f"无法从链接中提取作品 ID: {resolved_url}")
-            return await self.fetch_one_video(item_ref.aweme_id)
+            return await _timed("feed", self._fetch_feed(url, refs))
         except Exception as exc:
             primary_error = exc
 
+        item_ref = refs[0] if refs else None
         if item_ref and item_ref.media_type == "photo":
             raise RuntimeError(f"获取 TikTok 图文作品失败: {primary_error}") from primary_error
 
         try:
-            return await self.fetch_video_from_web(url, expected_aweme_id=item_ref.aweme_id if item_ref else None)
+            return await _timed("web", self._fetch_web(url, refs))
         except Exception as web_error:
             raise RuntimeError(f"获取 TikTok 作品失败: feed={primary_error}; web={web_error}") from web_error
 
+    async def _parse_hedged(self, url: str, base_delay: float) -> dict:
+        refs: list[TikTokItemRef] = []
+        start = time.monotonic()
+        feed = asyncio.create_task(_timed("feed", self._fetch_feed(url, refs)))
+        tasks: dict[asyncio.Task[dict], FetchPath] = {feed: "feed"}
+        errors: dict[FetchPath, BaseException] = {}
+
+        try:
+            await asyncio.wait([feed], timeout=_PATH_STATS.hedge_delay(base_delay))
+            if feed.done() and not feed.exception():
+                return feed.result()
+            # feed 超时未返回或已失败, 图文作品没有 Web fallback
+            if not (refs and refs[0].media_type == "photo"):
+                tasks[asyncio.create_task(_timed("web", self._fetch_web(url, refs)))] = "web"
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if (error := task.exception()) is None:
+                        if not feed.done():
+                            # feed 输给 web 后会被取消, _timed 不记录取消, 在此记为 feed 失败
+                            _PATH_STATS.record("feed", False, time.monotonic() - start)
+                        return task.result()
+                    errors[tasks[task]] = error
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        feed_error, web_error = errors.get("feed"), errors.get("web")
+        if web_error is None:
+            raise RuntimeError(f"获取 TikTok 图文作品失败: {feed_error}") from feed_error
+        raise RuntimeError(f"获取 TikTok 作品失败: feed={feed_error}; web={web_error}") from web_error
+
+    async def _fetch_feed(self, url: str, refs: list[TikTokItemRef]) -> dict:
+        """解析链接并通过 feed 接口获取作品, 解析出的作品 ID 写入 refs 供 Web 路径使用"""
+        resolved_url = await self.resolve_url(url)
+        item_ref = self.extract_item_ref_from_url(resolved_url)
+        if not item_ref:
+            raise ValueError(f"无法从链接中提取作品 ID: {resolved_url}")
+        refs.append(item_ref)
+        return await self.fetch_one_video(item_ref.aweme_id)
+
+    async def _fetch_web(self, url: str, refs: list[TikTokItemRef]) -> dict:
+        return await self.fetch_video_from_web(url, expected_aweme_id=refs[0].aweme_id if refs else None)
+
     def _client(self, *, headers: dict[str, str] | None = None) -> httpx.AsyncClient:
         return httpx.AsyncClient(
             headers=headers or self.headers,
@@ -86,6 +174,7 @@ class TikTokWebCrawler:
             follow_redirects=True,
             proxy=self.proxy,
             cookies=self.cookies,
+            event_hooks=HTTPX_EVENT_HOOKS,
         )
 
     @classmethod
@@ -196,15 +285,15 @@ class TikTokWebCrawler:
             item["aweme_id"] = item_id
         return item
 
-    async def download_webpage(self, url: str) -> str:
+    async def download_webpage(self, url: str) -> bytes:
         async with self._client(headers=TIKTOK_WEB_HEADERS) as client:
-            last_webpage = ""
+            last_webpage = b""
             for attempt in range(self.max_retries):
-                response = await client.get(url)
-                if urlparse(str(response.url)).path == "/login":
+                page = await fetch_until_script(client, url, [UNIVERSAL_DATA_MARKER], script_tag=True)
+                if urlparse(str(page.response.url)).path == "/login":
                     raise RuntimeError("TikTok 要求登录才能访问这个内容")
-                response.raise_for_status()
-                webpage = response.text
+                page.response.raise_for_status()
+                webpage = page.content
                 if self._search_universal_data(webpage):
                     return webpage
                 last_webpage = webpage
@@ -213,16 +302,19 @@ class TikTokWebCrawler:
             return last_webpage
 
     @staticmethod
-    def _search_universal_data(webpage: str) -> dict[str, Any]:
-        match = UNIVERSAL_DATA_RE.search(webpage)
-        if not match:
-            return {}
-        raw = html.unescape(match.group("json")).strip()
+    def _search_universal_data(webpage: str | bytes) -> dict[str, Any]:
+        raw = (find_script_text(webpage, UNIVERSAL_DATA_MARKER) or "").strip()
         if not raw:
             return {}
         try:
             data = json.loads(raw)
         except json.JSONDecodeError:
+            # 少数页面会对脚本内容做 HTML 转义
+            try:
+                data = json.loads(html.unescape(raw))
+            except json.JSONDecodeError:
+                return {}
+        if not isinstance(data, dict):
             return {}
         return data.get("__DEFAULT_SCOPE__") or {}
 
@@ -243,3 +335,17 @@ class TikTokWebCrawler:
             raise RuntimeError("当前 IP 被 TikTok 阻止访问这个内容")
         status_msg = detail.get("statusMsg") or detail.get("statusMessage") or status
         raise RuntimeError(f"页面中没有作品详情，status={status_msg}")
+
+
+async def _timed[T](path: FetchPath, coro: Awaitable[T]) -> T:
+    """记录路径的成功率; 链接本身的问题 (ValueError) 和取消不计入"""
+    start = time.monotonic()
+    try:
+        result = await coro
+    except ValueError:
+        raise
+    except Exception:
+        _PATH_STATS.record(path, False, time.monotonic() - start)
+        raise
+    _PATH_STATS.record(path, True, time.monotonic() - start)
+    return result
@@ -1,9 +1,14 @@
 # mypy: disable-error-code=no-untyped-def
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import json
 import re
-from collections.abc import Callable
+import weakref
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass
+from http.cookiejar import CookieJar, DefaultCookiePolicy
 from typing import Literal, NamedTuple
 
 import httpx
@@ -11,6 +16,89 @@ from loguru import logger
 
 from ..types import ParseError
 from ..utils.helpers import UA
+from ..utils.instrumentation import HTTPX_EVENT_HOOKS
+from ..utils.loop_clients import LoopClients
+from ..utils.offload import run_cpu_bound
+
+TWEET_RESULT_URL = "https://api.twitter.com/graphql/kPLTRmMnzbPTv70___D06w/TweetResultByRestId"
+TWEET_RESULTS_URL = "https://api.twitter.com/graphql/R1h43jnAl2bsDoUkgZb7NQ/TweetResultsByRestIds"
+
+# 以下参数与推文无关, 只在导入时序列化一次
+_FEATURES = json.dumps(
+    {
+        "creator_subscriptions_tweet_preview_api_enabled": True,
+        "communities_web_enable_tweet_community_results_fetch": True,
+        "c9s_tweet_anatomy_moderator_badge_enabled": True,
+        "tweetypie_unmention_optimization_enabled": True,
+        "responsive_web_edit_tweet_api_enabled": True,
+        "graphql_is_translatable_rweb_tweet_is_translatable_enabled": True,
+        "view_counts_everywhere_api_enabled": True,
+        "longform_notetweets_consumption_enabled": True,
+        "responsive_web_twitter_article_tweet_consumption_enabled": True,
+        "tweet_awards_web_tipping_enabled": False,
+        "creator_subscriptions_quote_tweet_preview_enabled": False,
+        "freedom_of_speech_not_reach_fetch_enabled": True,
+        "standardized_nudges_misinfo": True,
+        "tweet_with_visibility_results_prefer_gql_limited_actions_policy_enabled": True,
+        "tweet_with_visibility_results_prefer_gql_media_interstitial_enabled": False,
+        "rweb_video_timestamps_enabled": True,
+        "longform_notetweets_rich_text_read_enabled": True,
+        "longform_notetweets_inline_media_enabled": True,
+        "rweb_tipjar_consumption_enabled": True,
+        "responsive_web_graphql_exclude_directive_enabled": True,
+        "verified_phone_label_enabled": False,
+        "responsive_web_graphql_skip_user_profile_image_extensions_enabled": False,
+        "responsive_web_graphql_timeline_navigation_enabled": True,
+        "responsive_web_enhance_cards_enabled": False,
+    },
+    separators=(",", ":"),
+)
+_FIELD_TOGGLES = '{"withArticleRichContentState":true,"withArticlePlainText":false}'
+_VARIABLES = '{{"tweetId":"{}","withCommunity":false,"includePromotedContent":false,"withVoice":false}}'
+_BATCH_VARIABLES = '{{"tweetIds":{},"withCommunity":false,"includePromotedContent":false,"withVoice":false}}'
+
+MAX_CONCURRENCY = 4
+"""同一事件循环中同时进行的推文请求数, 避免一次粘贴大量链接时触发限流"""
+MAX_BATCH_SIZE = 20
+"""一次批量请求最多包含的推文数"""
+BATCH_WINDOW = 0.02
+"""收集同一批推文 id 的时间 (秒), 期间到达的请求合并为一次批量请求"""
+
+
+class _Batch:
+    def __init__(self) -> None:
+        self.futures: dict[str, asyncio.Future[TwitterTweet]] = {}
+        self.full = asyncio.Event()
+        self.task: asyncio.Task[None] | None = None
+
+
+class _LoopState:
+    def __init__(self) -> None:
+        self.semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+        self.inflight: dict[tuple[str, str, str], asyncio.Future[TwitterTweet]] = {}
+        self.pending: dict[tuple[str, str], _Batch] = {}
+        self.batch_unavailable = False
+        """批量接口返回 400 / 404 (query id 失效) 后, 该事件循环改为逐条请求"""
+
+
+def _new_client(proxy: str | httpx.Proxy | None) -> httpx.AsyncClient:
+    """按代理共用的客户端, 请求复用 keep-alive 连接"""
+    return httpx.AsyncClient(
+        proxy=proxy,
+        cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+        event_hooks=HTTPX_EVENT_HOOKS,
+    )
+
+
+_clients = LoopClients(_new_client)
+_states: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState] = weakref.WeakKeyDictionary()
+
+
+def _state() -> _LoopState:
+    loop = asyncio.get_running_loop()
+    if (state := _states.get(loop)) is None:
+        state = _states[loop] = _LoopState()
+    return state
 
 
 class Twitter:
@@ -23,7 +111,147 @@ class Twitter:
         self.cookie = cookie
 
     async def fetch_tweet(self, url: str) -> TwitterTweet:
+        """
+        获取推文
+        :param url: 推文链接
+        """
         tweet_id = self.get_id_by_url(url)
+        result = (await self.fetch_tweets([tweet_id]))[tweet_id]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def fetch_tweets(self, ids: Iterable[str]) -> dict[str, TwitterTweet | Exception]:
+        """
+        批量获取推文
+
+        同一事件循环中 BATCH_WINDOW 内到达的推文 id (包括其他调用方的) 合并为一次 TweetResultsByRestIds 请求,
+        每批最多 MAX_BATCH_SIZE 条; 正在请求的推文直接等待其结果; 所有请求共用一个连接池并限制并发数 (MAX_CONCURRENCY)。
+        :param ids: 推文 id
+        :return: id -> 推文; 单条失败时为对应的异常, 不影响其他推文
+        """
+        unique_ids = list(dict.fromkeys(ids))
+        state = _state()
+        headers = self._headers()
+        # 一个调用方被取消时不影响其他等待同一推文的调用方
+        futures = [asyncio.shield(self._enqueue(state, tweet_id, headers)) for tweet_id in unique_ids]
+        return self._collect(unique_ids, await asyncio.gather(*futures, return_exceptions=True))
+
+    def _enqueue(self, state: _LoopState, tweet_id: str, headers: dict[str, str]) -> asyncio.Future[TwitterTweet]:
+        key = (self.proxy or "", headers.get("cookie", ""), tweet_id)
+        if (future := state.inflight.get(key)) is not None:
+            return future
+        future = state.inflight[key] = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda _: state.inflight.pop(key, None))
+
+        batch_key = key[:2]
+        if (batch := state.pending.get(batch_key)) is None:
+            batch = state.pending[batch_key] = _Batch()
+            batch.task = asyncio.create_task(self._flush(state, batch_key, batch, headers))
+        batch.futures[tweet_id] = future
+        if len(batch.futures) >= MAX_BATCH_SIZE:
+            # 已满的批次立即发出, 之后的 id 进入新批次
+            del state.pending[batch_key]
+            batch.full.set()
+        return future
+
+    async def _flush(self, state: _LoopState, batch_key: tuple[str, str], batch: _Batch, headers: dict[str, str]):
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(batch.full.wait(), BATCH_WINDOW)
+        if state.pending.get(batch_key) is batch:
+            del state.pending[batch_key]
+
+        ids = list(batch.futures)
+        try:
+            results = await self._request(state, ids, headers)
+        except Exception as e:
+            results = dict.fromkeys(ids, e)
+        for tweet_id, future in batch.futures.items():
+            if future.done():
+                continue
+            result = results[tweet_id]
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _request(
+        self, state: _LoopState, ids: list[str], headers: dict[str, str]
+    ) -> dict[str, TwitterTweet | Exception]:
+        if len(ids) > 1 and not state.batch_unavailable:
+            try:
+                response = await self._get(state, TWEET_RESULTS_URL, self._batch_params(ids), headers)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in (400, 404):
+                    raise
+                logger.warning(f"Twitter 批量接口不可用 ({e.response.status_code}), 改为逐条请求")
+                state.batch_unavailable = True
+            else:
+                payloads = self._split(ids, response.json())
+                return await run_cpu_bound(self._parse_many, payloads, size=self._parse_size(response))
+
+        async def request(tweet_id: str) -> TwitterTweet:
+            response = await self._get(state, TWEET_RESULT_URL, self._params(tweet_id), headers)
+            return await run_cpu_bound(self.parse, response.json(), size=self._parse_size(response))
+
+        return self._collect(
+            ids, await asyncio.gather(*(request(tweet_id) for tweet_id in ids), return_exceptions=True)
+        )
+
+    @staticmethod
+    def _collect(ids: list[str], results: list[TwitterTweet | BaseException]) -> dict[str, TwitterTweet | Exception]:
+        tweets: dict[str, TwitterTweet | Exception] = {}
+        for tweet_id, result in zip(ids, results, strict=True):
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+            tweets[tweet_id] = result
+        return tweets
+
+    async def _get(
+        self, state: _LoopState, url: str, params: dict[str, str], headers: dict[str, str]
+    ) -> httpx.Response:
+        async with state.semaphore:
+            response = await _clients.get(self.proxy).get(url, params=params, headers=headers)
+        response.raise_for_status()
+        return response
+
+    @staticmethod
+    def _parse_size(response: httpx.Response) -> int:
+        # 只有 Article 需要渲染 markdown, 普通推文直接解析
+        return len(response.content) if b'"article_results"' in response.content else 0
+
+    @staticmethod
+    def _split(ids: list[str], payload: dict) -> dict[str, dict]:
+        """把批量接口的结果拆成与 TweetResultByRestId 相同结构的单条结果, 交给 parse 处理"""
+        if not payload.get("data"):
+            return dict.fromkeys(ids, payload)
+        items = [item or {} for item in payload["data"].get("tweetResult") or []]
+        by_id = {}
+        for item in items:
+            result = item.get("result") or {}
+            if rest_id := result.get("rest_id") or result.get("tweet", {}).get("rest_id"):
+                by_id[rest_id] = item
+        # 墓碑等没有 rest_id 的结果按请求顺序对应
+        positional = len(items) == len(ids)
+        payloads = {}
+        for i, tweet_id in enumerate(ids):
+            item = by_id.get(tweet_id)
+            if item is None and positional:
+                result = items[i].get("result") or {}
+                item = None if result.get("rest_id") or result.get("tweet") else items[i]
+            payloads[tweet_id] = {"data": {"tweetResult": item or {}}}
+        return payloads
+
+    def _parse_many(self, payloads: dict[str, dict]) -> dict[str, TwitterTweet | Exception]:
+        tweets: dict[str, TwitterTweet | Exception] = {}
+        for tweet_id, payload in payloads.items():
+            try:
+                tweets[tweet_id] = self.parse(payload)
+            except Exception as e:
+                tweets[tweet_id] = e
+        return tweets
+
+    def _headers(self) -> dict[str, str]:
         headers = {
             "accept-language": "zh-CN,zh;q=0.9",
             "authorization": self.authorization,
@@ -32,46 +260,26 @@ class Twitter:
             "x-twitter-active-user": "yes",
             "x-twitter-client-language": "zh-cn",
         }
-
-        cookie = None
         if self.cookie and self.check_cookie():
             headers["x-csrf-token"] = self.cookie.get("ct0", "")
-            cookie = self.cookie
-
-        params = {
-            "variables": f'{{"tweetId":"{tweet_id}","withComm'
-            f'unity":false,"includePromotedContent":false,"withVoice":false}}',
-            "features": '{"creator_subscriptions_tweet_preview_api_enabled":true,'
-            '"communities_web_enable_tweet_community_results_fetch":true,'
-            '"c9s_tweet_anatomy_moderator_badge_enabled":true,"tweetypie_unmention_optimization_enabled":true,'
-            '"responsive_web_edit_tweet_api_enabled":true,"graphql_is_translatable_rweb_tweet_is_translatable_enabled"'
-            ":true,"
-            '"view_counts_everywhere_api_enabled":true,"longform_notetweets_consumption_enabled":true,'
-            '"responsive_web_twitter_article_tweet_consumption_enabled":true,"tweet_awards_web_tipping_enabled":false,'
-            '"creator_subscriptions_quote_tweet_preview_enabled":false,"freedom_of_speech_not_reach_fetch_enabled"'
-            ":true,"
-            '"standardized_nudges_misinfo":true,"tweet_with_visibility_results_prefer_gql_limited_actions_policy_enable'
-            'd":true,'
-            '"tweet_with_visibility_results_prefer_gql_media_interstitial_enabled":false,"rweb_video_timestamps_enabled'
-            '":true,'
-            '"longform_notetweets_rich_text_read_enabled":true,"longform_notetweets_inline_media_enabled":true,'
-            '"rweb_tipjar_consumption_enabled":true,"responsive_web_graphql_exclude_directive_enabled":true,"verified_'
-            'phone_label_enabled":false,'
-            '"responsive_web_graphql_skip_user_profile_image_extensions_enabled":false,"responsive_web_graphql_timeline'
-            '_navigation_enabled":true,'
-            '"responsive_web_enhance_cards_enabled":false}',
-            "fieldToggles": '{"withArticleRichContentState":true,"withArticlePlainText":false}',
+            headers["cookie"] = "; ".join(f"{name}={value}" for name, value in self.cookie.items())
+        return headers
+
+    @staticmethod
+    def _params(tweet_id: str) -> dict[str, str]:
+        return {
+            "variables": _VARIABLES.format(tweet_id),
+            "features": _FEATURES,
+            "fieldToggles": _FIELD_TOGGLES,
         }
 
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.get(
-                "https://api.twitter.com/graphql/kPLTRmMnzbPTv70___D06w/TweetResultByRestId",
-                params=params,
-                headers=headers,
-                cookies=cookie,
-            )
-        response.raise_for_status()
-        return self.parse(response.json())
+    @staticmethod
+    def _batch_params(ids: list[str]) -> dict[str, str]:
+        return {
+            "variables": _BATCH_VARIABLES.format(json.dumps(ids, separators=(",", ":"))),
+            "features": _FEATURES,
+            "fieldToggles": _FIELD_TOGGLES,
+        }
 
     def parse(self, result: dict) -> TwitterTweet:
         if e := result.get("errors"):
@@ -10,6 +10,8 @@ from urllib.parse import urlparse
 
 import httpx
 
+from ..utils.instrumentation import HTTPX_EVENT_HOOKS
+
 
 class WeiboAPI:
     def __init__(self, proxy: str | None = None):
@@ -28,7 +30,9 @@ class WeiboAPI:
         parsed = urlparse(url)
 
         async def fn() -> str:
-            async with httpx.AsyncClient(proxy=self.proxy, follow_redirects=False, timeout=30) as client:
+            async with httpx.AsyncClient(
+                proxy=self.proxy, follow_redirects=False, timeout=30, event_hooks=HTTPX_EVENT_HOOKS
+            ) as client:
                 response = await client.get(url)
                 if response.is_error:
                     response.raise_for_status()
@@ -59,7 +63,7 @@ class WeiboAPI:
             "referer": "https://weibo.com",
         }
         api = f"https://weibo.com/ajax/statuses/show?id={bid}&isGetLongText=true"
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
+        async with httpx.AsyncClient(proxy=self.proxy, event_hooks=HTTPX_EVENT_HOOKS) as client:
             response = await client.get(api, cookies=self._cookies, headers=headers)
             response.raise_for_status()
             result: dict = response.json()
@@ -74,7 +78,7 @@ class WeiboAPI:
             "page": f"/tv/show/{oid}",
         }
         data = {"data": f'{{"Component_Play_Playinfo":{{"oid":"{oid}"}}}}'}
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
+        async with httpx.AsyncClient(proxy=self.proxy, event_hooks=HTTPX_EVENT_HOOKS) as client:
             response = await client.post(
                 "https://weibo.com/tv/api/component", cookies=self._cookies, headers=headers, data=data, params=params
             )
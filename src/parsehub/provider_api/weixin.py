@@ -3,11 +3,13 @@ from typing import Any, cast
 
 import httpx
 from bs4 import BeautifulSoup, Tag
-from markdown import markdown
 from markdownify import MarkdownConverter
 
 from ..types import ParseError
 from ..utils.helpers import UA
+from ..utils.instrumentation import HTTPX_EVENT_HOOKS
+from ..utils.offload import run_cpu_bound
+from ..utils.plaintext import markdown_to_text
 
 
 class WXConverter(MarkdownConverter):
@@ -32,10 +34,10 @@ class WX:
 
     @staticmethod
     async def parse(url: str, proxy: str | None = None) -> "WX":
-        async with httpx.AsyncClient(proxy=proxy) as client:
+        async with httpx.AsyncClient(proxy=proxy, event_hooks=HTTPX_EVENT_HOOKS) as client:
             response = await client.get(url, headers={"User-Agent": UA})
             html = response.text
-            return WX._parse_html(html)
+        return await run_cpu_bound(WX._parse_html, html, size=len(html))
 
     @classmethod
     def _parse_html(cls, html: str) -> "WX":
@@ -47,7 +49,7 @@ class WX:
             imgs = [str(i.get("data-src") or "") for i in rich_media_content.find_all("img", {"class": "rich_pages"})]
 
             markdown_content = wxc.convert(str(rich_media_content))
-            text_content = "".join(BeautifulSoup(markdown(markdown_content), "lxml").find_all(string=True))
+            text_content = markdown_to_text(markdown_content)
             return cls(title, imgs, markdown_content, text_content)
         elif isinstance(share_content_page := soup.find("div", {"class": "share_content_page"}), Tag):
             imgs = [str(i.get("data-src") or "") for i in share_content_page.find_all("div", {"class": "swiper_item"})]
@@ -56,7 +58,7 @@ class WX:
             if not isinstance(description, Tag):
                 raise ParseError("获取内容失败")
             markdown_content = wxc.convert(str(description.get("content") or ""))
-            text_content = "".join(BeautifulSoup(markdown(markdown_content), "lxml").find_all(string=True))
+            text_content = markdown_to_text(markdown_content)
             return cls(title, imgs, markdown_content, text_content)
         else:
             raise ParseError("获取内容失败")
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import re
 from dataclasses import dataclass
 from enum import Enum
 from typing import Any, cast
 
 import httpx
-from bs4 import BeautifulSoup
+
+from ..utils.embedded_state import extract_embedded_json, fetch_until_script
+from ..utils.instrumentation import HTTPX_EVENT_HOOKS
+
+INITIAL_STATE_MARKER = "window.__INITIAL_STATE__="
 
 
 class XHSAPI:
@@ -16,22 +19,16 @@ class XHSAPI:
         self.proxy = proxy
         self.cookie = cookie
 
-    async def __fetch_html(self, url: str) -> str:
-        async with httpx.AsyncClient(proxy=self.proxy, cookies=self.cookie) as client:
-            return (await client.get(url, timeout=30)).text
+    async def __fetch_html(self, url: str) -> bytes:
+        async with httpx.AsyncClient(proxy=self.proxy, cookies=self.cookie, event_hooks=HTTPX_EVENT_HOOKS) as client:
+            page = await fetch_until_script(client, url, [INITIAL_STATE_MARKER], timeout=30)
+        return page.content
 
     @staticmethod
-    async def __extract_data(html: str) -> dict[str, Any]:
-        soup = BeautifulSoup(html, "lxml")
-        scripts = [
-            script for script in soup.find_all("script") if script.text.lstrip().startswith("window.__INITIAL_STATE__")
-        ]
-        if not scripts:
+    async def __extract_data(html: bytes) -> dict[str, Any]:
+        data = extract_embedded_json(html, INITIAL_STATE_MARKER)
+        if not data:
             raise ValueError("No data found")
-        script = scripts[0].text
-        json_data = script.replace("window.__INITIAL_STATE__=", "")
-        json_data = re.sub(r"\bundefined\b", "null", json_data)  # 清理js对象
-        data = json.loads(json_data)
         return cast(dict[str, Any], data)
 
     def __parse(self, data: dict[str, Any]) -> XHSPost:
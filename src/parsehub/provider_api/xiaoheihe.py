@@ -22,6 +22,9 @@ from cryptography.hazmat.primitives.ciphers.base import Cipher
 from cryptography.hazmat.primitives.ciphers.modes import CBC, ECB
 from markdownify import MarkdownConverter
 
+from ..utils.instrumentation import HTTPX_EVENT_HOOKS, span
+from ..utils.offload import run_cpu_bound
+
 
 class XiaoHeiHePostType(Enum):
     VIDEO = "video"
@@ -81,7 +84,7 @@ class XiaoHeiHeAPI:
             text_list = json.loads(text)
             if text_list[0]["type"] == "html":
                 html = text_list[0]["text"]
-                content = XHHConverter(heading_style="ATX").convert(html)
+                content = await run_cpu_bound(_html_to_markdown, html, size=len(html))
             else:
                 content = text_list[0]["text"]
             post_type = XiaoHeiHePostType.IMAGE if use_concept_type else XiaoHeiHePostType.ARTICLE
@@ -135,7 +138,7 @@ class XiaoHeiHeAPI:
             **sig_params,
         }
         cookies = {"x_xhh_tokenid": await SecuritySm.get_d_id()}
-        async with httpx.AsyncClient(proxy=self.proxy) as cli:
+        async with httpx.AsyncClient(proxy=self.proxy, event_hooks=HTTPX_EVENT_HOOKS) as cli:
             result = await cli.get(self.api_url + "/bbs/app/link/tree", params=params, cookies=cookies)
             result.raise_for_status()
             data = result.json()
@@ -198,6 +201,7 @@ class XiaoHeiHeSign:
 
     # ──────────────────── 公开接口 ────────────────────
 
+    @span("sign", cpu=True, platform="xiaoheihe")
     def sign(self, path: str) -> dict[str, str | int]:
         """
         为指定 API 路径生成签名参数
@@ -364,6 +368,10 @@ class XHHConverter(MarkdownConverter):
         return f"![{alt}]({src}{title_part})"
 
 
+def _html_to_markdown(html: str) -> str:
+    return XHHConverter(heading_style="ATX").convert(html)
+
+
 class SecuritySm:
     # FROM https://github.com/YueHen14/skyland-auto-sign/blob/6e7115b5580377c842f50f05b0fa39ab079c17b1/SecuritySm.py
 
@@ -531,7 +539,7 @@ class SecuritySm:
         des_target["tn"] = hashlib.md5(cls.get_tn(des_target).encode()).hexdigest()
 
         des_result = cls._AES(cls.GZIP(cls._DES(des_target)), priId.encode("utf-8"))
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(event_hooks=HTTPX_EVENT_HOOKS) as client:
             response = await client.post(
                 cls.DEVICES_INFO_URL,
                 json={
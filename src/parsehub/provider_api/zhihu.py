@@ -36,9 +36,12 @@ import httpx
 __all__ = ["get_x_zse_96", "ZhihuAPI", "ZhihuQA", "ZhihuZhuanLan", "ZhihuPin", "ZhihuPinType", "ZhihuMedia"]
 
 from bs4 import BeautifulSoup
-from markdown import markdown
 from markdownify import MarkdownConverter
 
+from ..utils.instrumentation import HTTPX_EVENT_HOOKS, span
+from ..utils.offload import run_cpu_bound
+from ..utils.plaintext import markdown_to_text
+
 
 class ZhihuConverter(MarkdownConverter):
     def convert_img(self, el: Any, text: Any, parent_tags: Any) -> str:
@@ -63,7 +66,7 @@ class ZhihuConverter(MarkdownConverter):
 def _zhihu_contenc_fmt(content: str) -> tuple[str, str, list[str]]:
     soup = BeautifulSoup(content, "lxml")
     markdown_content = ZhihuConverter(heading_style="ATX").convert(str(soup))
-    plaintext_content = "".join(BeautifulSoup(markdown(markdown_content), "lxml").find_all(string=True))
+    plaintext_content = markdown_to_text(markdown_content)
     imgs = [
         str(i["src"])
         for i in soup.find_all("img")
@@ -214,24 +217,25 @@ class ZhihuAPI:
         qid, aid = self._get_qa_id(raw_url)
         if aid:
             result = await self._answers(aid)
-            return ZhihuQA.parse(result)
+            return await run_cpu_bound(ZhihuQA.parse, result, size=len(result["content"]))
         result = await self._questions_answers(qid)
         data = result["data"]
         if data:
             result = await self._answers(data[0]["id"])
-            return ZhihuQA.parse(result)
+            return await run_cpu_bound(ZhihuQA.parse, result, size=len(result["content"]))
         result = await self._questions(qid)
         return ZhihuQA(question=result["title"], imgs=[])
 
     async def parse_zl(self, raw_url: str) -> ZhihuZhuanLan:
         zl_id = self._get_zl_id(raw_url)
         result = await self._zl(zl_id)
-        return ZhihuZhuanLan.parse(result)
+        return await run_cpu_bound(ZhihuZhuanLan.parse, result, size=len(result["content"]))
 
     async def parse_pin(self, raw_url: str) -> ZhihuPin:
         pin_id = self._get_pin_id(raw_url)
         result = await self._pin(pin_id)
-        return ZhihuPin.parse(result)
+        size = sum(len(c["content"]) for c in result["content"] if c["type"] == "text")
+        return await run_cpu_bound(ZhihuPin.parse, result, size=size)
 
     async def _questions(self, question_id: int | str) -> dict:
         """获取问题"""
@@ -240,7 +244,7 @@ class ZhihuAPI:
         x_zse_96 = get_x_zse_96(url, query, self.d_c0)
         headers = self.get_headers(x_zse_96)
 
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(event_hooks=HTTPX_EVENT_HOOKS) as client:
             r = await client.get(url, headers=headers, params=query, cookies=self.cookie)
             return dict(r.json())
 
@@ -256,7 +260,7 @@ class ZhihuAPI:
         x_zse_96 = get_x_zse_96(url, query, self.d_c0)
         headers = self.get_headers(x_zse_96)
 
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(event_hooks=HTTPX_EVENT_HOOKS) as client:
             r = await client.get(url, headers=headers, params=query, cookies=self.cookie)
             return dict(r.json())
 
@@ -269,7 +273,7 @@ class ZhihuAPI:
         x_zse_96 = get_x_zse_96(url, query, self.d_c0)
         headers = self.get_headers(x_zse_96)
 
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(event_hooks=HTTPX_EVENT_HOOKS) as client:
             r = await client.get(url, headers=headers, params=query, cookies=self.cookie)
             return dict(r.json())
 
@@ -279,7 +283,7 @@ class ZhihuAPI:
         x_zse_96 = get_x_zse_96(url, query, self.d_c0)
         headers = self.get_headers(x_zse_96)
 
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(event_hooks=HTTPX_EVENT_HOOKS) as client:
             r = await client.get(url, headers=headers, params=query, cookies=self.cookie)
             return dict(r.json())
 
@@ -289,7 +293,7 @@ class ZhihuAPI:
         x_zse_96 = get_x_zse_96(url, query, self.d_c0)
         headers = self.get_headers(x_zse_96)
 
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(event_hooks=HTTPX_EVENT_HOOKS) as client:
             r = await client.get(url, headers=headers, params=query, cookies=self.cookie)
             return dict(r.json())
 
@@ -719,6 +723,7 @@ def encrypt_md5(source, iv=None):
     return zhihu_encrypt(digest, iv=iv)
 
 
+@span("sign", cpu=True, platform="zhihu")
 def get_x_zse_96(url, params, d_c0, body="", x_zst_81=None, iv=None):
     """Compute the full ``x-zse-96`` header value (pure Python, no Node)."""
     if params:
@@ -4,6 +4,8 @@ from urllib.parse import urlparse
 
 import httpx
 
+from ..utils.instrumentation import HTTPX_EVENT_HOOKS
+
 
 class MediaType(Enum):
     VIDEO = "video"
@@ -50,7 +52,7 @@ class ZuiYou:
 
     async def parse(self, url: str) -> ZuiYouPost:
         pid = self.get_id_by_url(url)
-        async with httpx.AsyncClient(proxy=self.proxy) as cli:
+        async with httpx.AsyncClient(proxy=self.proxy, event_hooks=HTTPX_EVENT_HOOKS) as cli:
             result = await cli.post(self.api_url, json={"pid": pid})
         return ZuiYouPost.parse(result.json())
 
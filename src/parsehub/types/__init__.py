@@ -1,4 +1,5 @@
 from ..errors import DownloadError, ParseError
+from ..utils.sink import DownloadSink, FileSink, MemorySink, SinkFactory, StreamSink
 from .callback import ProgressCallback, ProgressUnit
 from .media_file import AniFile, AnyMediaFile, ImageFile, LivePhotoFile, MediaFile, VideoFile
 from .media_ref import AniRef, AnyMediaRef, ImageRef, LivePhotoRef, MediaRef, VideoRef
@@ -7,6 +8,7 @@ from .post import PostType
 from .result import (
     AnyParseResult,
     DownloadResult,
+    DownloadVariant,
     ImageParseResult,
     MultimediaParseResult,
     ParseResult,
@@ -23,6 +25,7 @@ __all__ = [
     "ImageRef",
     "LivePhotoRef",
     "DownloadResult",
+    "DownloadVariant",
     "ParseResult",
     "ImageParseResult",
     "VideoParseResult",
@@ -40,4 +43,9 @@ __all__ = [
     "ProgressCallback",
     "ProgressUnit",
     "PostType",
+    "DownloadSink",
+    "FileSink",
+    "MemorySink",
+    "StreamSink",
+    "SinkFactory",
 ]
@@ -1,7 +1,44 @@
-from dataclasses import dataclass
+import asyncio
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any, Self
 
-from ..utils.media_info import MediaInfoReader
+from loguru import logger
+
+from ..utils.media_info import MediaInfo, MediaInfoReader
+
+
+class LazyMediaInfo:
+    """宽高 / 时长字段: 未提供时不在构造时读取文件, 而是在首次访问或 ``await probe()`` 时读取
+
+    通过 ``lazy_info()`` 声明, 不参与 repr / 比较, 避免打印或比较实例时读取文件
+    """
+
+    def __init__(self, default: int = 0) -> None:
+        self.default = default
+        self.name = ""
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: "MediaFile | None", objtype: type | None = None) -> int:
+        if obj is None:
+            # dataclass 通过类属性取默认值
+            return self.default
+        obj._resolve_info()
+        return obj._raw_info(self.name, self.default)
+
+    def __set__(self, obj: "MediaFile", value: "int | LazyMediaInfo") -> None:
+        if value is self:
+            # 未传入时 dataclass 的默认值即为描述符本身
+            return
+        obj.__dict__[self.name] = value
+
+
+def lazy_info(default: int = 0) -> Any:
+    """声明延迟读取的宽高 / 时长字段"""
+    return field(default=LazyMediaInfo(default), repr=False, compare=False)
 
 
 @dataclass(kw_only=True)
@@ -11,21 +48,78 @@ class MediaFile:
         path: 路径
         width: 宽度
         height: 高度
+        data: 下载到内存 (MemorySink) 时的文件内容, 此时 path 只是文件名
     """
 
     path: str | Path
-    width: int = 0
-    height: int = 0
+    width: int = lazy_info()
+    height: int = lazy_info()
+    data: bytes | None = field(default=None, repr=False)
 
     def __post_init__(self) -> None:
-        if not self.width:
-            info = MediaInfoReader.read(path=self.path)
-            self.width = info.width
-            self.height = info.height
+        self._info_lock = threading.Lock()
+        self._info_resolved = False
+
+    def __getstate__(self) -> dict[str, Any]:
+        # 锁不能 pickle / deepcopy, 复制后重新创建
+        state = self.__dict__.copy()
+        del state["_info_lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._info_lock = threading.Lock()
 
     def exists(self) -> bool:
-        """检查文件是否存在"""
-        return Path(self.path).exists()
+        """检查文件是否存在, 内存中的文件始终存在"""
+        return self.data is not None or Path(self.path).exists()
+
+    async def probe(self) -> Self:
+        """在线程池中读取宽高 / 时长, 避免阻塞事件循环; 已知宽高 / 时长时不读取文件"""
+        if not self._info_resolved:
+            if self._needs_probe():
+                await asyncio.to_thread(self._resolve_info)
+            else:
+                self._info_resolved = True
+        return self
+
+    def _needs_probe(self) -> bool:
+        return not self._raw_info("width")
+
+    def _probe_path(self) -> str | Path:
+        return self.path
+
+    def _probe_data(self) -> bytes | None:
+        return self.data
+
+    def _apply_info(self, info: MediaInfo) -> None:
+        self.width = info.width
+        self.height = info.height
+
+    def _raw_info(self, name: str, default: int = 0) -> int:
+        value: Any = self.__dict__.get(name, default)
+        return int(value)
+
+    def _resolve_info(self) -> None:
+        if self._info_resolved:
+            return
+        with self._info_lock:
+            if self._info_resolved:
+                return
+            if self._needs_probe():
+                data = self._probe_data()
+                try:
+                    info = (
+                        MediaInfoReader.read_bytes(data)
+                        if data is not None
+                        else MediaInfoReader.read(self._probe_path())
+                    )
+                except Exception as e:
+                    # 下载已经完成, 无法识别的文件只是缺少宽高 / 时长, 保留已知的值
+                    logger.opt(exception=e).warning("读取媒体信息失败: {}", self._probe_path())
+                else:
+                    self._apply_info(info)
+            self._info_resolved = True
 
 
 @dataclass(kw_only=True)
@@ -38,14 +132,14 @@ class VideoFile(MediaFile):
         duration: 视频时长，单位: 秒
     """
 
-    duration: int = 0
+    duration: int = lazy_info()
 
-    def __post_init__(self) -> None:
-        if not self.width or not self.duration:
-            info = MediaInfoReader.read(path=self.path)
-            self.width = info.width
-            self.height = info.height
-            self.duration = info.duration
+    def _needs_probe(self) -> bool:
+        return not self._raw_info("width") or not self._raw_info("duration")
+
+    def _apply_info(self, info: MediaInfo) -> None:
+        super()._apply_info(info)
+        self.duration = info.duration
 
 
 @dataclass(kw_only=True)
@@ -68,14 +162,14 @@ class AniFile(MediaFile):
         duration: 视频时长，单位: 秒
     """
 
-    duration: int = 0
+    duration: int = lazy_info()
 
-    def __post_init__(self) -> None:
-        if not self.width or not self.duration:
-            info = MediaInfoReader.read(path=self.path)
-            self.width = info.width
-            self.height = info.height
-            self.duration = info.duration
+    def _needs_probe(self) -> bool:
+        return not self._raw_info("width") or not self._raw_info("duration")
+
+    def _apply_info(self, info: MediaInfo) -> None:
+        super()._apply_info(info)
+        self.duration = info.duration
 
 
 @dataclass(kw_only=True)
@@ -87,17 +181,25 @@ class LivePhotoFile(MediaFile):
         height: 高度
         video_path: 视频路径
         duration: 视频时长，单位: 秒
+        video_data: 视频下载到内存时的内容
     """
 
     video_path: str | Path | None = None
-    duration: int = 3
+    duration: int = lazy_info(3)
+    video_data: bytes | None = field(default=None, repr=False)
 
-    def __post_init__(self) -> None:
-        if not self.width or not self.duration:
-            info = MediaInfoReader.read(path=self.video_path or self.path)
-            self.width = info.width
-            self.height = info.height
-            self.duration = info.duration
+    def _needs_probe(self) -> bool:
+        return not self._raw_info("width") or not self._raw_info("duration", 3)
+
+    def _probe_path(self) -> str | Path:
+        return self.video_path or self.path
+
+    def _probe_data(self) -> bytes | None:
+        return self.video_data if self.video_path else self.data
+
+    def _apply_info(self, info: MediaInfo) -> None:
+        super()._apply_info(info)
+        self.duration = info.duration
 
 
 AnyMediaFile = MediaFile | VideoFile | ImageFile | AniFile | LivePhotoFile
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import shutil
 import time
@@ -5,23 +6,29 @@ from abc import ABC
 from collections.abc import Sequence
 from dataclasses import asdict
 from pathlib import Path
-from typing import Any, ClassVar
+from typing import Any, ClassVar, Literal
 
 import aiofiles
-from bs4 import BeautifulSoup
-from markdown import markdown as md_to_html
 from slugify import slugify
 
 from ..config import GlobalConfig
 from ..errors import DeleteError, DownloadError
-from ..utils.downloader import download
-from ..utils.helpers import run_sync
+from ..utils.adaptive import Connections
+from ..utils.downloader import download_media, memory_data
+from ..utils.helpers import LoopRunner, run_sync
+from ..utils.plaintext import markdown_to_text
+from ..utils.progress import ProgressAggregator
+from ..utils.scheduler import DownloadPriority
+from ..utils.sink import DownloadSink, SinkFactory
 from .callback import ProgressCallback
 from .media_file import AniFile, AnyMediaFile, ImageFile, LivePhotoFile, VideoFile
 from .media_ref import AniRef, AnyMediaRef, ImageRef, LivePhotoRef, VideoRef
 from .platform import Platform
 from .post import PostType
 
+DownloadVariant = Literal["original", "thumb", "preview"]
+"""下载内容: 原文件 / 仅缩略图 / 先下载缩略图并在后台继续下载原文件"""
+
 
 class ParseResult(ABC):  # noqa: B024
     """解析结果基类"""
@@ -50,6 +57,8 @@ class ParseResult(ABC):  # noqa: B024
             self.title or self.content, allow_unicode=True, max_length=50, lowercase=False
         ).strip() or str(time.time_ns())
         """符合路径命名规范的名称, 可用于目录和文件名"""
+        self.runner: LoopRunner | None = None
+        """download_sync 使用的后台事件循环, 由 ParseHub.parse_sync 设置"""
 
     def __repr__(self) -> str:
         media_count = (
@@ -87,7 +96,10 @@ class ParseResult(ABC):  # noqa: B024
         callback_kwargs: dict | None = None,
         proxy: str | None = None,
         headers: dict | None = None,
-        connections: int = 4,
+        connections: Connections = 4,
+        sink: SinkFactory | None = None,
+        rate_limit: float | None = None,
+        variant: DownloadVariant = "original",
     ) -> "DownloadResult":
         """
         执行下载
@@ -97,90 +109,129 @@ class ParseResult(ABC):  # noqa: B024
         :param callback_kwargs: 回调函数的关键字参数
         :param proxy: 代理
         :param headers: 请求头
-        :param connections: 多线程下载连接数, 默认为 4
+        :param connections: 多线程下载连接数, 默认为 4; "auto" 时根据文件大小和吞吐自动调整
+        :param sink: 下载目标工厂, 传入默认保存路径, 返回该文件的下载目标
+        :param rate_limit: 限速 (字节/秒)
+        :param variant: 为 "thumb" 时只下载缩略图
         :return: DownloadResult
         """
         if self.media is None:
             return DownloadResult(output_dir=output_dir, media=[])
-        media_list = list(self.media) if isinstance(self.media, Sequence) else [self.media]
+        media_list: list[AnyMediaRef] = list(self.media) if isinstance(self.media, Sequence) else [self.media]
         is_single = not isinstance(self.media, Sequence)
 
-        result_list: list[AnyMediaFile] = []
-
-        for i, media in enumerate(media_list):
-            dl_progress = None
-            dl_progress_args = ()
-            dl_progress_kwargs: dict = {}
-            if callback and is_single:
-
-                async def _byte_callback(current: int, total: int, *args: Any, **kwargs: Any) -> None:
-                    await callback(current, total, "bytes", *args, **kwargs)
-
-                dl_progress = _byte_callback
-                dl_progress_args = callback_args
-                dl_progress_kwargs = callback_kwargs or {}
+        suffix = ""
+        if variant == "thumb":
+            media_list = [thumb for m in media_list if (thumb := _thumb_ref(m))]
+            suffix = "_thumb"
+            if not media_list:
+                return DownloadResult(output_dir=output_dir, media=[])
 
-            index = i + 1
+        result_list: list[AnyMediaFile] = []
+        count_progress = (
+            ProgressAggregator(callback, args=("count", *callback_args)) if callback and not is_single else None
+        )
 
-            try:
-                save_path = (
-                    output_dir.joinpath(f"{self.name}.{media.ext}")
-                    if is_single
-                    else output_dir.joinpath(f"{index:03d}_{self.name}.{media.ext}")
-                )
-                f = await download(
-                    media.url,
-                    save_path,
-                    headers=headers,
-                    proxy=proxy,
-                    progress=dl_progress,
-                    progress_args=dl_progress_args,
-                    progress_kwargs=dl_progress_kwargs,
-                    connections=connections,
-                )
-            except Exception as e:
-                shutil.rmtree(output_dir, ignore_errors=True)
-                raise DownloadError(f"下载失败: {e}") from e
-
-            mf: AnyMediaFile
-            match media:
-                case ImageRef():
-                    mf = ImageFile(path=f, width=media.width, height=media.height)
-                case VideoRef():
-                    mf = VideoFile(path=f, width=media.width, height=media.height, duration=media.duration)
-                case AniRef():
-                    mf = AniFile(path=f, width=media.width, height=media.height, duration=media.duration)
-                case LivePhotoRef():
-                    mf = LivePhotoFile(path=f, width=media.width, height=media.height, duration=media.duration)
-                    if media.video_url:
-                        try:
-                            save_path = (
-                                output_dir.joinpath(f"{self.name}_video.{media.video_ext}")
-                                if is_single
-                                else output_dir.joinpath(f"{index:03d}_{self.name}_video.{media.video_ext}")
-                            )
-                            vf = await download(
-                                media.video_url,
-                                save_path,
-                                headers=headers,
-                                proxy=proxy,
-                                connections=connections,
-                            )
-                        except Exception as e:
-                            shutil.rmtree(output_dir, ignore_errors=True)
-                            raise DownloadError(f"LivePhoto 视频下载失败: {e}") from e
-                        else:
-                            mf.video_path = vf
-
-            result_list.append(mf)
-
-            if callback and not is_single:
-                await callback(
-                    len(result_list),
-                    len(media_list),
-                    "count",
-                    *callback_args,
-                )
+        try:
+            for i, media in enumerate(media_list):
+                dl_progress = None
+                dl_progress_args = ()
+                dl_progress_kwargs: dict = {}
+                if callback and is_single:
+
+                    async def _byte_callback(current: int, total: int, *args: Any, **kwargs: Any) -> None:
+                        await callback(current, total, "bytes", *args, **kwargs)
+
+                    dl_progress = _byte_callback
+                    dl_progress_args = callback_args
+                    dl_progress_kwargs = callback_kwargs or {}
+
+                index = i + 1
+
+                # LivePhoto 的视频与图片同时下载
+                video_task: asyncio.Task[tuple[str, DownloadSink | None]] | None = None
+                if isinstance(media, LivePhotoRef) and media.video_url:
+                    video_path = (
+                        output_dir.joinpath(f"{self.name}_video.{media.video_ext}")
+                        if is_single
+                        else output_dir.joinpath(f"{index:03d}_{self.name}_video.{media.video_ext}")
+                    )
+                    video_task = asyncio.create_task(
+                        download_media(
+                            media.video_url,
+                            video_path,
+                            sink,
+                            headers=headers,
+                            proxy=proxy,
+                            connections=connections,
+                            rate_limit=rate_limit,
+                        )
+                    )
+
+                try:
+                    save_path = (
+                        output_dir.joinpath(f"{self.name}{suffix}.{media.ext}")
+                        if is_single
+                        else output_dir.joinpath(f"{index:03d}_{self.name}{suffix}.{media.ext}")
+                    )
+                    f, media_sink = await download_media(
+                        media.url,
+                        save_path,
+                        sink,
+                        headers=headers,
+                        proxy=proxy,
+                        progress=dl_progress,
+                        progress_args=dl_progress_args,
+                        progress_kwargs=dl_progress_kwargs,
+                        connections=connections,
+                        priority=_priority(media),
+                        rate_limit=rate_limit,
+                    )
+                except asyncio.CancelledError:
+                    await _cancel(video_task)
+                    raise
+                except Exception as e:
+                    await _cancel(video_task)
+                    shutil.rmtree(output_dir, ignore_errors=True)
+                    raise DownloadError(f"下载失败: {e}") from e
+
+                data = memory_data(media_sink)
+                mf: AnyMediaFile
+                match media:
+                    case ImageRef():
+                        mf = ImageFile(path=f, width=media.width, height=media.height, data=data)
+                    case VideoRef():
+                        mf = VideoFile(
+                            path=f, width=media.width, height=media.height, duration=media.duration, data=data
+                        )
+                    case AniRef():
+                        mf = AniFile(path=f, width=media.width, height=media.height, duration=media.duration, data=data)
+                    case LivePhotoRef():
+                        mf = LivePhotoFile(
+                            path=f, width=media.width, height=media.height, duration=media.duration, data=data
+                        )
+                        if video_task:
+                            try:
+                                vf, video_sink = await video_task
+                            except Exception as e:
+                                shutil.rmtree(output_dir, ignore_errors=True)
+                                raise DownloadError(f"LivePhoto 视频下载失败: {e}") from e
+                            else:
+                                mf.video_path = vf
+                                mf.video_data = memory_data(video_sink)
+
+                # 缺少宽高 / 时长时在线程池中读取, 之后访问属性不会阻塞事件循环
+                await mf.probe()
+                result_list.append(mf)
+
+                if count_progress:
+                    count_progress.update(len(result_list), len(media_list))
+
+            if count_progress:
+                await count_progress.finish()
+        finally:
+            if count_progress:
+                count_progress.cancel()
 
         result_media = result_list[0] if is_single else result_list
         return DownloadResult(result_media, output_dir)
@@ -194,7 +245,10 @@ class ParseResult(ABC):  # noqa: B024
         callback_kwargs: dict | None = None,
         proxy: str | None = None,
         save_metadata: bool = False,
-        connections: int = 4,
+        connections: Connections = 4,
+        sink: SinkFactory | None = None,
+        rate_limit: float | None = None,
+        variant: DownloadVariant = "original",
     ) -> "DownloadResult":
         """
         :param path: 保存路径
@@ -203,7 +257,15 @@ class ParseResult(ABC):  # noqa: B024
         :param callback_kwargs: 回调函数的关键字参数
         :param proxy: 代理
         :param save_metadata: 保存解析结果为 metadata.json, 默认为 False
-        :param connections: 多线程下载连接数, 默认为 4
+        :param connections: 多线程下载连接数, 默认为 4; "auto" 时根据文件大小和吞吐自动调整
+        :param sink: 下载目标工厂, 为空时写入文件; 例如 ``lambda _: MemorySink()`` 下载到内存,
+            结果保存在 MediaFile.data, 此时只有 save_metadata 为 True 才会创建输出目录
+        :param rate_limit: 本次下载的限速 (字节/秒), 同时受 GlobalConfig 中的全局和代理限速约束
+        :param variant: 下载内容, 默认为 "original"
+            - ``original``: 原文件
+            - ``thumb``: 仅下载缩略图, 文件名带 ``_thumb`` 后缀; 没有缩略图的图片使用原图, 视频 / 动图则跳过
+            - ``preview``: 下载缩略图后立即返回, 原文件在后台继续下载到同一目录,
+              通过 ``await result.originals`` 获取; 进度回调只报告原文件的进度
         :return: DownloadResult
 
         Note:
@@ -223,24 +285,54 @@ class ParseResult(ABC):  # noqa: B024
         while output_dir.exists():
             output_dir = save_dir.joinpath(f"{self.name}_{counter}")
             counter += 1
-        output_dir.mkdir(parents=True, exist_ok=True)
+        if sink is None or save_metadata:
+            output_dir.mkdir(parents=True, exist_ok=True)
 
         if save_metadata:
             async with aiofiles.open(output_dir.joinpath("metadata.json"), "w", encoding="utf-8") as f:
                 await f.write(json.dumps(self.to_dict(), ensure_ascii=False, indent=4))
 
         try:
-            return await self._do_download(
+            if variant != "preview":
+                return await self._do_download(
+                    output_dir=output_dir,
+                    callback=callback,
+                    callback_args=callback_args,
+                    callback_kwargs=callback_kwargs,
+                    proxy=proxy,
+                    connections=connections,
+                    sink=sink,
+                    rate_limit=rate_limit,
+                    variant=variant,
+                )
+            preview = await self._do_download(
+                output_dir=output_dir, proxy=proxy, connections=connections, sink=sink, variant="thumb"
+            )
+        except Exception as e:
+            shutil.rmtree(output_dir, ignore_errors=True)
+            raise e
+
+        preview.originals = asyncio.create_task(
+            self._download_originals(
                 output_dir=output_dir,
                 callback=callback,
                 callback_args=callback_args,
                 callback_kwargs=callback_kwargs,
                 proxy=proxy,
                 connections=connections,
+                sink=sink,
+                rate_limit=rate_limit,
             )
-        except Exception as e:
+        )
+        return preview
+
+    async def _download_originals(self, *, output_dir: Path, **kwargs: Any) -> "DownloadResult":
+        """preview 模式的后台原文件下载; 失败时与普通下载一样清理输出目录 (包括已下载的缩略图)"""
+        try:
+            return await self._do_download(output_dir=output_dir, **kwargs)
+        except Exception:
             shutil.rmtree(output_dir, ignore_errors=True)
-            raise e
+            raise
 
     def download_sync(
         self,
@@ -251,7 +343,10 @@ class ParseResult(ABC):  # noqa: B024
         callback_kwargs: dict | None = None,
         proxy: str | None = None,
         save_metadata: bool = False,
-        connections: int = 4,
+        connections: Connections = 4,
+        sink: SinkFactory | None = None,
+        rate_limit: float | None = None,
+        variant: Literal["original", "thumb"] = "original",
     ) -> "DownloadResult":
         """
         :param path: 保存路径
@@ -260,7 +355,11 @@ class ParseResult(ABC):  # noqa: B024
         :param callback_kwargs: 回调函数的关键字参数
         :param proxy: 代理
         :param save_metadata: 保存解析结果为 metadata.json, 默认为 False
-        :param connections: 多线程下载连接数, 默认为 4
+        :param connections: 多线程下载连接数, 默认为 4; "auto" 时根据文件大小和吞吐自动调整
+        :param sink: 下载目标工厂, 为空时写入文件; 例如 ``lambda _: MemorySink()`` 下载到内存,
+            结果保存在 MediaFile.data, 此时只有 save_metadata 为 True 才会创建输出目录
+        :param rate_limit: 本次下载的限速 (字节/秒), 同时受 GlobalConfig 中的全局和代理限速约束
+        :param variant: "original" 下载原文件, "thumb" 仅下载缩略图; 同步接口不支持后台下载的 "preview"
         :return: DownloadResult
 
         Note:
@@ -283,7 +382,11 @@ class ParseResult(ABC):  # noqa: B024
                 proxy=proxy,
                 save_metadata=save_metadata,
                 connections=connections,
-            )
+                sink=sink,
+                rate_limit=rate_limit,
+                variant=variant,
+            ),
+            self.runner,
         )
 
 
@@ -339,6 +442,7 @@ class RichTextParseResult(ParseResult):
     """图文混排的文章"""
 
     type = PostType.RICHTEXT
+    _plaintext_cache: tuple[str, str] | None = None
 
     def __init__(
         self,
@@ -375,8 +479,11 @@ class RichTextParseResult(ParseResult):
 
     @property
     def plaintext_content(self) -> str:
-        """从 markdown 转换为纯文本"""
-        return "".join(BeautifulSoup(md_to_html(self.markdown_content), "lxml").find_all(string=True)).strip()
+        """从 markdown 转换为纯文本, 结果按 markdown_content 缓存, 修改正文后重新转换"""
+        cached = self._plaintext_cache
+        if cached is None or cached[0] != self.markdown_content:
+            cached = self._plaintext_cache = (self.markdown_content, markdown_to_text(self.markdown_content).strip())
+        return cached[1]
 
 
 class DownloadResult:
@@ -388,8 +495,21 @@ class DownloadResult:
         """
         self.media = media
         self.output_dir = Path(output_dir).resolve()
+        self.originals: asyncio.Task[DownloadResult] | None = None
+        """preview 模式下后台下载原文件的任务"""
+
+    async def probe(self) -> "DownloadResult":
+        """在线程池中并发读取全部媒体的宽高 / 时长, 之后访问这些属性不再阻塞事件循环"""
+        media = self.media if isinstance(self.media, Sequence) else [self.media]
+        await asyncio.gather(*(m.probe() for m in media))
+        return self
 
     def delete(self) -> None:
+        if self.originals is not None:
+            self.originals.cancel()
+        if not self.output_dir.exists():
+            # 下载到内存等情况不会创建输出目录
+            return
         try:
             shutil.rmtree(self.output_dir)
         except Exception as e:
@@ -402,4 +522,30 @@ class DownloadResult:
         return f"{self.__class__.__name__}(media={media_count}, output_dir={self.output_dir})"
 
 
+def _priority(media: AnyMediaRef) -> DownloadPriority:
+    """图片先于视频获得下载连接"""
+    match media:
+        case ImageRef() | LivePhotoRef():
+            return DownloadPriority.IMAGE
+        case VideoRef():
+            return DownloadPriority.VIDEO
+    return DownloadPriority.DEFAULT
+
+
+def _thumb_ref(media: AnyMediaRef) -> ImageRef | None:
+    """缩略图; 没有缩略图的图片直接使用原图, 视频 / 动图则跳过"""
+    if media.thumb_url:
+        return ImageRef(url=media.thumb_url)
+    if isinstance(media, ImageRef | LivePhotoRef):
+        return ImageRef(url=media.url, ext=media.ext, width=media.width, height=media.height)
+    return None
+
+
+async def _cancel(task: asyncio.Task[Any] | None) -> None:
+    if task is None:
+        return
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
 AnyParseResult = VideoParseResult | ImageParseResult | MultimediaParseResult | RichTextParseResult
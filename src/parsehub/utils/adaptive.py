@@ -0,0 +1,153 @@
+"""自适应分片连接数 (``connections="auto"``)
+
+初始连接数由文件大小和该 host 的历史最佳值决定; 下载过程中每隔一段时间统计总吞吐,
+吞吐仍在上升时再开一个连接 (从剩余最多的分片中分走后半段), 吞吐不再上升或服务端返回 429 / 503 时停止增加,
+并把这次的最佳连接数记录下来供同一 host 的后续下载使用。
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Literal
+from urllib.parse import urlsplit
+
+from .cache import TTLCache
+
+Connections = int | Literal["auto"]
+"""下载连接数, ``"auto"`` 表示自适应"""
+
+AUTO_MIN_SEGMENT = 1024 * 1024
+"""自适应模式下每个连接至少负责的字节数"""
+AUTO_MAX_CONNECTIONS = 16
+AUTO_DEFAULT_CONNECTIONS = 2
+SAMPLE_INTERVAL = 0.5
+"""吞吐采样间隔 (秒)"""
+
+_HOST_HISTORY: TTLCache[str, int] = TTLCache(maxsize=512, ttl=6 * 3600)
+
+
+@dataclass(slots=True)
+class Segment:
+    start: int
+    """下一个待写入的位置"""
+    end: int
+    """结束位置 (包含), 被其他连接分走后半段时会缩短"""
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.end - self.start + 1)
+
+
+class AdaptiveSplitter:
+    """分配分片并决定何时增加连接"""
+
+    def __init__(
+        self,
+        url: str,
+        total_size: int,
+        *,
+        min_segment: int = AUTO_MIN_SEGMENT,
+        max_connections: int = AUTO_MAX_CONNECTIONS,
+        growth: float = 1.1,
+    ) -> None:
+        """
+        :param url: 下载链接, 按 host 记录历史
+        :param total_size: 文件大小
+        :param min_segment: 每个连接至少负责的字节数
+        :param max_connections: 最大连接数
+        :param growth: 新增连接后吞吐至少提升的比例, 否则视为已达上限
+        """
+        self.host = host_of(url)
+        self.total_size = total_size
+        self.min_segment = max(1, min_segment)
+        self.max_connections = max(1, max_connections)
+        self.growth = growth
+
+        self.initial = max(1, min(history(url) or AUTO_DEFAULT_CONNECTIONS, self._max_by_size()))
+        size = -(-total_size // self.initial)
+        self.segments = [Segment(start, min(start + size, total_size) - 1) for start in range(0, total_size, size)]
+        self._pending = list(self.segments[1:])
+
+        self.received = 0
+        self.workers = 0
+        self.peak = 0
+        self.throttled = False
+        self.plateaued = False
+        self.starting: set[asyncio.Task[None]] = set()
+        """已创建但还在等待连接名额的连接"""
+        self._last_rate: float | None = None
+        self._sample = (time.monotonic(), 0)
+
+    @property
+    def has_work(self) -> bool:
+        return any(segment.remaining for segment in self.segments)
+
+    def enter(self) -> None:
+        self.workers += 1
+        self.peak = max(self.peak, self.workers)
+
+    def leave(self) -> None:
+        self.workers -= 1
+
+    def next_segment(self) -> Segment | None:
+        """待下载的分片; 没有时从剩余最多的分片中分走后半段"""
+        while self._pending:
+            segment = self._pending.pop(0)
+            if segment.remaining:
+                return segment
+        return self._steal()
+
+    def give_back(self, segment: Segment) -> None:
+        """被限流的连接退出, 剩余部分交给其他连接"""
+        if segment.remaining:
+            self._pending.append(segment)
+
+    def should_grow(self) -> bool:
+        """根据上一个采样周期的吞吐判断是否再开一个连接"""
+        now = time.monotonic()
+        started, received = self._sample
+        self._sample = (now, self.received)
+        if self.throttled or self.plateaued or self.workers >= self.max_connections or self.starting:
+            return False
+        if not self._can_split():
+            return False
+        rate = (self.received - received) / max(now - started, 1e-6)
+        if self._last_rate is not None and rate < self._last_rate * self.growth:
+            self.plateaued = True
+            return False
+        self._last_rate = rate
+        return True
+
+    def record(self) -> None:
+        """记录本次的最佳连接数: 最后一次增加的连接没有带来提升或触发限流时不计入"""
+        if not self.peak:
+            return
+        best = self.peak - 1 if self.throttled or self.plateaued else self.peak
+        _HOST_HISTORY.set(self.host, max(1, best))
+
+    def _max_by_size(self) -> int:
+        return max(1, min(self.max_connections, self.total_size // self.min_segment))
+
+    def _can_split(self) -> bool:
+        return any(segment.remaining for segment in self._pending) or any(
+            segment.remaining >= 2 * self.min_segment for segment in self.segments
+        )
+
+    def _steal(self) -> Segment | None:
+        donor = max(self.segments, key=lambda segment: segment.remaining, default=None)
+        if donor is None or donor.remaining < 2 * self.min_segment:
+            return None
+        middle = donor.start + donor.remaining // 2
+        segment = Segment(middle, donor.end)
+        donor.end = middle - 1
+        self.segments.append(segment)
+        return segment
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+def history(url: str) -> int | None:
+    """该 host 的历史最佳连接数"""
+    return _HOST_HISTORY.get(host_of(url))
@@ -1,19 +1,25 @@
 import asyncio
+import contextlib
 import math
-import os
 import re
-import shutil
-import uuid
+from collections import deque
 from collections.abc import Awaitable, Callable, Mapping
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 from urllib.parse import unquote, urlparse
 
-import aiofiles
 import httpx
 
-from ..errors import DownloadError
+from ..config import GlobalConfig
+from ..errors import DownloadError, SinkError
+from .adaptive import AUTO_MAX_CONNECTIONS, AUTO_MIN_SEGMENT, SAMPLE_INTERVAL, AdaptiveSplitter, Connections, Segment
+from .instrumentation import count, host_of, span
+from .progress import ProgressAggregator
+from .ratelimit import rate_limit_for
+from .scheduler import DownloadPriority, DownloadScheduler, default_scheduler
+from .sink import DownloadSink, FileSink, MemorySink, SinkFactory
+from .writer import DEFAULT_BUFFER_SIZE
 
 ProgressCallback = Callable[..., Awaitable[None]]
 
@@ -25,6 +31,15 @@ class RangeProbe:
     etag: str | None = None
     last_modified: str | None = None
     content_encoding: str | None = None
+    reusable: bool = False
+    """首个响应是否包含完整文件内容, 可直接作为单连接下载继续读取"""
+
+    @property
+    def if_range(self) -> str | None:
+        """后续分片请求的 If-Range 校验值, 弱 ETag 不能用于 If-Range"""
+        if self.etag and not self.etag.startswith("W/"):
+            return self.etag
+        return self.last_modified
 
 
 @dataclass(frozen=True, slots=True)
@@ -32,7 +47,6 @@ class RangePart:
     index: int
     start: int
     end: int
-    path: Path
 
     @property
     def size(self) -> int:
@@ -56,9 +70,16 @@ class SegmentDownloader:
         progress_kwargs: dict[str, Any] | None = None,
         max_retries: int = 3,
         chunk_size: int = 64 * 1024,
-        connections: int = 4,
+        connections: Connections = 4,
         min_split_size: int = 10 * 1024 * 1024,
         timeout: float | httpx.Timeout | None = None,
+        progress_interval: float | None = None,
+        progress_min_delta: int = 0,
+        write_buffer_size: int = DEFAULT_BUFFER_SIZE,
+        sink: DownloadSink | None = None,
+        priority: int = DownloadPriority.DEFAULT,
+        scheduler: DownloadScheduler | None = None,
+        rate_limit: float | None = None,
     ):
         self.url = url
         self.save_path = save_path
@@ -69,26 +90,59 @@ class SegmentDownloader:
         self.progress_kwargs = progress_kwargs or {}
         self.max_retries = max(0, max_retries)
         self.chunk_size = max(1, chunk_size)
-        self.connections = max(1, connections)
-        self.min_split_size = max(1, min_split_size)
+        self.auto = connections == "auto"
+        self.connections = AUTO_MAX_CONNECTIONS if connections == "auto" else max(1, connections)
+        self.min_split_size = AUTO_MIN_SEGMENT * 2 if self.auto else max(1, min_split_size)
         self.timeout = timeout
-
-        self.resolved_path: Path | None = None
-        self.temp_dir: Path | None = None
-        self.complete_path: Path | None = None
-        self._progress_lock = asyncio.Lock()
+        self.write_buffer_size = write_buffer_size
+        self.sink = sink or FileSink(save_path)
+        self.priority = priority
+        self.scheduler = scheduler or default_scheduler
+        self.rate_limit = rate_limit_for(proxy, rate_limit)
+
+        self._progress = (
+            ProgressAggregator(
+                progress,
+                args=progress_args,
+                kwargs=self.progress_kwargs,
+                min_interval=progress_interval,
+                min_delta=progress_min_delta,
+            )
+            if progress
+            else None
+        )
         self._downloaded = 0
         self._part_downloaded: dict[int, int] = {}
+        self._host = host_of(url)
+        self._received = 0
+        """所有尝试累计收到的字节数"""
+        self._if_range: str | None = None
 
     async def run(self) -> str:
+        """
+        :return: DownloadSink.commit 的返回值, 写入文件时为文件路径
+        """
+        try:
+            with span("download", host=self._host):
+                return await self._run_with_retries()
+        except BaseException as e:
+            await self.sink.fail(e)
+            raise
+        finally:
+            if self._progress:
+                self._progress.cancel()
+            if self._received:
+                count("download_bytes", self._received, host=self._host)
+
+    async def _run_with_retries(self) -> str:
         last_error: Exception | None = None
         for attempt in range(self.max_retries + 1):
             self._reset_progress()
             try:
-                async with self._client() as client:
-                    self.resolved_path = await self._resolve_path(client)
-                    await self._download_once(client)
-                    return str(self.resolved_path)
+                async with self.scheduler.connection(self.url, self.priority):
+                    return await self._download_once(self.scheduler.client(self.proxy))
+            except SinkError:
+                raise
             except DownloadError as e:
                 last_error = e
                 if attempt == self.max_retries:
@@ -106,168 +160,207 @@ class SegmentDownloader:
                 if attempt == self.max_retries:
                     raise DownloadError(f"下载失败: {e}") from e
 
+            count("download_retries", host=self._host, scope="file")
             await asyncio.sleep(2**attempt)
 
         raise DownloadError(f"达到最大重试次数，下载失败: {last_error}")
 
-    def _client(self) -> httpx.AsyncClient:
-        limits = httpx.Limits(
-            max_connections=max(self.connections + 2, 10),
-            max_keepalive_connections=max(self.connections, 1),
-        )
-        kwargs: dict[str, Any] = {
-            "headers": self.headers,
-            "proxy": self.proxy,
-            "limits": limits,
-        }
-        if self.timeout is not None:
-            kwargs["timeout"] = self.timeout
-        return httpx.AsyncClient(**kwargs)
-
-    async def _resolve_path(self, client: httpx.AsyncClient) -> Path:
-        save_dir, filename = _parse_save_path(self.save_path)
-        if not filename:
-            filename = await get_filename_by_url(self.url, client)
-        if not filename:
-            raise DownloadError("无法获取文件名")
-
-        resolved_path = save_dir.joinpath(filename)
-        resolved_path.parent.mkdir(parents=True, exist_ok=True)
-        return resolved_path
-
-    async def _download_once(self, client: httpx.AsyncClient) -> None:
-        resolved_path = self._require_resolved_path()
-        self._prepare_temp_dir(resolved_path)
+    @property
+    def _timeout(self) -> float | httpx.Timeout | Any:
+        return self.timeout if self.timeout is not None else httpx.USE_CLIENT_DEFAULT
+
+    def _filename(self, response: httpx.Response) -> str | None:
+        if response.is_success and (filename := _filename_from_headers(response.headers)):
+            return filename
+        return _filename_from_url(self.url)
+
+    async def _download_once(self, client: httpx.AsyncClient) -> str:
+        """
+        首个请求直接携带 ``Range: bytes=0-``, 文件名 / 大小 / ETag 都从它的响应头获取, 响应体继续作为第一个分片
+        (或服务端返回 200 时作为整个文件) 读取, 不再单独发送 HEAD 和探测请求
+        """
+        response = await self._open_first_response(client)
         try:
-            probe = await self._probe(client)
+            probe = self._probe(response)
+            filename = self._filename(response)
+            await self.sink.open(filename, probe.total_size)
+            self._if_range = probe.if_range
             if self._should_use_multipart(probe):
                 try:
-                    await self._download_multipart(client, probe.total_size or 0)
+                    await self._download_multipart(client, probe.total_size or 0, response)
                 except FallbackToSingle:
-                    self._cleanup_temp_dir()
+                    count("download_fallback_single", host=self._host)
+                    await response.aclose()
+                    await self.sink.discard()
                     self._reset_progress()
-                    self._prepare_temp_dir(resolved_path)
+                    await self.sink.open(filename, probe.total_size)
                     await self._download_single(client, probe.total_size)
+            elif probe.reusable:
+                await self._write_single(response, probe.total_size)
             else:
+                await response.aclose()
                 await self._download_single(client, probe.total_size)
 
-            os.replace(self._require_complete_path(), resolved_path)
+            return await self.sink.commit()
         except BaseException:
-            self._cleanup_temp_dir()
+            await self.sink.discard()
             raise
         finally:
-            self._cleanup_temp_dir()
-
-    async def _probe(self, client: httpx.AsyncClient) -> RangeProbe:
-        total_size: int | None = None
-        etag: str | None = None
-        last_modified: str | None = None
-        content_encoding: str | None = None
-
-        try:
-            response = await client.head(
-                self.url,
-                headers=self._headers({"Accept-Encoding": "identity"}),
-                follow_redirects=True,
-            )
-            if response.status_code < 400:
-                total_size = _parse_int(response.headers.get("Content-Length"))
-                etag = response.headers.get("ETag")
-                last_modified = response.headers.get("Last-Modified")
-                content_encoding = response.headers.get("Content-Encoding")
-        except httpx.HTTPError:
-            pass
-
-        if self.connections <= 1 or (total_size is not None and total_size < self.min_split_size):
-            return RangeProbe(False, total_size, etag, last_modified, content_encoding)
-        if _has_non_identity_encoding(content_encoding):
-            return RangeProbe(False, total_size, etag, last_modified, content_encoding)
-
-        try:
-            response = await client.get(
-                self.url,
-                headers=self._headers({"Accept-Encoding": "identity", "Range": "bytes=0-0"}),
-                follow_redirects=True,
-            )
-        except httpx.HTTPError:
-            return RangeProbe(False, total_size, etag, last_modified, content_encoding)
-
-        response_encoding = response.headers.get("Content-Encoding")
-        if _has_non_identity_encoding(response_encoding):
-            return RangeProbe(False, total_size, etag, last_modified, response_encoding)
-
-        if response.status_code == 206:
+            await response.aclose()
+
+    async def _open_first_response(self, client: httpx.AsyncClient) -> httpx.Response:
+        extra = {"Accept-Encoding": "identity"}
+        if self.connections > 1:
+            extra["Range"] = "bytes=0-"
+        request = client.build_request("GET", self.url, headers=self._headers(extra), timeout=self._timeout)
+        return await client.send(request, stream=True, follow_redirects=True)
+
+    def _probe(self, response: httpx.Response) -> RangeProbe:
+        """根据首个响应判断是否支持分片, 以及响应体能否直接作为完整文件读取"""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        content_encoding = response.headers.get("Content-Encoding")
+        identity = not _has_non_identity_encoding(content_encoding)
+
+        if response.status_code == 206 and identity:
             parsed_range = _parse_content_range(response.headers.get("Content-Range", ""))
             if parsed_range:
                 start, end, range_total = parsed_range
-                if start == 0 and end == 0 and range_total and range_total > 0:
-                    return RangeProbe(True, range_total, etag, last_modified, response_encoding)
+                if start == 0 and range_total:
+                    # 部分服务端会截断开放区间, 此时响应体只能作为第一个分片的开头
+                    reusable = end == range_total - 1
+                    return RangeProbe(True, range_total, etag, last_modified, content_encoding, reusable=reusable)
         if response.status_code == 200:
-            probed_size = _parse_int(response.headers.get("Content-Length"))
-            return RangeProbe(False, probed_size or total_size, etag, last_modified, response_encoding)
+            total_size = _parse_int(response.headers.get("Content-Length")) if identity else None
+            return RangeProbe(False, total_size, etag, last_modified, content_encoding, reusable=True)
         if response.status_code == 416:
             parsed_range = _parse_content_range(response.headers.get("Content-Range", ""))
-            range_total = parsed_range[2] if parsed_range else total_size
-            return RangeProbe(False, range_total, etag, last_modified, response_encoding)
+            range_total = parsed_range[2] if parsed_range else None
+            return RangeProbe(False, range_total, etag, last_modified, content_encoding)
+        if response.is_error and "Range" not in response.request.headers:
+            response.raise_for_status()
 
-        return RangeProbe(False, total_size, etag, last_modified, response_encoding or content_encoding)
+        # 携带 Range 的请求失败或返回了无法识别的分片时, 由不带 Range 的普通请求重新下载
+        return RangeProbe(False, None, etag, last_modified, content_encoding)
 
     async def _download_single(self, client: httpx.AsyncClient, total_size: int | None) -> None:
-        complete_path = self._require_complete_path()
         async with client.stream(
             "GET",
             self.url,
             headers=self._headers({"Accept-Encoding": "identity"}),
             follow_redirects=True,
+            timeout=self._timeout,
         ) as response:
-            response.raise_for_status()
-            content_encoding = response.headers.get("Content-Encoding")
-            response_total = _parse_int(response.headers.get("Content-Length"))
-            expected_size = response_total if not _has_non_identity_encoding(content_encoding) else None
-            total = expected_size or total_size or 0
-            current = 0
-
-            async with aiofiles.open(complete_path, "wb") as f:
-                async for chunk in response.aiter_bytes(chunk_size=self.chunk_size):
-                    if not chunk:
-                        continue
-                    await f.write(chunk)
-                    current += len(chunk)
-                    await self._report_single(current, total)
+            await self._write_single(response, total_size)
+
+    async def _write_single(self, response: httpx.Response, total_size: int | None) -> None:
+        response.raise_for_status()
+        content_encoding = response.headers.get("Content-Encoding")
+        response_total = _parse_int(response.headers.get("Content-Length"))
+        expected_size = response_total if not _has_non_identity_encoding(content_encoding) else None
+        total = expected_size or total_size or 0
+        current = 0
+
+        async with self.sink.writer(0, buffer_size=self.write_buffer_size) as f:
+            async for chunk in response.aiter_bytes(chunk_size=self.chunk_size):
+                if not chunk:
+                    continue
+                await f.write(chunk)
+                current += len(chunk)
+                self._received += len(chunk)
+                self._report_single(current, total)
+                await self.rate_limit.consume(len(chunk))
 
         if expected_size is not None and current != expected_size:
             raise DownloadError(f"下载不完整: 期望 {expected_size} 字节, 实际 {current} 字节")
         await self._report_finish(total)
 
-    async def _download_multipart(self, client: httpx.AsyncClient, total_size: int) -> None:
-        temp_dir = self._require_temp_dir()
-        parts_dir = temp_dir.joinpath("parts")
-        parts_dir.mkdir(parents=True, exist_ok=True)
-        parts = self._build_parts(total_size, parts_dir)
-        tasks = [asyncio.create_task(self._download_part(client, part, total_size)) for part in parts]
+    async def _download_multipart(
+        self, client: httpx.AsyncClient, total_size: int, first_response: httpx.Response
+    ) -> None:
+        # 各分片按偏移量直接写入同一个目标, 无需合并
+        await self.sink.reserve(total_size)
+        if self.auto:
+            await self._download_adaptive(client, total_size, first_response)
+            return
+        parts = self._build_parts(total_size)
+        pending = deque(parts[1:])
+        # 还在等待连接名额的连接; 本次下载已持有的名额会依次下载剩余分片, 不依赖其他名额, 不会互相等待
+        waiting: set[asyncio.Task[None]] = set()
+        tasks = {asyncio.create_task(self._download_first_part(client, parts[0], total_size, first_response, pending))}
+        for _ in parts[1:]:
+            task = asyncio.create_task(self._download_extra_parts(client, pending, total_size, waiting))
+            waiting.add(task)
+            tasks.add(task)
 
         try:
-            await asyncio.gather(*tasks)
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.discard(task)
+                    if task in waiting:
+                        # 等待名额时被取消
+                        waiting.discard(task)
+                        continue
+                    task.result()
+                if not pending:
+                    # 分片都已被领取, 还在等待名额的连接没有工作可做
+                    for task in waiting:
+                        task.cancel()
         except BaseException:
             for task in tasks:
                 task.cancel()
             await asyncio.gather(*tasks, return_exceptions=True)
             raise
 
-        await self._merge_parts(parts, total_size)
         await self._report_finish(total_size)
 
+    async def _download_first_part(
+        self,
+        client: httpx.AsyncClient,
+        part: RangePart,
+        total_size: int,
+        response: httpx.Response,
+        pending: deque[RangePart],
+    ) -> None:
+        """第一个分片直接读取首个响应 (覆盖整个文件), 读够分片大小后断开; 中途失败时按普通分片重新下载
+
+        之后使用本次下载已持有的名额继续领取其他连接还未领取的分片, 同一 host 名额不足时退化为更少的连接
+        """
+        try:
+            await self._write_part(part, response, total_size)
+            retry = False
+        except (httpx.TransportError, DownloadError):
+            retry = True
+        finally:
+            await response.aclose()
+        if retry:
+            await self._download_part(client, part, total_size)
+        while pending:
+            await self._download_part(client, pending.popleft(), total_size)
+
+    async def _download_extra_parts(
+        self,
+        client: httpx.AsyncClient,
+        pending: deque[RangePart],
+        total_size: int,
+        waiting: set[asyncio.Task[None]],
+    ) -> None:
+        """额外的连接占用一个连接名额, 名额不足时等待; 获得名额后领取还未下载的分片"""
+        async with self.scheduler.connection(self.url, self.priority):
+            if task := asyncio.current_task():
+                waiting.discard(task)
+            while pending:
+                await self._download_part(client, pending.popleft(), total_size)
+
     async def _download_part(self, client: httpx.AsyncClient, part: RangePart, total_size: int) -> None:
         for attempt in range(self.max_retries + 1):
-            received = 0
             try:
-                if part.path.exists():
-                    part.path.unlink()
+                extra = {"Accept-Encoding": "identity", "Range": f"bytes={part.start}-{part.end}"}
+                if self._if_range:
+                    extra["If-Range"] = self._if_range
                 async with client.stream(
-                    "GET",
-                    self.url,
-                    headers=self._headers({"Accept-Encoding": "identity", "Range": f"bytes={part.start}-{part.end}"}),
-                    follow_redirects=True,
+                    "GET", self.url, headers=self._headers(extra), follow_redirects=True, timeout=self._timeout
                 ) as response:
                     if response.status_code == 200:
                         raise FallbackToSingle
@@ -277,18 +370,153 @@ class SegmentDownloader:
                     if _has_non_identity_encoding(response.headers.get("Content-Encoding")):
                         raise FallbackToSingle
                     self._validate_part_response(part, response.headers, total_size)
+                    await self._write_part(part, response, total_size)
+                return
+            except FallbackToSingle:
+                raise
+            except httpx.HTTPStatusError as e:
+                if attempt == self.max_retries or not _is_retryable_status(e.response.status_code):
+                    raise DownloadError(f"分片下载失败: HTTP {e.response.status_code}") from e
+            except (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError, httpx.ReadError) as e:
+                if attempt == self.max_retries:
+                    raise DownloadError(f"分片网络错误: {e}") from e
+            except DownloadError:
+                if attempt == self.max_retries:
+                    raise
+            count("download_retries", host=self._host, scope="range")
+            await asyncio.sleep(2**attempt)
+
+    async def _write_part(self, part: RangePart, response: httpx.Response, total_size: int) -> None:
+        """写入分片, 响应体超出分片范围的部分会被丢弃"""
+        received = 0
+        async with self.sink.writer(part.start, buffer_size=self.write_buffer_size) as f:
+            async for chunk in response.aiter_bytes(chunk_size=self.chunk_size):
+                if not chunk:
+                    continue
+                chunk = chunk[: part.size - received]
+                await f.write(chunk)
+                received += len(chunk)
+                self._received += len(chunk)
+                self._report_part(part.index, received, total_size)
+                await self.rate_limit.consume(len(chunk))
+                if received >= part.size:
+                    break
+
+        if received != part.size:
+            raise DownloadError(f"分片大小不匹配: 期望 {part.size} 字节, 实际 {received} 字节")
+
+    async def _download_adaptive(
+        self, client: httpx.AsyncClient, total_size: int, first_response: httpx.Response
+    ) -> None:
+        splitter = AdaptiveSplitter(self.url, total_size, max_connections=self.connections)
+        tasks = {asyncio.create_task(self._adaptive_first_worker(client, splitter, first_response))}
+
+        def spawn(*, job_slot: bool = False) -> None:
+            task = asyncio.create_task(self._adaptive_worker(client, splitter, job_slot=job_slot))
+            if not job_slot:
+                splitter.starting.add(task)
+            tasks.add(task)
+
+        for _ in range(splitter.initial - 1):
+            spawn()
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(tasks, timeout=SAMPLE_INTERVAL, return_when=asyncio.FIRST_EXCEPTION)
+                for task in done:
+                    tasks.discard(task)
+                    if task in splitter.starting:
+                        # 等待名额时被取消
+                        splitter.starting.discard(task)
+                        continue
+                    task.result()
+                if not splitter.has_work:
+                    # 还在等待连接名额的连接已经没有工作可做
+                    for task in tasks & splitter.starting:
+                        task.cancel()
+                elif tasks <= splitter.starting:
+                    # 没有正在下载的连接 (都被限流退出), 由本次下载已持有的名额继续
+                    spawn(job_slot=True)
+                elif splitter.should_grow():
+                    spawn()
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            splitter.record()
 
-                    async with aiofiles.open(part.path, "wb") as f:
-                        async for chunk in response.aiter_bytes(chunk_size=self.chunk_size):
-                            if not chunk:
-                                continue
-                            await f.write(chunk)
-                            received += len(chunk)
-                            await self._report_part(part.index, received, total_size)
+        if splitter.received != total_size:
+            raise DownloadError(f"文件大小不匹配: 期望 {total_size} 字节, 实际 {splitter.received} 字节")
+        await self._report_finish(total_size)
 
-                if received != part.size:
-                    raise DownloadError(f"分片大小不匹配: 期望 {part.size} 字节, 实际 {received} 字节")
+    async def _adaptive_first_worker(
+        self, client: httpx.AsyncClient, splitter: AdaptiveSplitter, response: httpx.Response
+    ) -> None:
+        """第一个连接沿用首个响应 (已持有连接名额), 之后继续领取分片"""
+        segment = splitter.segments[0]
+        splitter.enter()
+        try:
+            try:
+                await self._write_segment(splitter, segment, response)
+            except (httpx.TransportError, DownloadError):
+                pass
+            finally:
+                await response.aclose()
+            await self._adaptive_loop(client, splitter, segment if segment.remaining else None)
+        finally:
+            splitter.leave()
+
+    async def _adaptive_worker(
+        self, client: httpx.AsyncClient, splitter: AdaptiveSplitter, *, job_slot: bool = False
+    ) -> None:
+        async with contextlib.AsyncExitStack() as stack:
+            if not job_slot:
+                await stack.enter_async_context(self.scheduler.connection(self.url, self.priority))
+                if task := asyncio.current_task():
+                    splitter.starting.discard(task)
+            splitter.enter()
+            try:
+                await self._adaptive_loop(client, splitter)
+            finally:
+                splitter.leave()
+
+    async def _adaptive_loop(
+        self, client: httpx.AsyncClient, splitter: AdaptiveSplitter, segment: Segment | None = None
+    ) -> None:
+        while segment is not None or (segment := splitter.next_segment()) is not None:
+            if not await self._download_segment(client, splitter, segment):
+                # 被限流, 剩余部分交给其他连接
+                splitter.give_back(segment)
                 return
+            segment = None
+
+    async def _download_segment(self, client: httpx.AsyncClient, splitter: AdaptiveSplitter, segment: Segment) -> bool:
+        """下载分片直到完成; 被限流且还有其他连接时返回 False"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                extra = {"Accept-Encoding": "identity", "Range": f"bytes={segment.start}-{segment.end}"}
+                if self._if_range:
+                    extra["If-Range"] = self._if_range
+                async with client.stream(
+                    "GET", self.url, headers=self._headers(extra), follow_redirects=True, timeout=self._timeout
+                ) as response:
+                    if response.status_code in (429, 503):
+                        splitter.throttled = True
+                        if splitter.workers > 1:
+                            return False
+                    if response.status_code == 200:
+                        raise FallbackToSingle
+                    response.raise_for_status()
+                    if response.status_code != 206:
+                        raise DownloadError(f"分片下载失败: HTTP {response.status_code}")
+                    if _has_non_identity_encoding(response.headers.get("Content-Encoding")):
+                        raise FallbackToSingle
+                    parsed_range = _parse_content_range(response.headers.get("Content-Range", ""))
+                    if not parsed_range or parsed_range[0] != segment.start or parsed_range[2] != splitter.total_size:
+                        raise DownloadError(f"分片范围不匹配: {response.headers.get('Content-Range')}")
+                    await self._write_segment(splitter, segment, response)
+                return True
             except FallbackToSingle:
                 raise
             except httpx.HTTPStatusError as e:
@@ -300,24 +528,30 @@ class SegmentDownloader:
             except DownloadError:
                 if attempt == self.max_retries:
                     raise
+            count("download_retries", host=self._host, scope="range")
             await asyncio.sleep(2**attempt)
+        return True
+
+    async def _write_segment(self, splitter: AdaptiveSplitter, segment: Segment, response: httpx.Response) -> None:
+        """写入分片, 分片被其他连接分走后半段时提前结束"""
+        async with self.sink.writer(segment.start, buffer_size=self.write_buffer_size) as f:
+            async for chunk in response.aiter_bytes(chunk_size=self.chunk_size):
+                chunk = chunk[: segment.remaining]
+                if chunk:
+                    # 先推进位置再写入, 写入等待期间被分走的只会是尚未写入的部分
+                    segment.start += len(chunk)
+                    splitter.received += len(chunk)
+                    self._received += len(chunk)
+                    await f.write(chunk)
+                    self._report_single(splitter.received, splitter.total_size)
+                    await self.rate_limit.consume(len(chunk))
+                if not segment.remaining:
+                    break
+
+        if segment.remaining:
+            raise DownloadError(f"分片未下载完整: 剩余 {segment.remaining} 字节")
 
-    async def _merge_parts(self, parts: list[RangePart], total_size: int) -> None:
-        complete_path = self._require_complete_path()
-        async with aiofiles.open(complete_path, "wb") as target:
-            for part in parts:
-                if not part.path.exists() or part.path.stat().st_size != part.size:
-                    actual = part.path.stat().st_size if part.path.exists() else 0
-                    raise DownloadError(f"分片文件不完整: 期望 {part.size} 字节, 实际 {actual} 字节")
-                async with aiofiles.open(part.path, "rb") as source:
-                    while chunk := await source.read(self.chunk_size):
-                        await target.write(chunk)
-
-        actual_size = complete_path.stat().st_size
-        if actual_size != total_size:
-            raise DownloadError(f"合并后文件大小不匹配: 期望 {total_size} 字节, 实际 {actual_size} 字节")
-
-    def _build_parts(self, total_size: int, parts_dir: Path) -> list[RangePart]:
+    def _build_parts(self, total_size: int) -> list[RangePart]:
         part_count = min(self.connections, math.ceil(total_size / self.min_split_size))
         part_count = max(1, part_count)
         part_size = math.ceil(total_size / part_count)
@@ -325,7 +559,7 @@ class SegmentDownloader:
         for index in range(part_count):
             start = index * part_size
             end = min(start + part_size - 1, total_size - 1)
-            parts.append(RangePart(index=index, start=start, end=end, path=parts_dir.joinpath(f"{index:06d}.part")))
+            parts.append(RangePart(index=index, start=start, end=end))
         return parts
 
     def _validate_part_response(self, part: RangePart, headers: httpx.Headers, total_size: int) -> None:
@@ -341,6 +575,7 @@ class SegmentDownloader:
     def _should_use_multipart(self, probe: RangeProbe) -> bool:
         return (
             self.connections > 1
+            and self.sink.seekable
             and probe.supports_range
             and probe.total_size is not None
             and probe.total_size > 0
@@ -348,45 +583,30 @@ class SegmentDownloader:
             and not _has_non_identity_encoding(probe.content_encoding)
         )
 
-    def _prepare_temp_dir(self, resolved_path: Path) -> None:
-        self.temp_dir = resolved_path.parent.joinpath(f".{resolved_path.name}.{uuid.uuid4().hex}.parsehub-tmp")
-        self.temp_dir.mkdir(parents=True, exist_ok=False)
-        self.complete_path = self.temp_dir.joinpath("complete.tmp")
-
-    def _cleanup_temp_dir(self) -> None:
-        if self.temp_dir:
-            shutil.rmtree(self.temp_dir, ignore_errors=True)
-        self.temp_dir = None
-        self.complete_path = None
-
-    async def _report_part(self, index: int, downloaded: int, total: int) -> None:
-        if not self.progress:
+    def _report_part(self, index: int, downloaded: int, total: int) -> None:
+        if not self._progress:
             return
-        async with self._progress_lock:
-            previous = self._part_downloaded.get(index, 0)
-            if downloaded <= previous:
-                return
-            self._part_downloaded[index] = downloaded
-            self._downloaded += downloaded - previous
-            await self.progress(self._downloaded, total, *self.progress_args, **self.progress_kwargs)
+        previous = self._part_downloaded.get(index, 0)
+        if downloaded <= previous:
+            return
+        self._part_downloaded[index] = downloaded
+        self._downloaded += downloaded - previous
+        self._progress.update(self._downloaded, total)
 
-    async def _report_single(self, downloaded: int, total: int) -> None:
-        if not self.progress:
+    def _report_single(self, downloaded: int, total: int) -> None:
+        if not self._progress or downloaded <= self._downloaded:
             return
-        async with self._progress_lock:
-            if downloaded <= self._downloaded:
-                return
-            self._downloaded = downloaded
-            await self.progress(downloaded, total, *self.progress_args, **self.progress_kwargs)
+        self._downloaded = downloaded
+        self._progress.update(downloaded, total)
 
     async def _report_finish(self, total: int) -> None:
-        if not self.progress or total <= 0:
+        if not self._progress:
             return
-        async with self._progress_lock:
-            if self._downloaded >= total:
-                return
+        if total > 0:
             self._downloaded = total
-            await self.progress(total, total, *self.progress_args, **self.progress_kwargs)
+            await self._progress.finish(total, total)
+        else:
+            await self._progress.finish()
 
     def _headers(self, extra: Mapping[str, str]) -> dict[str, str]:
         merged = dict(self.headers)
@@ -396,21 +616,7 @@ class SegmentDownloader:
     def _reset_progress(self) -> None:
         self._downloaded = 0
         self._part_downloaded.clear()
-
-    def _require_resolved_path(self) -> Path:
-        if self.resolved_path is None:
-            raise DownloadError("下载路径尚未初始化")
-        return self.resolved_path
-
-    def _require_temp_dir(self) -> Path:
-        if self.temp_dir is None:
-            raise DownloadError("临时目录尚未初始化")
-        return self.temp_dir
-
-    def _require_complete_path(self) -> Path:
-        if self.complete_path is None:
-            raise DownloadError("临时文件尚未初始化")
-        return self.complete_path
+        self._if_range = None
 
 
 async def download(
@@ -424,9 +630,16 @@ async def download(
     progress_kwargs: dict[str, Any] | None = None,
     max_retries: int = 3,
     chunk_size: int = 64 * 1024,
-    connections: int = 4,
+    connections: Connections = 4,
     min_split_size: int = 10 * 1024 * 1024,
     timeout: float | httpx.Timeout | None = None,
+    progress_interval: float | None = None,
+    progress_min_delta: int = 0,
+    write_buffer_size: int = DEFAULT_BUFFER_SIZE,
+    sink: DownloadSink | None = None,
+    priority: int = DownloadPriority.DEFAULT,
+    scheduler: DownloadScheduler | None = None,
+    rate_limit: float | None = None,
 ) -> str:
     """
     下载单个文件。服务端支持 Range 时使用多连接分片下载；不支持时回退普通单连接下载。
@@ -440,10 +653,18 @@ async def download(
     :param progress_kwargs: 下载进度回调函数的关键字参数
     :param max_retries: 最大重试次数
     :param chunk_size: 分块大小
-    :param connections: 单文件最大并发连接数，1 表示禁用分片
-    :param min_split_size: 文件小于该值时不分片
+    :param connections: 单文件最大并发连接数，1 表示禁用分片; "auto" 时根据文件大小和该 host 的历史选择初始连接数,
+        吞吐仍在上升时继续增加连接, 吞吐不再上升或遇到 429 / 503 时停止
+    :param min_split_size: 文件小于该值时不分片, "auto" 时固定为 2 MB
     :param timeout: httpx 超时配置
-    :return: 文件路径
+    :param progress_interval: 进度回调的最小间隔 (秒), 默认使用 GlobalConfig.progress_interval
+    :param progress_min_delta: 两次进度回调之间的最小字节数
+    :param write_buffer_size: 写入缓冲区大小, 攒够后一次性写入磁盘; 小于等于 0 时每个分块都立即写入
+    :param sink: 下载目标, 默认写入 save_path 文件; 也可以写入内存 (MemorySink) 或作为字节流输出 (StreamSink)
+    :param priority: 排队时的优先级, 值越小越先获得连接, 参考 DownloadPriority
+    :param scheduler: 连接调度器, 默认使用进程共用的 default_scheduler
+    :param rate_limit: 本次下载的限速 (字节/秒), 同时受 GlobalConfig 中的全局和代理限速约束
+    :return: 文件路径; 使用其他下载目标时为 sink.commit() 的返回值
 
     .. note::
         下载进度回调函数签名: async def progress(current: int, total: int, *args, **kwargs) -> None:
@@ -461,10 +682,48 @@ async def download(
         connections=connections,
         min_split_size=min_split_size,
         timeout=timeout,
+        progress_interval=progress_interval,
+        progress_min_delta=progress_min_delta,
+        write_buffer_size=write_buffer_size,
+        sink=sink,
+        priority=priority,
+        scheduler=scheduler,
+        rate_limit=rate_limit,
     )
     return await downloader.run()
 
 
+async def download_media(
+    url: str, save_path: Path, sink: SinkFactory | None = None, **kwargs: Any
+) -> tuple[str, DownloadSink | None]:
+    """
+    下载解析结果中的单个媒体; 未指定 sink 且设置了 GlobalConfig.media_store 时优先从本地仓库获取
+
+    :param url: 下载链接
+    :param save_path: 保存路径
+    :param sink: 下载目标工厂, 传入 save_path, 返回该文件的下载目标
+    :param kwargs: 传给 download 的其他参数
+    :return: (download 的返回值, 使用的下载目标); 未指定 sink 时下载目标为 None
+    """
+    store = GlobalConfig.media_store
+    if sink is not None or store is None:
+        media_sink = sink(save_path) if sink else None
+        return await download(url, save_path, sink=media_sink, **kwargs), media_sink
+
+    path, hit = await store.download(
+        url, save_path, lambda store_sink: download(url, save_path, sink=store_sink, **kwargs)
+    )
+    if hit and (progress := kwargs.get("progress")):
+        size = Path(path).stat().st_size
+        await progress(size, size, *kwargs.get("progress_args", ()), **kwargs.get("progress_kwargs", {}))
+    return path, None
+
+
+def memory_data(sink: DownloadSink | None) -> bytes | None:
+    """下载到内存 (MemorySink) 时的文件内容, 其他下载目标返回 None"""
+    return sink.data if isinstance(sink, MemorySink) else None
+
+
 async def get_filename_by_url(url: str, client: httpx.AsyncClient) -> str | None:
     """从 URL 或 HTTP 响应头中获取文件名"""
     try:
@@ -473,27 +732,25 @@ async def get_filename_by_url(url: str, client: httpx.AsyncClient) -> str | None
     except httpx.HTTPError:
         pass
     else:
-        if content_disposition := response.headers.get("content-disposition"):
-            if filename := _parse_content_disposition(content_disposition):
-                return _sanitize_filename(filename)
+        if filename := _filename_from_headers(response.headers):
+            return filename
+    return _filename_from_url(url)
+
 
+def _filename_from_headers(headers: httpx.Headers) -> str | None:
+    if content_disposition := headers.get("content-disposition"):
+        if filename := _parse_content_disposition(content_disposition):
+            return _sanitize_filename(filename)
+    return None
+
+
+def _filename_from_url(url: str) -> str | None:
     parsed = urlparse(url)
     path = unquote(parsed.path).removesuffix("/")
     filename = path.split("/")[-1] if path else None
     return _sanitize_filename(filename) if filename else None
 
 
-def _parse_save_path(save_path: str | Path | None) -> tuple[Path, str | None]:
-    """解析保存路径，返回 (目录, 文件名或 None)"""
-    if not save_path:
-        return Path.cwd().joinpath("downloads"), None
-
-    save_path_str = str(save_path)
-    save_dir_str, filename = os.path.split(save_path_str)
-    save_dir = Path(os.path.abspath(save_dir_str)) if save_dir_str else Path.cwd().joinpath("downloads")
-    return save_dir, filename if filename else None
-
-
 def _parse_int(value: str | None) -> int | None:
     if not value:
         return None
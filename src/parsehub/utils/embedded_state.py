@@ -0,0 +1,190 @@
+"""从网页中提取内嵌的状态 JSON (window.__INITIAL_STATE__ 等)
+
+直接在原始字节中定位标记, 只解码所在 <script> 的内容, 再用 ``json.JSONDecoder.raw_decode`` 解析,
+无需构建 DOM 树, 也不会改写整篇文档。
+``fetch_until_script`` 在流式读取网页时, 读到目标 <script> 的结束标签后即断开连接, 不再下载剩余内容。
+"""
+
+import json
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+from loguru import logger
+
+_SCRIPT_END = "</script"
+
+# 字符串或 JS 字面量 undefined; 匹配到字符串时原样保留, 避免替换字符串内容
+_JS_LITERAL_RE = re.compile(r'"(?:[^"\\]|\\.)*"|\bundefined\b', re.DOTALL)
+
+_DECODER = json.JSONDecoder()
+_LENIENT_DECODER = json.JSONDecoder(strict=False)
+
+
+def find_script_text(page: str | bytes, marker: str, *, encoding: str = "utf-8") -> str | None:
+    """返回开始标签中包含 ``marker`` 的 <script> 标签内容 (marker 之后第一个 ``>`` 到 ``</script`` 之间)
+
+    不在 <script> 开始标签内的匹配 (正文、其他标签中的同名文本) 会被跳过, 因此 marker 可以只写属性值,
+    不受引号和属性顺序的影响。
+
+    :param page: 网页内容, 可以是未解码的字节
+    :param marker: 开始标签中的标记, 例如 id 的值 ``RENDER_DATA``
+    :param encoding: page 为字节时的编码
+    :return: 标签内容, 未找到时返回 None
+    """
+    index = _find_in_script_tag(page, marker, 0)
+    if index == -1:
+        return None
+    start = _find(page, ">", index + len(marker))
+    if start == -1:
+        return None
+    return _decode_until_script_end(page, start + 1, encoding)
+
+
+def extract_embedded_json(
+    page: str | bytes,
+    marker: str,
+    *,
+    strict: bool = True,
+    encoding: str = "utf-8",
+) -> Any | None:
+    """提取 ``marker`` 之后的第一个 JSON 对象 / 数组
+
+    只在 marker 所在的 <script> 范围内解析; 遇到 JS 字面量 ``undefined`` 时按 ``null`` 处理 (字符串内容不受影响)。
+
+    :param page: 网页内容, 可以是未解码的字节
+    :param marker: 标记, 例如 ``window.__INITIAL_STATE__``
+    :param strict: 为 False 时允许字符串中出现控制字符
+    :param encoding: page 为字节时的编码
+    :return: 解析结果, 未找到 marker 或 JSON 起始位置时返回 None
+    :raises json.JSONDecodeError: JSON 格式错误
+    """
+    index = _find(page, marker, 0)
+    if index == -1:
+        return None
+    index += len(marker)
+    start = min((i for i in (_find(page, "{", index), _find(page, "[", index)) if i != -1), default=-1)
+    if start == -1:
+        return None
+
+    text = _decode_until_script_end(page, start, encoding)
+    decoder = _DECODER if strict else _LENIENT_DECODER
+    try:
+        return decoder.raw_decode(text)[0]
+    except ValueError:
+        if "undefined" not in text:
+            raise
+    return decoder.raw_decode(_replace_js_literals(text))[0]
+
+
+@dataclass(kw_only=True)
+class StreamedPage:
+    """流式读取的网页
+
+    :param response: 已关闭的响应, 可用于读取状态码 / 最终 URL / 响应头
+    :param content: 已读取并解压的内容
+    :param complete: 是否读取了完整响应
+    :param bytes_read: 实际传输的字节数
+    """
+
+    response: httpx.Response
+    content: bytes
+    complete: bool
+    bytes_read: int
+
+    @property
+    def bytes_saved(self) -> int:
+        """提前断开连接节省的传输字节数, 响应未提供 Content-Length 时为 0"""
+        if self.complete:
+            return 0
+        try:
+            total = int(self.response.headers.get("Content-Length", ""))
+        except ValueError:
+            return 0
+        return max(total - self.bytes_read, 0)
+
+
+async def fetch_until_script(
+    client: httpx.AsyncClient,
+    url: str,
+    markers: Sequence[str],
+    *,
+    script_tag: bool = False,
+    **kwargs: Any,
+) -> StreamedPage:
+    """流式 GET 网页, 任一 marker 所在的 <script> 读取完整后立即关闭连接
+
+    只在新到达的字节 (及与上一块重叠的部分) 中查找 marker 和 ``</script``, 不会重复扫描已读内容。
+    不检查状态码, 调用方可通过 ``page.response.raise_for_status()`` 自行处理。
+
+    :param client: httpx 客户端
+    :param url: 网页地址
+    :param markers: 标记, 例如 ``window.__INITIAL_STATE__=``
+    :param script_tag: marker 位于 <script> 开始标签中 (与 ``find_script_text`` 相同), 跳过其他位置的匹配
+    :param kwargs: 传递给 ``client.stream`` 的其他参数
+    :return: StreamedPage
+    """
+    script_end = _SCRIPT_END.encode()
+    overlap = max(len(m.encode()) for m in [*markers, _SCRIPT_END]) - 1
+    buffer = bytearray()
+    marker_at: int | None = None
+    complete = True
+    find = _find_in_script_tag if script_tag else _find
+
+    async with client.stream("GET", url, **kwargs) as response:
+        async for chunk in response.aiter_bytes():
+            scan_from = max(len(buffer) - overlap, 0)
+            buffer += chunk
+            if marker_at is None:
+                hits = [i for m in markers if (i := find(buffer, m, scan_from)) != -1]
+                if not hits:
+                    continue
+                marker_at = scan_from = min(hits)
+            if buffer.find(script_end, max(scan_from, marker_at)) != -1:
+                complete = False
+                break
+        bytes_read = response.num_bytes_downloaded
+
+    page = StreamedPage(response=response, content=bytes(buffer), complete=complete, bytes_read=bytes_read)
+    if not complete:
+        logger.debug("提前结束读取 {}: 已读取 {} 字节, 节省 {} 字节", url, page.bytes_read, page.bytes_saved)
+    return page
+
+
+def _replace_js_literals(text: str) -> str:
+    return _JS_LITERAL_RE.sub(lambda m: "null" if m.group(0) == "undefined" else m.group(0), text)
+
+
+def _find(page: str | bytes | bytearray, needle: str, start: int) -> int:
+    if isinstance(page, str):
+        return page.find(needle, start)
+    return page.find(needle.encode(), start)
+
+
+def _in_script_tag(page: str | bytes | bytearray, index: int) -> bool:
+    """index 是否位于 <script> 开始标签内; 开始标签尚未读取完整时也视为位于标签内"""
+    lt = page.rfind("<", 0, index) if isinstance(page, str) else page.rfind(b"<", 0, index)
+    if lt == -1:
+        return False
+    gt = _find(page, ">", lt)
+    if gt != -1 and gt < index:
+        return False
+    tag = page[lt : lt + 7]
+    return (tag if isinstance(tag, str) else tag.decode("latin-1")).lower() == "<script"
+
+
+def _find_in_script_tag(page: str | bytes | bytearray, marker: str, start: int) -> int:
+    index = _find(page, marker, start)
+    while index != -1 and not _in_script_tag(page, index):
+        index = _find(page, marker, index + len(marker))
+    return index
+
+
+def _decode_until_script_end(page: str | bytes, start: int, encoding: str) -> str:
+    end = _find(page, _SCRIPT_END, start)
+    chunk = page[start:] if end == -1 else page[start:end]
+    if isinstance(chunk, bytes):
+        return chunk.decode(encoding, errors="replace")
+    return chunk
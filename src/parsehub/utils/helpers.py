@@ -1,25 +1,114 @@
 import asyncio
 import json
 import re
+import threading
 from collections.abc import Coroutine
 from typing import Any
 
 from pydantic import SecretStr
 from urlextract import URLExtract
 
+from .loop_clients import aclose_loop_clients
+
 UA = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36"
 
 
-def run_sync[T](coro: Coroutine[Any, Any, T]) -> T:
+class LoopRunner:
+    """在后台线程中持续运行的事件循环, 供同步 API 提交协程
+
+    多次调用共用同一个事件循环, 连接池和缓存可以跨调用复用; 可在多个线程中同时调用。
+    事件循环在首次使用时启动, ``close`` 之后再次使用会重新启动。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """后台事件循环"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._run_forever, args=(self._loop,), name="parsehub-loop", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    @property
+    def running(self) -> bool:
+        """后台事件循环是否已启动"""
+        return self._loop is not None
+
+    def run[T](self, coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+        """在后台事件循环中运行协程并等待结果
+        :param coro: 协程
+        :param timeout: 超时时间 (秒), 超时后取消协程并抛出 TimeoutError
+        :return: 协程返回值
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            # 超时或被 KeyboardInterrupt 打断时, 不让协程在后台继续运行
+            future.cancel()
+            raise
+
+    def close(self) -> None:
+        """停止后台事件循环, 取消未完成的任务并等待线程退出"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or thread is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not threading.current_thread():
+            thread.join()
+
+    @staticmethod
+    def _run_forever(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            # 关闭平台接口和下载共用的 httpx 客户端, 释放连接
+            loop.run_until_complete(aclose_loop_clients())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+        finally:
+            loop.close()
+
+
+def run_sync[T](coro: Coroutine[Any, Any, T], runner: LoopRunner | None = None) -> T:
+    """同步运行协程
+    :param coro: 协程
+    :param runner: 后台事件循环, 为空时使用 ``asyncio.run`` 创建临时事件循环
+    :return: 协程返回值
+    """
     try:
         asyncio.get_running_loop()
     except RuntimeError:
-        return asyncio.run(coro)
+        if runner is not None:
+            return runner.run(coro)
+        return asyncio.run(_run_and_close(coro))
 
     coro.close()
     raise RuntimeError("sync API cannot be called from a running event loop; use async API instead")
 
 
+async def _run_and_close[T](coro: Coroutine[Any, Any, T]) -> T:
+    """运行协程, 结束后关闭临时事件循环中创建的共用客户端"""
+    try:
+        return await coro
+    finally:
+        await aclose_loop_clients()
+
+
 _url_extractor = URLExtract()
 
 
@@ -0,0 +1,218 @@
+"""分阶段插桩
+
+解析和下载的各个阶段通过 ``span`` (耗时) 和 ``count`` (计数) 上报指标, 由 ``add_instrument`` 注册的接收端处理;
+没有注册接收端时只做一次判断, 不计时也不分配标签。
+
+上报的指标:
+
+- ``parse_stage`` (span): ``BaseParser.parse`` 的各个阶段, 标签 platform / stage (raw_url, parse, clean)
+- ``redirect`` (span): 短链接重定向, 标签 host; ``redirect_hops`` (count): 跟随的跳数
+- ``provider_request`` (span) / ``provider_requests`` (count): 平台接口请求的延迟和次数, 标签 host / status,
+  通过 ``HTTPX_EVENT_HOOKS`` 挂在各个平台的 httpx 客户端上, 延迟为收到响应头的时间
+- ``sign`` (span, CPU 时间): 请求签名, 标签 platform
+- ``download`` (span): 单个文件的下载, 标签 host; ``download_bytes`` (count): 收到的字节数 (包括重试)
+- ``download_retries`` (count): 重试次数, 标签 host / scope (file: 整个文件, range: 单个分片)
+- ``download_fallback_single`` (count): 服务端不支持分片, 退回单连接下载的次数
+
+span 额外带有 outcome 标签 (ok / error)。内置的 ``MetricsRecorder`` 汇总指标, 可以导出为 Prometheus 文本格式或 JSON::
+
+    recorder = MetricsRecorder()
+    add_instrument(recorder)
+    ...
+    print(recorder.prometheus())
+"""
+
+import json
+import threading
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+
+_instruments: list["Instrument"] = []
+
+
+class Instrument:
+    """插桩接收端基类, 按需覆盖方法; 可能在线程池中被调用"""
+
+    def record_span(self, name: str, seconds: float, labels: Mapping[str, str]) -> None:
+        """
+        记录一段耗时
+        :param name: 指标名
+        :param seconds: 耗时 (秒)
+        :param labels: 标签
+        """
+
+    def record_count(self, name: str, value: float, labels: Mapping[str, str]) -> None:
+        """
+        记录计数
+        :param name: 指标名
+        :param value: 增量
+        :param labels: 标签
+        """
+
+
+def add_instrument(instrument: Instrument) -> None:
+    """注册接收端"""
+    if instrument not in _instruments:
+        _instruments.append(instrument)
+
+
+def remove_instrument(instrument: Instrument) -> None:
+    """移除接收端"""
+    if instrument in _instruments:
+        _instruments.remove(instrument)
+
+
+def enabled() -> bool:
+    """是否注册了接收端"""
+    return bool(_instruments)
+
+
+def count(name: str, value: float = 1, **labels: str) -> None:
+    """上报计数"""
+    for instrument in _instruments:
+        instrument.record_count(name, value, labels)
+
+
+@contextmanager
+def span(name: str, *, cpu: bool = False, **labels: str) -> Iterator[None]:
+    """
+    上报 with 语句块的耗时, 也可以作为装饰器使用
+    :param name: 指标名
+    :param cpu: 使用当前线程的 CPU 时间, 而不是经过的时间
+    :param labels: 标签
+    """
+    if not _instruments:
+        yield
+        return
+    clock = time.thread_time if cpu else time.perf_counter
+    start = clock()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        elapsed = clock() - start
+        labels["outcome"] = outcome
+        for instrument in _instruments:
+            instrument.record_span(name, elapsed, labels)
+
+
+def host_of(url: str | httpx.URL) -> str:
+    """指标中使用的 host 标签"""
+    return url.host if isinstance(url, httpx.URL) else (urlsplit(url).hostname or "")
+
+
+async def _on_request(request: httpx.Request) -> None:
+    if _instruments:
+        request.extensions["parsehub_start"] = time.perf_counter()
+
+
+async def _on_response(response: httpx.Response) -> None:
+    start = response.request.extensions.get("parsehub_start")
+    if start is None or not _instruments:
+        return
+    elapsed = time.perf_counter() - start
+    labels = {"host": response.request.url.host, "status": str(response.status_code)}
+    for instrument in _instruments:
+        instrument.record_span("provider_request", elapsed, labels)
+        instrument.record_count("provider_requests", 1, labels)
+
+
+HTTPX_EVENT_HOOKS: dict[str, list[Any]] = {"request": [_on_request], "response": [_on_response]}
+"""平台接口客户端共用的 httpx event_hooks"""
+
+
+class MetricsRecorder(Instrument):
+    """在内存中汇总指标, 导出为 Prometheus 文本格式或 JSON"""
+
+    def __init__(self, prefix: str = "parsehub_") -> None:
+        """
+        :param prefix: 导出时的指标名前缀
+        """
+        self.prefix = prefix
+        self._counters: dict[tuple[str, tuple[tuple[str, str], ...]], float] = {}
+        # (次数, 总耗时, 最长耗时)
+        self._spans: dict[tuple[str, tuple[tuple[str, str], ...]], tuple[int, float, float]] = {}
+        self._lock = threading.Lock()
+
+    def record_span(self, name: str, seconds: float, labels: Mapping[str, str]) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            n, total, longest = self._spans.get(key, (0, 0.0, 0.0))
+            self._spans[key] = (n + 1, total + seconds, max(longest, seconds))
+
+    def record_count(self, name: str, value: float, labels: Mapping[str, str]) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def reset(self) -> None:
+        """清空已记录的指标"""
+        with self._lock:
+            self._counters.clear()
+            self._spans.clear()
+
+    def snapshot(self) -> dict[str, list[dict[str, Any]]]:
+        """
+        当前指标
+        :return: {"counters": [{name, labels, value}], "spans": [{name, labels, count, sum, max}]}
+        """
+        with self._lock:
+            counters = sorted(self._counters.items())
+            spans = sorted(self._spans.items())
+        return {
+            "counters": [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in counters],
+            "spans": [
+                {"name": name, "labels": dict(labels), "count": n, "sum": total, "max": longest}
+                for (name, labels), (n, total, longest) in spans
+            ],
+        }
+
+    def json(self, **kwargs: Any) -> str:
+        """
+        导出为 JSON
+        :param kwargs: 传给 json.dumps 的参数
+        """
+        return json.dumps(self.snapshot(), ensure_ascii=False, **kwargs)
+
+    def prometheus(self) -> str:
+        """导出为 Prometheus 文本格式: 计数为 counter (``_total``), 耗时为 summary (``_seconds``)"""
+        snapshot = self.snapshot()
+        lines: list[str] = []
+        declared: set[str] = set()
+
+        def declare(metric: str, kind: str) -> None:
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} {kind}")
+
+        for counter in snapshot["counters"]:
+            metric = f"{self.prefix}{counter['name']}_total"
+            declare(metric, "counter")
+            lines.append(f"{metric}{_format_labels(counter['labels'])} {_format_value(counter['value'])}")
+        for item in snapshot["spans"]:
+            metric = f"{self.prefix}{item['name']}_seconds"
+            declare(metric, "summary")
+            labels = _format_labels(item["labels"])
+            lines.append(f"{metric}_count{labels} {item['count']}")
+            lines.append(f"{metric}_sum{labels} {_format_value(item['sum'])}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Mapping[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
@@ -0,0 +1,52 @@
+"""按事件循环共用的 httpx 客户端
+
+httpx 客户端和连接池绑定创建它的事件循环, 平台接口按 (事件循环, 代理) 缓存客户端, 同一循环中的请求复用连接。
+所有 ``LoopClients`` 登记在模块级注册表中, ``aclose_loop_clients()`` 关闭当前事件循环中的全部共用客户端:
+``LoopRunner`` 停止后台事件循环前会自动调用; 自行管理事件循环 (例如 ``asyncio.run``) 时可在退出前调用
+``ParseHub.aclose()``。
+"""
+
+import asyncio
+import weakref
+from collections.abc import Callable
+
+import httpx
+
+_registry: "weakref.WeakSet[LoopClients]" = weakref.WeakSet()
+
+
+class LoopClients:
+    """按 (事件循环, 代理) 缓存的 httpx 客户端"""
+
+    def __init__(self, factory: Callable[[str | httpx.Proxy | None], httpx.AsyncClient]) -> None:
+        """
+        :param factory: 根据代理创建客户端, 在需要新客户端的事件循环中调用
+        """
+        self.factory = factory
+        self._clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]] = (
+            weakref.WeakKeyDictionary()
+        )
+        _registry.add(self)
+
+    def get(self, proxy: str | httpx.Proxy | None = None) -> httpx.AsyncClient:
+        """当前事件循环中该代理的客户端, 不存在或已关闭时重新创建"""
+        clients = self._clients.setdefault(asyncio.get_running_loop(), {})
+        key = proxy_key(proxy)
+        client = clients.get(key)
+        if client is None or client.is_closed:
+            client = clients[key] = self.factory(proxy)
+        return client
+
+    async def aclose(self) -> None:
+        """关闭当前事件循环中的客户端"""
+        clients = self._clients.pop(asyncio.get_running_loop(), {})
+        await asyncio.gather(*(client.aclose() for client in clients.values()), return_exceptions=True)
+
+
+async def aclose_loop_clients() -> None:
+    """关闭当前事件循环中所有 LoopClients 创建的客户端"""
+    await asyncio.gather(*(clients.aclose() for clients in list(_registry)))
+
+
+def proxy_key(proxy: str | httpx.Proxy | None) -> str:
+    return str(proxy.url if isinstance(proxy, httpx.Proxy) else proxy or "")
@@ -1,10 +1,14 @@
 """媒体文件信息读取"""
 
 import math
+import os
+import struct
+from collections.abc import Iterator
 from dataclasses import dataclass
+from io import BytesIO
 from pathlib import Path
+from typing import BinaryIO
 
-import cv2
 from PIL import Image
 
 _IMAGE_SUFFIXES = frozenset(
@@ -37,6 +41,24 @@ _VIDEO_SUFFIXES = frozenset(
     }
 )
 
+# HEIF 系列 (AVIF / HEIC) 的 ftyp 品牌, 用 ispe 读取宽高; 其余 ftyp 视为 mp4/mov
+_HEIF_BRANDS = frozenset({b"avif", b"avis", b"heic", b"heix", b"heim", b"heis", b"mif1", b"msf1"})
+
+# JPEG SOF 标记 (排除 DHT / JPG / DAC)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# Matroska / WebM 元素 ID
+_EBML_SEGMENT = 0x18538067
+_EBML_INFO = 0x1549A966
+_EBML_TRACKS = 0x1654AE6B
+_EBML_CLUSTER = 0x1F43B675
+_EBML_TIMECODE_SCALE = 0x2AD7B1
+_EBML_DURATION = 0x4489
+_EBML_TRACK_ENTRY = 0xAE
+_EBML_VIDEO = 0xE0
+_EBML_PIXEL_WIDTH = 0xB0
+_EBML_PIXEL_HEIGHT = 0xBA
+
 
 @dataclass
 class MediaInfo:
@@ -52,7 +74,10 @@ class MediaInfoReader:
 
     @staticmethod
     def read(path: str | Path) -> MediaInfo:
-        """根据文件后缀自动选择读取方式"""
+        """优先只解析文件头, 无法识别时根据文件后缀回退到 Pillow / OpenCV"""
+        if (info := MediaHeaderProbe.probe(path)) is not None:
+            return info
+
         suffix = Path(path).suffix.lower()
         if suffix == ".gif":
             return MediaInfoReader.read_gif(path)
@@ -70,7 +95,17 @@ class MediaInfoReader:
                 return MediaInfo()
 
     @staticmethod
-    def read_image(path: str | Path) -> MediaInfo:
+    def read_bytes(data: bytes) -> MediaInfo:
+        """读取内存中的媒体数据, 无法识别文件头时回退到 Pillow"""
+        if (info := MediaHeaderProbe.probe_bytes(data)) is not None:
+            return info
+        try:
+            return MediaInfoReader.read_image(BytesIO(data))
+        except Exception:
+            return MediaInfo()
+
+    @staticmethod
+    def read_image(path: str | Path | BinaryIO) -> MediaInfo:
         """读取图片宽高（只解析文件头，不加载像素）"""
         with Image.open(path) as img:
             return MediaInfo(width=img.width, height=img.height)
@@ -92,6 +127,8 @@ class MediaInfoReader:
     @staticmethod
     def read_video(path: str | Path) -> MediaInfo:
         """读取视频宽高和时长（只读容器元数据，不解码帧）"""
+        import cv2  # 仅在文件头无法识别时才需要, 延迟导入避免常驻内存
+
         cap = cv2.VideoCapture(str(path))
         try:
             if not cap.isOpened():
@@ -104,3 +141,362 @@ class MediaInfoReader:
             return MediaInfo(width=width, height=height, duration=duration)
         finally:
             cap.release()
+
+
+class MediaHeaderProbe:
+    """纯 Python 文件头探测, 只读取容器/图片头部, 不解码任何帧
+
+    支持 mp4/mov (moov/mvhd/tkhd), mkv/webm (EBML), PNG, JPEG, WebP, AVIF/HEIC (ispe), GIF (图形控制扩展)。
+    无法识别或信息不完整时返回 None, 由调用方回退到 Pillow / OpenCV。
+    """
+
+    @staticmethod
+    def probe(path: str | Path) -> MediaInfo | None:
+        try:
+            with open(path, "rb") as f:
+                return MediaHeaderProbe._probe_stream(f, os.fstat(f.fileno()).st_size)
+        except (OSError, ValueError, IndexError, struct.error):
+            # 文件截断时单字节读取返回空, 下标越界
+            return None
+
+    @staticmethod
+    def probe_bytes(data: bytes) -> MediaInfo | None:
+        try:
+            return MediaHeaderProbe._probe_stream(BytesIO(data), len(data))
+        except (ValueError, IndexError, struct.error):
+            return None
+
+    @staticmethod
+    def _probe_stream(f: BinaryIO, file_size: int) -> MediaInfo | None:
+        head = f.read(32)
+        if head.startswith(b"\x89PNG\r\n\x1a\n"):
+            return MediaHeaderProbe._probe_png(head)
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return MediaHeaderProbe._probe_gif(f)
+        if head.startswith(b"\xff\xd8"):
+            return MediaHeaderProbe._probe_jpeg(f)
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return MediaHeaderProbe._probe_webp(f)
+        if head.startswith(b"\x1a\x45\xdf\xa3"):
+            return MediaHeaderProbe._probe_matroska(f, file_size)
+        if head[4:8] == b"ftyp":
+            if head[8:12] in _HEIF_BRANDS:
+                return MediaHeaderProbe._probe_heif(f, file_size)
+            return MediaHeaderProbe._probe_mp4(f, file_size)
+        return None
+
+    # ---------- 图片 ----------
+
+    @staticmethod
+    def _probe_png(head: bytes) -> MediaInfo | None:
+        if head[12:16] != b"IHDR":
+            return None
+        width, height = struct.unpack(">II", head[16:24])
+        return MediaInfo(width=width, height=height)
+
+    @staticmethod
+    def _probe_jpeg(f: BinaryIO) -> MediaInfo | None:
+        f.seek(2)
+        while True:
+            byte = f.read(1)
+            if not byte:
+                return None
+            if byte != b"\xff":
+                continue
+            marker = f.read(1)
+            while marker == b"\xff":
+                marker = f.read(1)
+            if not marker:
+                return None
+            m = marker[0]
+            if m == 0x01 or 0xD0 <= m <= 0xD8:
+                continue
+            if m in (0xD9, 0xDA):  # EOI / SOS 之前仍未找到 SOF
+                return None
+            (length,) = struct.unpack(">H", f.read(2))
+            if m in _JPEG_SOF_MARKERS:
+                _, height, width = struct.unpack(">BHH", f.read(5))
+                return MediaInfo(width=width, height=height)
+            f.seek(length - 2, os.SEEK_CUR)
+
+    @staticmethod
+    def _probe_webp(f: BinaryIO) -> MediaInfo | None:
+        f.seek(12)
+        chunk = f.read(18)
+        fourcc, data = chunk[:4], chunk[8:]
+        if fourcc == b"VP8X":
+            width = int.from_bytes(data[4:7], "little") + 1
+            height = int.from_bytes(data[7:10], "little") + 1
+        elif fourcc == b"VP8L":
+            if data[0] != 0x2F:
+                return None
+            bits = int.from_bytes(data[1:5], "little")
+            width = (bits & 0x3FFF) + 1
+            height = ((bits >> 14) & 0x3FFF) + 1
+        elif fourcc == b"VP8 ":
+            if data[3:6] != b"\x9d\x01\x2a":
+                return None
+            width = int.from_bytes(data[6:8], "little") & 0x3FFF
+            height = int.from_bytes(data[8:10], "little") & 0x3FFF
+        else:
+            return None
+        return MediaInfo(width=width, height=height)
+
+    @staticmethod
+    def _probe_heif(f: BinaryIO, file_size: int) -> MediaInfo | None:
+        meta = MediaHeaderProbe._find_box(f, 0, file_size, b"meta")
+        if meta is None:
+            return None
+        # meta 是 FullBox, 子 box 从 version/flags 之后开始
+        iprp = MediaHeaderProbe._find_box(f, meta[0] + 4, meta[1], b"iprp")
+        if iprp is None:
+            return None
+        ipco = MediaHeaderProbe._find_box(f, iprp[0], iprp[1], b"ipco")
+        if ipco is None:
+            return None
+        width = height = 0
+        for box_type, start, _ in MediaHeaderProbe._iter_boxes(f, ipco[0], ipco[1]):
+            if box_type != b"ispe":
+                continue
+            f.seek(start + 4)
+            w, h = struct.unpack(">II", f.read(8))
+            # 网格图的主图 ispe 是完整尺寸, 取面积最大者
+            if w * h > width * height:
+                width, height = w, h
+        if not width:
+            return None
+        return MediaInfo(width=width, height=height)
+
+    @staticmethod
+    def _probe_gif(f: BinaryIO) -> MediaInfo | None:
+        f.seek(6)
+        width, height, packed = struct.unpack("<HHB", f.read(5))
+        f.seek(2, os.SEEK_CUR)
+        if packed & 0x80:
+            f.seek(3 * (2 << (packed & 0x07)), os.SEEK_CUR)
+
+        total_ms = 0
+        frame_delay: int | None = None
+        while True:
+            introducer = f.read(1)
+            if not introducer or introducer == b";":
+                break
+            if introducer == b"!":
+                label = f.read(1)
+                if label == b"\xf9":
+                    size = f.read(1)[0]
+                    block = f.read(size)
+                    if len(block) >= 3:
+                        frame_delay = int.from_bytes(block[1:3], "little") * 10
+                MediaHeaderProbe._skip_gif_sub_blocks(f)
+            elif introducer == b",":
+                descriptor = f.read(9)
+                if len(descriptor) < 9:
+                    return None
+                if descriptor[8] & 0x80:
+                    f.seek(3 * (2 << (descriptor[8] & 0x07)), os.SEEK_CUR)
+                f.seek(1, os.SEEK_CUR)  # LZW 最小码长
+                MediaHeaderProbe._skip_gif_sub_blocks(f)
+                # 与 Pillow 一致: 没有图形控制扩展的帧按 100ms 计
+                total_ms += 100 if frame_delay is None else frame_delay
+                frame_delay = None
+            else:
+                return None
+        return MediaInfo(width=width, height=height, duration=math.ceil(total_ms / 1000))
+
+    @staticmethod
+    def _skip_gif_sub_blocks(f: BinaryIO) -> None:
+        while True:
+            size = f.read(1)
+            if not size:
+                raise ValueError("GIF 数据块不完整")
+            if size[0] == 0:
+                return
+            f.seek(size[0], os.SEEK_CUR)
+
+    # ---------- 视频 ----------
+
+    @staticmethod
+    def _probe_mp4(f: BinaryIO, file_size: int) -> MediaInfo | None:
+        moov = MediaHeaderProbe._find_box(f, 0, file_size, b"moov")
+        if moov is None:
+            return None
+        timescale = duration = 0
+        width = height = 0
+        for box_type, start, end in MediaHeaderProbe._iter_boxes(f, moov[0], moov[1]):
+            if box_type == b"mvhd":
+                f.seek(start)
+                version = f.read(1)[0]
+                f.seek(start + (20 if version == 1 else 12))
+                if version == 1:
+                    timescale, duration = struct.unpack(">IQ", f.read(12))
+                else:
+                    timescale, duration = struct.unpack(">II", f.read(8))
+                    if duration == 0xFFFFFFFF:
+                        duration = 0
+            elif box_type == b"mvex" and not duration:
+                # fragmented mp4 的 mvhd 时长通常为 0, 使用 mehd 中的 fragment_duration
+                if mehd := MediaHeaderProbe._find_box(f, start, end, b"mehd"):
+                    f.seek(mehd[0])
+                    version = f.read(4)[0]
+                    duration = struct.unpack(">Q" if version == 1 else ">I", f.read(8 if version == 1 else 4))[0]
+            elif box_type == b"trak":
+                if (size := MediaHeaderProbe._read_video_track(f, start, end)) and size[0] * size[1] > width * height:
+                    width, height = size
+        if not width or not timescale or not duration:
+            return None
+        return MediaInfo(width=width, height=height, duration=math.ceil(duration / timescale))
+
+    @staticmethod
+    def _read_video_track(f: BinaryIO, start: int, end: int) -> tuple[int, int] | None:
+        tkhd = MediaHeaderProbe._find_box(f, start, end, b"tkhd")
+        mdia = MediaHeaderProbe._find_box(f, start, end, b"mdia")
+        if tkhd is None or mdia is None:
+            return None
+        hdlr = MediaHeaderProbe._find_box(f, mdia[0], mdia[1], b"hdlr")
+        if hdlr is None:
+            return None
+        f.seek(hdlr[0] + 8)
+        if f.read(4) != b"vide":
+            return None
+
+        f.seek(tkhd[0])
+        version = f.read(1)[0]
+        matrix_offset = 52 if version == 1 else 40
+        f.seek(tkhd[0] + matrix_offset)
+        matrix = struct.unpack(">9i", f.read(36))
+        width, height = (v >> 16 for v in struct.unpack(">II", f.read(8)))
+        # 旋转 90/270 度时按显示方向交换宽高 (与 OpenCV 自动旋转一致)
+        if matrix[0] == 0 and matrix[4] == 0 and matrix[1] != 0:
+            width, height = height, width
+        return (width, height) if width and height else None
+
+    @staticmethod
+    def _iter_boxes(f: BinaryIO, start: int, end: int) -> Iterator[tuple[bytes, int, int]]:
+        """遍历 ISO BMFF box, 产出 (类型, 内容起始偏移, 结束偏移), 只读 box 头"""
+        pos = start
+        while pos + 8 <= end:
+            f.seek(pos)
+            header = f.read(8)
+            if len(header) < 8:
+                return
+            size, box_type = struct.unpack(">I4s", header)
+            header_size = 8
+            if size == 1:
+                large = f.read(8)
+                if len(large) < 8:
+                    return
+                (size,) = struct.unpack(">Q", large)
+                header_size = 16
+            elif size == 0:
+                size = end - pos
+            if size < header_size:
+                return
+            yield box_type, pos + header_size, min(pos + size, end)
+            pos += size
+
+    @staticmethod
+    def _find_box(f: BinaryIO, start: int, end: int, box_type: bytes) -> tuple[int, int] | None:
+        for current, box_start, box_end in MediaHeaderProbe._iter_boxes(f, start, end):
+            if current == box_type:
+                return box_start, box_end
+        return None
+
+    @staticmethod
+    def _probe_matroska(f: BinaryIO, file_size: int) -> MediaInfo | None:
+        header = MediaHeaderProbe._read_ebml_element(f, 0)
+        if header is None or header[1] is None:
+            return None
+        segment = MediaHeaderProbe._read_ebml_element(f, header[2] + header[1])
+        if segment is None or segment[0] != _EBML_SEGMENT:
+            return None
+        segment_end = file_size if segment[1] is None else min(segment[2] + segment[1], file_size)
+
+        timecode_scale = 1_000_000
+        duration: float | None = None
+        width = height = 0
+        pos = segment[2]
+        while pos < segment_end and (duration is None or not width):
+            element = MediaHeaderProbe._read_ebml_element(f, pos)
+            if element is None:
+                break
+            element_id, size, data_start = element
+            if element_id == _EBML_CLUSTER or size is None:
+                break
+            data_end = data_start + size
+            if element_id == _EBML_INFO:
+                for child_id, child_start, child_end in MediaHeaderProbe._iter_ebml(f, data_start, data_end):
+                    f.seek(child_start)
+                    data = f.read(child_end - child_start)
+                    if child_id == _EBML_TIMECODE_SCALE:
+                        timecode_scale = int.from_bytes(data, "big")
+                    elif child_id == _EBML_DURATION and len(data) in (4, 8):
+                        (duration,) = struct.unpack(">f" if len(data) == 4 else ">d", data)
+            elif element_id == _EBML_TRACKS and not width:
+                width, height = MediaHeaderProbe._read_matroska_video_size(f, data_start, data_end)
+            pos = data_end
+
+        if not width or not duration:
+            return None
+        return MediaInfo(width=width, height=height, duration=math.ceil(duration * timecode_scale / 1_000_000_000))
+
+    @staticmethod
+    def _read_matroska_video_size(f: BinaryIO, start: int, end: int) -> tuple[int, int]:
+        for entry_id, entry_start, entry_end in MediaHeaderProbe._iter_ebml(f, start, end):
+            if entry_id != _EBML_TRACK_ENTRY:
+                continue
+            for child_id, child_start, child_end in MediaHeaderProbe._iter_ebml(f, entry_start, entry_end):
+                if child_id != _EBML_VIDEO:
+                    continue
+                width = height = 0
+                for video_id, video_start, video_end in MediaHeaderProbe._iter_ebml(f, child_start, child_end):
+                    if video_id in (_EBML_PIXEL_WIDTH, _EBML_PIXEL_HEIGHT):
+                        f.seek(video_start)
+                        value = int.from_bytes(f.read(video_end - video_start), "big")
+                        if video_id == _EBML_PIXEL_WIDTH:
+                            width = value
+                        else:
+                            height = value
+                if width and height:
+                    return width, height
+        return 0, 0
+
+    @staticmethod
+    def _iter_ebml(f: BinaryIO, start: int, end: int) -> Iterator[tuple[int, int, int]]:
+        """遍历 EBML 子元素, 产出 (ID, 内容起始偏移, 结束偏移)"""
+        pos = start
+        while pos < end:
+            element = MediaHeaderProbe._read_ebml_element(f, pos)
+            if element is None:
+                return
+            element_id, size, data_start = element
+            if size is None:
+                return
+            yield element_id, data_start, min(data_start + size, end)
+            pos = data_start + size
+
+    @staticmethod
+    def _read_ebml_element(f: BinaryIO, pos: int) -> tuple[int, int | None, int] | None:
+        """读取 EBML 元素头, 返回 (ID, 内容大小, 内容起始偏移), 大小未知时为 None"""
+        f.seek(pos)
+        head = f.read(12)
+        if len(head) < 2:
+            return None
+        id_length = MediaHeaderProbe._vint_length(head[0])
+        if id_length > 4 or len(head) < id_length + 1:
+            return None
+        element_id = int.from_bytes(head[:id_length], "big")
+        size_length = MediaHeaderProbe._vint_length(head[id_length])
+        if size_length > 8 or len(head) < id_length + size_length:
+            return None
+        raw_size = int.from_bytes(head[id_length : id_length + size_length], "big")
+        size = raw_size & ((1 << (7 * size_length)) - 1)
+        unknown = size == (1 << (7 * size_length)) - 1
+        return element_id, None if unknown else size, pos + id_length + size_length
+
+    @staticmethod
+    def _vint_length(first_byte: int) -> int:
+        for length in range(1, 9):
+            if first_byte & (0x80 >> (length - 1)):
+                return length
+        return 9
@@ -0,0 +1,312 @@
+"""内容寻址的本地媒体仓库
+
+按规范化后的媒体 URL 和下载时计算的 sha256 保存文件, 同一媒体只从 CDN 下载一次;
+再次下载时以 reflink / 硬链接 (都不可用时复制) 放入输出目录。仓库总大小超过上限时淘汰最久未使用的文件。
+同一事件循环中同时下载同一 URL 时, 只有第一个调用访问 CDN, 其余调用等待它完成后从仓库获取。
+
+目录结构::
+
+    root/objects/ab/abcdef...   文件内容, 以内容 sha256 命名
+    root/urls/12/1234...        URL 索引, 内容为对应文件的 sha256
+"""
+
+import asyncio
+import contextlib
+import errno
+import hashlib
+import os
+import shutil
+import sys
+import threading
+import uuid
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractAsyncContextManager
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Self
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from loguru import logger
+
+from .sink import FileSink, SinkWriter
+from .writer import DEFAULT_BUFFER_SIZE
+
+_FICLONE = 0x40049409
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+class MediaStore:
+    """内容寻址的本地媒体仓库, 可在多个请求 / 多个 ParseHub 实例之间共用"""
+
+    def __init__(self, root: str | Path, *, max_size: int = 10 * 1024**3, hardlink: bool = True) -> None:
+        """
+        :param root: 仓库目录
+        :param max_size: 仓库最大字节数, 超出后按最近使用时间淘汰
+        :param hardlink: 不支持 reflink 时是否使用硬链接; 硬链接与仓库共用同一文件, 修改输出文件会影响仓库,
+            为 False 时改为复制
+        """
+        self.root = Path(root).resolve()
+        self.max_size = max_size
+        self.hardlink = hardlink
+        self._lock = threading.Lock()
+        self._size: int | None = None
+        # 正在下载的 URL, 完成 (无论成功与否) 时设置结果
+        self._inflight: dict[str, asyncio.Future[None]] = {}
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        """规范化 URL: 协议和域名小写, 去掉默认端口和片段, 查询参数排序"""
+        parts = urlsplit(url.strip())
+        scheme = parts.scheme.lower()
+        host = (parts.hostname or "").lower()
+        if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+            host = f"{host}:{parts.port}"
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+    @property
+    def size(self) -> int:
+        """仓库当前字节数"""
+        with self._lock:
+            return self._ensure_size()
+
+    def lookup(self, url: str) -> Path | None:
+        """查找 URL 对应的仓库文件, 命中时刷新最近使用时间"""
+        key = self._url_path(url)
+        try:
+            digest = key.read_text().strip()
+        except OSError:
+            return None
+        obj = self._object_path(digest)
+        try:
+            os.utime(obj)
+        except FileNotFoundError:
+            # 文件已被淘汰
+            key.unlink(missing_ok=True)
+            return None
+        return obj
+
+    async def fetch(self, url: str, target: Path) -> Path | None:
+        """命中时把仓库文件放到 target 并返回 target, 未命中返回 None"""
+        return await asyncio.to_thread(self._fetch, url, target)
+
+    async def download(
+        self, url: str, target: Path, download: Callable[["StoreSink"], Awaitable[str]]
+    ) -> tuple[str, bool]:
+        """从仓库获取 URL 对应的文件, 未命中时下载并存入仓库
+
+        同一 URL 正在下载时等待其完成后再从仓库获取; 先前的下载失败时由本次调用重新下载。
+
+        :param url: 媒体 URL
+        :param target: 保存路径
+        :param download: 使用给定的下载目标执行下载, 返回文件路径
+        :return: (文件路径, 是否来自仓库)
+        """
+        key = self.normalize_url(url)
+        loop = asyncio.get_running_loop()
+        while True:
+            if (hit := await self.fetch(url, target)) is not None:
+                return str(hit), True
+            pending = self._inflight.get(key)
+            # Future 只能在创建它的事件循环中等待, 其他循环中的下载不合并
+            if pending is None or pending.done() or pending.get_loop() is not loop:
+                break
+            await asyncio.wait([pending])
+
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            return await download(self.sink(url, target)), False
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            future.set_result(None)
+
+    def sink(self, url: str, save_path: str | Path | None = None) -> "StoreSink":
+        """下载 URL 并存入仓库的下载目标"""
+        return StoreSink(self, url, save_path)
+
+    async def add(self, url: str, path: Path, digest: str) -> None:
+        """把已下载的文件存入仓库; 内容已存在时直接复用, 并把 path 替换为仓库文件的链接以节省空间"""
+        await asyncio.to_thread(self._add, url, path, digest)
+
+    def clear(self) -> None:
+        """清空仓库"""
+        with self._lock:
+            shutil.rmtree(self.root, ignore_errors=True)
+            self._size = 0
+
+    def _fetch(self, url: str, target: Path) -> Path | None:
+        if (obj := self.lookup(url)) is None:
+            return None
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self._place(obj, target, allow_copy=True)
+        except FileNotFoundError:
+            # 查找后被其他线程淘汰
+            return None
+        return target
+
+    def _add(self, url: str, path: Path, digest: str) -> None:
+        obj = self._object_path(digest)
+        with self._lock:
+            size = self._ensure_size()
+            if obj.exists():
+                os.utime(obj)
+                with contextlib.suppress(OSError):
+                    self._place(obj, path, allow_copy=False)
+            else:
+                obj.parent.mkdir(parents=True, exist_ok=True)
+                self._place(path, obj, allow_copy=True)
+                self._size = size + obj.stat().st_size
+            self._write_key(url, digest)
+            if self._size is not None and self._size > self.max_size:
+                self._evict()
+
+    def _place(self, src: Path, dst: Path, *, allow_copy: bool) -> None:
+        tmp = dst.with_name(f".{dst.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            try:
+                _reflink(src, tmp)
+            except OSError:
+                if self.hardlink:
+                    try:
+                        os.link(src, tmp)
+                    except OSError:
+                        if not allow_copy:
+                            raise
+                        shutil.copyfile(src, tmp)
+                elif allow_copy:
+                    shutil.copyfile(src, tmp)
+                else:
+                    raise
+            os.replace(tmp, dst)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def _write_key(self, url: str, digest: str) -> None:
+        key = self._url_path(url)
+        key.parent.mkdir(parents=True, exist_ok=True)
+        tmp = key.with_name(f".{key.name}.{uuid.uuid4().hex}.tmp")
+        tmp.write_text(digest)
+        os.replace(tmp, key)
+
+    def _evict(self) -> None:
+        objects = []
+        for path in self.root.joinpath("objects").glob("*/*"):
+            with contextlib.suppress(OSError):
+                stat = path.stat()
+                objects.append((stat.st_mtime, stat.st_size, path))
+        objects.sort()
+        size = sum(item[1] for item in objects)
+        for _, file_size, path in objects:
+            if size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            size -= file_size
+            logger.debug(f"媒体仓库淘汰: {path.name}")
+        self._size = size
+
+    def _ensure_size(self) -> int:
+        if self._size is None:
+            self._size = sum(
+                path.stat().st_size for path in self.root.joinpath("objects").glob("*/*") if path.is_file()
+            )
+        return self._size
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root.joinpath("objects", digest[:2], digest)
+
+    def _url_path(self, url: str) -> Path:
+        key = hashlib.sha256(self.normalize_url(url).encode()).hexdigest()
+        return self.root.joinpath("urls", key[:2], key)
+
+
+class StoreSink(FileSink):
+    """写入文件的同时计算 sha256, 完成后存入 MediaStore
+
+    顺序写入的部分在下载时直接计算哈希; 分片下载中其余分片先于前面的分片到达时, 提交时再从文件读取剩余部分。
+    """
+
+    def __init__(self, store: MediaStore, url: str, save_path: str | Path | None = None) -> None:
+        super().__init__(save_path)
+        self.store = store
+        self.url = url
+        self.digest: str | None = None
+        self._hasher = hashlib.sha256()
+        self._hashed = 0
+
+    async def open(self, filename: str | None, size: int | None) -> None:
+        await super().open(filename, size)
+        self._hasher = hashlib.sha256()
+        self._hashed = 0
+
+    def writer(self, offset: int = 0, *, buffer_size: int = DEFAULT_BUFFER_SIZE) -> "_HashingWriter":
+        return _HashingWriter(self, super().writer(offset, buffer_size=buffer_size), offset)
+
+    async def commit(self) -> str:
+        temp_path = self._temp_path()
+        if temp_path.exists():
+            await asyncio.to_thread(_hash_file, temp_path, self._hashed, self._hasher)
+        self.digest = self._hasher.hexdigest()
+        path = await super().commit()
+        try:
+            await self.store.add(self.url, Path(path), self.digest)
+        except OSError as e:
+            # 仓库不可用不影响本次下载
+            logger.warning(f"存入媒体仓库失败: {e}")
+        return path
+
+    def _update(self, offset: int, chunk: bytes) -> None:
+        if offset == self._hashed:
+            self._hasher.update(chunk)
+            self._hashed += len(chunk)
+
+
+class _HashingWriter:
+    def __init__(self, sink: StoreSink, writer: AbstractAsyncContextManager[SinkWriter], offset: int) -> None:
+        self.sink = sink
+        self.writer = writer
+        self.offset = offset
+        self._inner: SinkWriter | None = None
+
+    async def __aenter__(self) -> Self:
+        self._inner = await self.writer.__aenter__()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.writer.__aexit__(exc_type, exc_value, traceback)
+
+    async def write(self, chunk: bytes) -> None:
+        if self._inner is None:
+            raise ValueError("写入器尚未打开")
+        self.sink._update(self.offset, chunk)
+        self.offset += len(chunk)
+        await self._inner.write(chunk)
+
+
+def _hash_file(path: Path, start: int, hasher: Any) -> None:
+    with path.open("rb") as f:
+        f.seek(start)
+        while block := f.read(1024 * 1024):
+            hasher.update(block)
+
+
+def _reflink(src: Path, dst: Path) -> None:
+    """写时复制克隆 (btrfs / xfs 等), 不支持时抛出 OSError"""
+    if sys.platform != "linux":
+        raise OSError(errno.EOPNOTSUPP, "reflink 仅支持 Linux")
+    import fcntl
+
+    with src.open("rb") as s, dst.open("wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            dst.unlink(missing_ok=True)
+            raise
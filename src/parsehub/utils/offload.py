@@ -0,0 +1,166 @@
+"""CPU 密集任务卸载
+
+HTML 转 markdown (markdownify) 和 Twitter Article 渲染都是纯 Python 的 CPU 计算, 在事件循环中直接执行会阻塞
+同一循环中的所有解析和下载。``run_cpu_bound`` 按输入大小决定执行位置:
+
+- 小于 GlobalConfig.cpu_offload_threshold 时直接执行, 不付出线程 / 进程切换的开销
+- 否则交给 GlobalConfig.cpu_offload 指定的线程池或进程池
+
+线程池中的任务仍然需要 GIL, 事件循环要和工作线程轮流执行, 只能把一次长时间阻塞拆成多次短暂停顿;
+进程池完全不占用事件循环所在的进程, 但函数、参数和返回值必须可以 pickle, 首次使用时需要启动子进程。
+
+``offload_stats()`` 记录直接执行时阻塞事件循环的时间, ``LoopLagMonitor`` 测量事件循环的实际延迟,
+用于比较卸载前后的效果。
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from types import TracebackType
+from typing import Any, Literal, Self
+
+from ..config import GlobalConfig
+
+_executors: dict[tuple[str, int | None], Executor] = {}
+_executors_lock = threading.Lock()
+
+
+@dataclass
+class OffloadStats:
+    """CPU 密集任务的执行统计"""
+
+    inline_calls: int = 0
+    """直接在事件循环中执行的次数"""
+    inline_seconds: float = 0.0
+    """直接执行时阻塞事件循环的总时间 (秒)"""
+    inline_max_seconds: float = 0.0
+    """单次直接执行阻塞事件循环的最长时间 (秒)"""
+    offloaded_calls: int = 0
+    """交给线程池 / 进程池执行的次数"""
+    offloaded_seconds: float = 0.0
+    """卸载任务从提交到完成的总时间 (秒), 期间事件循环可以处理其他任务"""
+
+
+_stats = OffloadStats()
+
+
+def offload_stats(reset: bool = False) -> OffloadStats:
+    """
+    获取执行统计
+    :param reset: 获取后清零
+    :return: 统计快照
+    """
+    global _stats
+    snapshot = replace(_stats)
+    if reset:
+        _stats = OffloadStats()
+    return snapshot
+
+
+def _executor(kind: Literal["thread", "process"], workers: int | None) -> Executor:
+    key = (kind, workers)
+    with _executors_lock:
+        if (executor := _executors.get(key)) is None:
+            if kind == "process":
+                # fork 会复制父进程中正在运行的线程状态, 使用 spawn 启动干净的子进程
+                context = multiprocessing.get_context("spawn")
+                executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            else:
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="parsehub-cpu")
+            _executors[key] = executor
+        return executor
+
+
+async def run_cpu_bound[T](func: Callable[..., T], *args: Any, size: int) -> T:
+    """
+    执行 CPU 密集的同步函数
+    :param func: 同步函数, 使用进程池时必须是模块级函数或类方法
+    :param args: 位置参数
+    :param size: 输入大小 (通常为 HTML 长度), 小于 GlobalConfig.cpu_offload_threshold 时直接执行
+    :return: 函数返回值
+    """
+    kind = GlobalConfig.cpu_offload
+    start = time.perf_counter()
+    if kind is None or size < GlobalConfig.cpu_offload_threshold:
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            _stats.inline_calls += 1
+            _stats.inline_seconds += elapsed
+            _stats.inline_max_seconds = max(_stats.inline_max_seconds, elapsed)
+
+    executor = _executor(kind, GlobalConfig.cpu_offload_workers)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+    finally:
+        _stats.offloaded_calls += 1
+        _stats.offloaded_seconds += time.perf_counter() - start
+
+
+def shutdown_executors() -> None:
+    """关闭已创建的线程池和进程池, 下次使用时重新创建"""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+class LoopLagMonitor:
+    """事件循环延迟监测
+
+    后台任务每隔 ``interval`` 秒醒来一次, 实际间隔超出的部分即为事件循环被阻塞的时间::
+
+        async with LoopLagMonitor() as monitor:
+            await parse_many()
+        print(monitor.max_lag, monitor.blocked)
+    """
+
+    def __init__(self, interval: float = 0.005, threshold: float = 0.001) -> None:
+        """
+        :param interval: 检查间隔 (秒)
+        :param threshold: 超过该延迟 (秒) 才计入阻塞时间, 忽略调度本身的抖动
+        """
+        self.interval = interval
+        self.threshold = threshold
+        self.max_lag = 0.0
+        """最长的单次延迟 (秒)"""
+        self.blocked = 0.0
+        """超过阈值的延迟总和 (秒)"""
+        self.samples = 0
+        self._task: asyncio.Task[None] | None = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = loop.time() - start - self.interval
+            self.samples += 1
+            self.max_lag = max(self.max_lag, lag)
+            if lag > self.threshold:
+                self.blocked += lag
+
+    async def __aenter__(self) -> Self:
+        self._task = asyncio.create_task(self._run())
+        # 让监测任务先开始计时
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        if self._task is not None:
+            # 等待一个检查间隔, 已经到期的检查先记录退出前的阻塞
+            await asyncio.sleep(self.interval)
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
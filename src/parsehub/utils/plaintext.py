@@ -0,0 +1,447 @@
+"""markdown 转纯文本
+
+结果与 ``"".join(BeautifulSoup(markdown(text), "lxml").find_all(string=True))`` 相同, 但不序列化 HTML, 也不重新解析 DOM:
+预处理和行内语法直接使用 Python-Markdown 的处理器; 块级结构按 Python-Markdown 的块处理器规则解析,
+覆盖 markdownify 输出的语法: ATX / Setext 标题、段落、列表、引用、缩进代码和分割线;
+最后按 PrettifyTreeprocessor 的换行规则和 BeautifulSoup 的空白规则拼接文字。
+
+含有原始 HTML 块, 或行内 HTML 不是普通的开始标签时, 文字取决于 lxml 的容错解析, 此时仍渲染 HTML 后提取文字。
+"""
+
+import html
+import re
+import threading
+from xml.etree import ElementTree as etree
+
+from bs4 import BeautifulSoup
+from markdown import Markdown, util
+
+TAB_LENGTH = 4
+
+_LIST_TAGS = ("ul", "ol")
+_INDENT = " " * TAB_LENGTH
+
+_INDENT_LEVEL_RE = re.compile(r"^(([ ]{4})+)")
+_HASH_HEADER_RE = re.compile(r"(?:^|\n)(?P<level>#{1,6})(?P<header>(?:\\.|[^\\])*?)#*(?:\n|$)")
+_SETEXT_HEADER_RE = re.compile(r"^.*?\n[=-]+[ ]*(\n|$)", re.MULTILINE)
+_HR_RE = re.compile(
+    r"^[ ]{0,3}(?=(?P<atomicgroup>(-+[ ]{0,2}){3,}|(_+[ ]{0,2}){3,}|(\*+[ ]{0,2}){3,}))(?P=atomicgroup)[ ]*$",
+    re.MULTILINE,
+)
+_OLIST_RE = re.compile(r"^[ ]{0,3}\d+\.[ ]+(.*)")
+_ULIST_RE = re.compile(r"^[ ]{0,3}[*+-][ ]+(.*)")
+_LIST_CHILD_RE = re.compile(r"^[ ]{0,3}((\d+\.)|[*+-])[ ]+(.*)")
+_LIST_INDENT_RE = re.compile(r"^[ ]{4,7}((\d+\.)|[*+-])[ ]+.*")
+_QUOTE_RE = re.compile(r"(^|\n)[ ]{0,3}>[ ]?(.*)")
+_QUOTE_LINE_RE = re.compile(r"^[ ]{0,3}>[ ]?(.*)")
+
+_BLOCK_TAGS = frozenset(("div", "p", "h", "ul", "ol", "li", "blockquote", "pre", "hr"))
+_ASCII_SPACES = " \n\t\f\r"
+# 任一行内处理器可能匹配的字符
+_INLINE_SYNTAX_RE = re.compile(r"[`\\\[!<&*_]|  \n")
+# 属性完整的开始标签; 其余写法 (结束标签、注释、未闭合的引号等) 的文字取决于 HTML 解析器的容错处理
+_START_TAG_RE = re.compile(
+    r"<([A-Za-z][A-Za-z0-9-]*)(?:\s+[^\s\"'>/=]+(?:\s*=\s*(?:\"[^\"]*\"|'[^']*'|[^\s\"'=<>`]+))?)*\s*/?>"
+)
+# 内容不按普通文本解析、保留空白, 或会隐式结束所在段落的标签
+_FALLBACK_TAGS = frozenset(
+    ("script", "style", "textarea", "title", "xmp", "plaintext", "iframe", "noembed", "noframes", "noscript")
+    + ("template", "listing", "head", "body", "html", "svg", "math", *Markdown().block_level_elements)
+)
+_ESCAPED_RE = re.compile(util.STX + r"(\d+)" + util.ETX)
+# 序列化时不转义的 "&...;", 由 HTML 解析器还原为字符
+_REFERENCE_RE = re.compile(r"&(#[0-9]+|#x[0-9a-f]+|[0-9a-z]+);", re.IGNORECASE)
+
+
+class _Element:
+    """最小化的块级元素, 文字保留行内语法"""
+
+    __slots__ = ("tag", "text", "tail", "children")
+
+    def __init__(self, tag: str, text: str = ""):
+        self.tag = tag
+        self.text = text
+        self.tail = ""
+        self.children: list[_Element] = []
+
+    def append(self, tag: str, text: str = "") -> "_Element":
+        child = _Element(tag, text)
+        self.children.append(child)
+        return child
+
+    def last(self) -> "_Element | None":
+        return self.children[-1] if self.children else None
+
+
+class _BlockParser:
+    """Python-Markdown BlockParser 的精简移植, 处理器顺序与原实现相同"""
+
+    def __init__(self) -> None:
+        self.state: list[str] = []
+
+    def parse_chunk(self, parent: _Element, text: str) -> None:
+        self.parse_blocks(parent, text.split("\n\n"))
+
+    def parse_blocks(self, parent: _Element, blocks: list[str]) -> None:
+        while blocks:
+            block = blocks[0]
+            if not block or block.startswith("\n"):
+                self._empty(parent, blocks)
+            elif self._is_list_indent(parent, block):
+                self._list_indent(parent, blocks)
+            elif block.startswith(_INDENT):
+                self._code(parent, blocks)
+            elif _HASH_HEADER_RE.search(block):
+                self._hash_header(parent, blocks)
+            elif _SETEXT_HEADER_RE.match(block):
+                self._setext_header(parent, blocks)
+            elif _HR_RE.search(block):
+                self._hr(parent, blocks)
+            elif _OLIST_RE.match(block):
+                self._list(parent, blocks, "ol")
+            elif _ULIST_RE.match(block):
+                self._list(parent, blocks, "ul")
+            elif _QUOTE_RE.search(block):
+                self._quote(parent, blocks)
+            else:
+                self._paragraph(parent, blocks)
+
+    def _empty(self, parent: _Element, blocks: list[str]) -> None:
+        block = blocks.pop(0)
+        filler = "\n\n"
+        if block:
+            filler = "\n"
+            if rest := block[1:]:
+                blocks.insert(0, rest)
+        sibling = parent.last()
+        if sibling is not None and sibling.tag == "pre":
+            sibling.text += filler
+
+    def _is_list_indent(self, parent: _Element, block: str) -> bool:
+        if not block.startswith(_INDENT) or "detabbed" in self.state[-1:]:
+            return False
+        sibling = parent.last()
+        return parent.tag == "li" or (sibling is not None and sibling.tag in _LIST_TAGS)
+
+    def _list_indent(self, parent: _Element, blocks: list[str]) -> None:
+        block = blocks.pop(0)
+        m = _INDENT_LEVEL_RE.match(block)
+        indent_level = len(m.group(1)) // TAB_LENGTH if m else 0
+        level = 1 if self.state[-1:] == ["list"] else 0
+        sibling = parent
+        while indent_level > level:
+            child = sibling.last()
+            if child is None or (child.tag not in _LIST_TAGS and child.tag != "li"):
+                break
+            if child.tag in _LIST_TAGS:
+                level += 1
+            sibling = child
+
+        prefix = _INDENT * level
+        block = "\n".join(line[len(prefix) :] if line.startswith(prefix) else line for line in block.split("\n"))
+
+        self.state.append("detabbed")
+        last = parent.last()
+        if parent.tag == "li":
+            if last is not None and last.tag in _LIST_TAGS:
+                self.parse_blocks(last, [block])
+            else:
+                self.parse_blocks(parent, [block])
+        elif sibling.tag == "li":
+            self.parse_blocks(sibling, [block])
+        elif sibling.children and sibling.children[-1].tag == "li":
+            item = sibling.children[-1]
+            if item.text:
+                item.children.insert(0, _Element("p", item.text))
+                item.text = ""
+            self.parse_chunk(item, block)
+        else:
+            self.parse_blocks(sibling.append("li"), [block])
+        self.state.pop()
+
+    def _code(self, parent: _Element, blocks: list[str]) -> None:
+        lines = blocks.pop(0).split("\n")
+        code_lines: list[str] = []
+        for line in lines:
+            if line.startswith(_INDENT):
+                code_lines.append(line[TAB_LENGTH:])
+            elif not line.strip():
+                code_lines.append("")
+            else:
+                break
+        code = "\n".join(code_lines).rstrip()
+        sibling = parent.last()
+        if sibling is not None and sibling.tag == "pre":
+            sibling.text = f"{sibling.text}\n{code}\n"
+        else:
+            parent.append("pre", f"{code}\n")
+        if rest := "\n".join(lines[len(code_lines) :]):
+            blocks.insert(0, rest)
+
+    def _hash_header(self, parent: _Element, blocks: list[str]) -> None:
+        block = blocks.pop(0)
+        m = _HASH_HEADER_RE.search(block)
+        assert m is not None
+        if before := block[: m.start()]:
+            self.parse_blocks(parent, [before])
+        parent.append("h", m.group("header").strip())
+        if after := block[m.end() :]:
+            blocks.insert(0, after)
+
+    def _setext_header(self, parent: _Element, blocks: list[str]) -> None:
+        lines = blocks.pop(0).split("\n")
+        parent.append("h", lines[0].strip())
+        if len(lines) > 2:
+            blocks.insert(0, "\n".join(lines[2:]))
+
+    def _hr(self, parent: _Element, blocks: list[str]) -> None:
+        block = blocks.pop(0)
+        m = _HR_RE.search(block)
+        assert m is not None
+        if before := block[: m.start()].rstrip("\n"):
+            self.parse_blocks(parent, [before])
+        parent.append("hr")
+        if after := block[m.end() :].lstrip("\n"):
+            blocks.insert(0, after)
+
+    def _list(self, parent: _Element, blocks: list[str], tag: str) -> None:
+        items: list[str] = []
+        for line in blocks.pop(0).split("\n"):
+            if m := _LIST_CHILD_RE.match(line):
+                items.append(m.group(3))
+            elif _LIST_INDENT_RE.match(line):
+                if items[-1].startswith(_INDENT):
+                    items[-1] = f"{items[-1]}\n{line}"
+                else:
+                    items.append(line)
+            else:
+                items[-1] = f"{items[-1]}\n{line}"
+
+        sibling = parent.last()
+        if sibling is not None and sibling.tag in _LIST_TAGS:
+            # 空行隔开的列表项属于同一个列表, 前一项和新的第一项变为段落
+            lst = sibling
+            item = lst.children[-1]
+            if item.text:
+                item.children.insert(0, _Element("p", item.text))
+                item.text = ""
+            last = item.last()
+            if last is not None and last.tail:
+                item.append("p", last.tail.lstrip())
+                last.tail = ""
+            self.state.append("looselist")
+            self.parse_blocks(lst.append("li"), [items.pop(0)])
+            self.state.pop()
+        elif parent.tag in _LIST_TAGS:
+            lst = parent
+        else:
+            lst = parent.append(tag)
+
+        self.state.append("list")
+        for item_text in items:
+            if item_text.startswith(_INDENT):
+                self.parse_blocks(lst.children[-1], [item_text])
+            else:
+                self.parse_blocks(lst.append("li"), [item_text])
+        self.state.pop()
+
+    def _quote(self, parent: _Element, blocks: list[str]) -> None:
+        block = blocks.pop(0)
+        m = _QUOTE_RE.search(block)
+        assert m is not None
+        self.parse_blocks(parent, [block[: m.start()]])
+        block = "\n".join(_clean_quote_line(line) for line in block[m.start() :].split("\n"))
+        sibling = parent.last()
+        quote = sibling if sibling is not None and sibling.tag == "blockquote" else parent.append("blockquote")
+        self.state.append("blockquote")
+        self.parse_chunk(quote, block)
+        self.state.pop()
+
+    def _paragraph(self, parent: _Element, blocks: list[str]) -> None:
+        block = blocks.pop(0)
+        if not block.strip():
+            return
+        if self.state[-1:] != ["list"]:
+            parent.append("p", block.lstrip())
+            return
+        sibling = parent.last()
+        if sibling is not None:
+            sibling.tail = f"{sibling.tail}\n{block}" if sibling.tail else f"\n{block}"
+        elif parent.text:
+            parent.text = f"{parent.text}\n{block}"
+        else:
+            parent.text = block.lstrip()
+
+
+def _clean_quote_line(line: str) -> str:
+    if line.strip() == ">":
+        return ""
+    m = _QUOTE_LINE_RE.match(line)
+    return m.group(1) if m else line
+
+
+class _RawHtml(Exception):
+    """含有原始 HTML, 其文字取决于 HTML 解析器的容错处理, 改为渲染 HTML 后提取"""
+
+
+class _Markdown(threading.local):
+    """行内语法交给 Python-Markdown 的 InlineProcessor 处理; 处理器带有状态, 每个线程一份"""
+
+    def __init__(self) -> None:
+        self.md = Markdown()
+        self.inline = self.md.treeprocessors["inline"]
+
+
+_MARKDOWN = _Markdown()
+
+
+def _build(element: _Element, parent: etree.Element) -> etree.Element:
+    """转为 ElementTree, 不含行内语法的文字标记为 AtomicString, InlineProcessor 直接跳过"""
+    node = etree.SubElement(parent, element.tag)
+    node.text = _source_text(element.text, atomic=element.tag == "pre")
+    for child in element.children:
+        _build(child, node).tail = _source_text(child.tail)
+    return node
+
+
+def _source_text(text: str, atomic: bool = False) -> str:
+    if atomic or not _INLINE_SYNTAX_RE.search(text):
+        atomic_text: str = util.AtomicString(text)
+        return atomic_text
+    return text
+
+
+def _render(element: etree.Element, parts: list[str | None]) -> None:
+    """按 PrettifyTreeprocessor 的换行规则输出元素文本, None 表示标签, 即文本节点的边界"""
+    text = element.text or ""
+    parts.append(None)
+    if element.tag == "pre":
+        parts.append(text.rstrip() + "\n")
+    elif len(element) and element[0].tag in _BLOCK_TAGS and not text.strip():
+        parts.append("\n")
+    else:
+        _plain(text, parts)
+    for child in element:
+        if child.tag in _BLOCK_TAGS:
+            _render(child, parts)
+            tail = child.tail or ""
+            if tail.strip():
+                _plain(tail, parts)
+            else:
+                parts.append("\n")
+        else:
+            _render_inline(child, parts)
+    parts.append(None)
+
+
+def _render_inline(element: etree.Element, parts: list[str | None]) -> None:
+    tail = element.tail or ""
+    parts.append(None)
+    if element.tag == "br":
+        # <br> 之后只有空白时替换为换行, 否则在前面加上换行
+        parts.append("\n")
+        if tail.strip():
+            _plain(tail, parts)
+        return
+    _plain(element.text or "", parts, unescape=element.tag != "code")
+    for child in element:
+        _render_inline(child, parts)
+    parts.append(None)
+    _plain(tail, parts)
+
+
+def _plain(text: str, parts: list[str | None], unescape: bool = True) -> None:
+    """还原转义 (代码除外) 和字符引用, 与序列化后再由 HTML 解析器读取的结果相同"""
+    if "\x02" not in text:
+        parts.append(_decode(text))
+        return
+    if unescape:
+        text = _ESCAPED_RE.sub(lambda m: chr(int(m.group(1))), text)
+    pieces = util.HTML_PLACEHOLDER_RE.split(text.replace(util.AMP_SUBSTITUTE, "&"))
+    raw_blocks = _MARKDOWN.md.htmlStash.rawHtmlBlocks
+    text = pieces[0]
+    for i in range(1, len(pieces), 2):
+        raw = str(raw_blocks[int(pieces[i])])
+        if raw.startswith("&"):
+            text += raw + pieces[i + 1]
+            continue
+        m = _START_TAG_RE.fullmatch(raw)
+        if m is None or m.group(1).lower() in _FALLBACK_TAGS:
+            raise _RawHtml
+        # 开始标签没有文字, 只分隔文本节点
+        parts.append(_decode(text))
+        parts.append(None)
+        text = pieces[i + 1]
+    parts.append(_decode(text))
+
+
+def _decode(text: str) -> str:
+    return _REFERENCE_RE.sub(_decode_reference, text) if "&" in text else text
+
+
+def _decode_reference(m: re.Match[str]) -> str:
+    # html.unescape 丢弃控制字符等无效码位, HTML 解析器保留原字符
+    char = html.unescape(m.group())
+    if not char and (number := m.group(1)).startswith("#"):
+        return chr(int(number[2:], 16) if number[1] in "xX" else int(number[1:]))
+    return char
+
+
+def _join(parts: list[str | None]) -> str:
+    """拼接文本节点; 与 BeautifulSoup 相同, 只含 ASCII 空白的文本节点替换为一个换行或空格"""
+    result = []
+    node: list[str] = []
+    for part in [*parts, None]:
+        if part is not None:
+            node.append(part)
+            continue
+        if not node:
+            continue
+        text = "".join(node)
+        node.clear()
+        if text and not text.strip(_ASCII_SPACES):
+            text = "\n" if "\n" in text else " "
+        result.append(text)
+    return "".join(result)
+
+
+def _render_html(markdown: str) -> str:
+    md = _MARKDOWN.md
+    md.reset()
+    return "".join(BeautifulSoup(md.convert(markdown), "lxml").find_all(string=True))
+
+
+def markdown_to_text(markdown: str) -> str:
+    """
+    将 markdown 转换为纯文本
+    :param markdown: markdown 文本
+    :return: 纯文本, 与 markdown -> HTML -> BeautifulSoup 提取文字的结果相同
+    """
+    if not markdown.strip():
+        return ""
+    md = _MARKDOWN.md
+    md.reset()
+    lines = markdown.split("\n")
+    for preprocessor in md.preprocessors:
+        lines = preprocessor.run(lines)
+    if md.htmlStash.html_counter:
+        return _render_html(markdown)
+
+    blocks = _Element("div")
+    _BlockParser().parse_chunk(blocks, "\n".join(lines))
+    root = etree.Element("div")
+    for block in blocks.children:
+        _build(block, root)
+    parts: list[str | None] = []
+    try:
+        _MARKDOWN.inline.run(root)
+        for i, child in enumerate(root):
+            if i:
+                parts.append("\n")
+            _render(child, parts)
+    except _RawHtml:
+        return _render_html(markdown)
+    return _join(parts)
+
+
+__all__ = ["markdown_to_text"]
@@ -0,0 +1,94 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from ..config import GlobalConfig
+
+
+class ProgressAggregator:
+    """合并高频的进度更新
+
+    ``update`` 只记录最新进度, 不会等待回调; 距上次回调超过 ``min_interval`` 且变化量达到 ``min_delta`` 时,
+    在后台任务中回调最新进度。回调尚未返回时到达的更新会被合并, 不会堆积。``finish`` 总是会发送最终进度。
+    """
+
+    def __init__(
+        self,
+        callback: Callable[..., Awaitable[None]],
+        *,
+        args: tuple = (),
+        kwargs: dict[str, Any] | None = None,
+        min_interval: float | None = None,
+        min_delta: float = 0,
+    ) -> None:
+        """
+        :param callback: 进度回调, 调用方式为 ``callback(current, total, *args, **kwargs)``
+        :param args: 回调的参数
+        :param kwargs: 回调的关键字参数
+        :param min_interval: 两次回调的最小间隔 (秒), 默认使用 GlobalConfig.progress_interval
+        :param min_delta: 两次回调之间 current 的最小变化量
+        """
+        self.callback = callback
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.min_interval = GlobalConfig.progress_interval if min_interval is None else max(0.0, min_interval)
+        self.min_delta = max(0, min_delta)
+
+        self._current = 0
+        self._total = 0
+        self._emitted: tuple[int, int] | None = None
+        self._emitted_at = float("-inf")
+        self._task: asyncio.Task[None] | None = None
+
+    def update(self, current: int, total: int) -> None:
+        """记录最新进度, 满足间隔和增量条件时在后台回调
+        :raises Exception: 上一次后台回调抛出的异常
+        """
+        self._current, self._total = current, total
+        if self._task is not None:
+            if not self._task.done():
+                return
+            self._consume_task()
+        if self._due():
+            self._task = asyncio.create_task(self._emit())
+
+    async def finish(self, current: int | None = None, total: int | None = None) -> None:
+        """等待进行中的回调, 然后发送最终进度 (与最近一次回调相同时不重复发送)
+        :param current: 最终进度, 默认为最近一次 update 的值
+        :param total: 最终总量, 默认为最近一次 update 的值
+        """
+        if current is not None:
+            self._current = current
+        if total is not None:
+            self._total = total
+        if self._task is not None:
+            await self._task
+            self._task = None
+        if self._emitted != (self._current, self._total):
+            await self._emit()
+
+    def cancel(self) -> None:
+        """取消进行中的回调, 下载失败时调用"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _due(self) -> bool:
+        if self._emitted is None:
+            return True
+        if (self._current, self._total) == self._emitted:
+            return False
+        if time.monotonic() - self._emitted_at < self.min_interval:
+            return False
+        return self._total != self._emitted[1] or abs(self._current - self._emitted[0]) >= self.min_delta
+
+    def _consume_task(self) -> None:
+        task, self._task = self._task, None
+        if task is not None and not task.cancelled() and (error := task.exception()) is not None:
+            raise error
+
+    async def _emit(self) -> None:
+        self._emitted = (self._current, self._total)
+        self._emitted_at = time.monotonic()
+        await self.callback(self._current, self._total, *self.args, **self.kwargs)
@@ -0,0 +1,106 @@
+"""下载限速
+
+令牌桶按"先欠后还"的方式工作: 每收到一个分块就扣除对应字节数, 余额为负时等待到还清为止。
+同一个桶的等待时间按扣除顺序依次累加, 因此多个下载在同一限额内轮流获得带宽;
+每个下载同时只有一个分块在排队 (分片下载的各连接共用一个排队位置), 带宽按下载平均分配。
+
+- 全局限速: GlobalConfig.download_rate_limit
+- 按代理限速: GlobalConfig.proxy_rate_limits
+- 单个下载限速: download(..., rate_limit=...)
+"""
+
+import asyncio
+import threading
+import time
+from collections.abc import Sequence
+
+import httpx
+
+from ..config import GlobalConfig
+from .loop_clients import proxy_key
+
+
+class TokenBucket:
+    """线程安全的令牌桶"""
+
+    def __init__(self, rate: float, burst: float | None = None) -> None:
+        """
+        :param rate: 每秒字节数
+        :param burst: 桶容量, 空闲后最多可以一次性使用的字节数, 默认为 1 秒的量
+        """
+        if rate <= 0:
+            raise ValueError("rate 必须大于 0")
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, size: int) -> float:
+        """扣除 size 字节, 返回需要等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= size
+            return max(0.0, -self._tokens / self.rate)
+
+    async def consume(self, size: int) -> None:
+        """扣除 size 字节并等待"""
+        if (delay := self.reserve(size)) > 0:
+            await asyncio.sleep(delay)
+
+
+class RateLimit:
+    """一个下载使用的全部令牌桶"""
+
+    def __init__(self, buckets: Sequence[TokenBucket]) -> None:
+        self.buckets = list(buckets)
+        self._lock = asyncio.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.buckets)
+
+    async def consume(self, size: int) -> None:
+        """所有桶同时扣除, 等待其中最长的时间; 同一下载的多个连接依次排队"""
+        if not self.buckets:
+            return
+        async with self._lock:
+            delay = max(bucket.reserve(size) for bucket in self.buckets)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+
+_shared: dict[tuple[str, float], TokenBucket] = {}
+_shared_lock = threading.Lock()
+
+
+def _shared_bucket(key: str, rate: float) -> TokenBucket:
+    with _shared_lock:
+        # 修改限额后使用新的桶
+        if (bucket := _shared.get((key, rate))) is None:
+            for stale in [k for k in _shared if k[0] == key]:
+                del _shared[stale]
+            bucket = _shared[(key, rate)] = TokenBucket(rate)
+        return bucket
+
+
+def rate_limit_for(proxy: str | httpx.Proxy | None = None, rate_limit: float | None = None) -> RateLimit:
+    """根据全局配置、代理和单个下载的限额创建 RateLimit"""
+    buckets = []
+    if GlobalConfig.download_rate_limit:
+        buckets.append(_shared_bucket("", GlobalConfig.download_rate_limit))
+    key = proxy_key(proxy)
+    if key and (proxy_rate := GlobalConfig.proxy_rate_limits.get(key)):
+        buckets.append(_shared_bucket(f"proxy:{key}", proxy_rate))
+    if rate_limit:
+        buckets.append(TokenBucket(rate_limit))
+    return RateLimit(buckets)
+
+
+def effective_rate(proxy: str | httpx.Proxy | None = None, rate_limit: float | None = None) -> float | None:
+    """所有适用限额中的最小值, 供无法共用令牌桶的外部下载器 (yt-dlp) 使用"""
+    rates = [GlobalConfig.download_rate_limit, rate_limit]
+    if key := proxy_key(proxy):
+        rates.append(GlobalConfig.proxy_rate_limits.get(key))
+    return min((rate for rate in rates if rate), default=None)
@@ -0,0 +1,181 @@
+"""进程级下载调度
+
+所有 ``SegmentDownloader`` 共用同一个调度器:
+
+- 连接数同时受全局上限和单个 host 上限限制, 超出时按优先级排队 (图片先于视频)
+- 同一事件循环中的下载共用一个 httpx 连接池 (按代理区分), 同一 host 的 keep-alive 连接可以复用
+
+httpx 客户端和等待队列都绑定事件循环, 因此调度状态按事件循环分别维护;
+同步 API 共用 LoopRunner 的后台事件循环, 上限即为进程级上限。
+"""
+
+import asyncio
+import heapq
+import itertools
+import weakref
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import httpx
+
+from ..config import GlobalConfig
+from .loop_clients import LoopClients
+
+
+class DownloadPriority(IntEnum):
+    """下载优先级, 值越小越先获得连接"""
+
+    IMAGE = 0
+    DEFAULT = 10
+    VIDEO = 20
+
+
+class _PrioritySlots:
+    """按优先级分配的计数信号量, 同优先级先到先得"""
+
+    def __init__(self, limit: Callable[[], int]) -> None:
+        self._limit = limit
+        self._used = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+
+    @property
+    def used(self) -> int:
+        return self._used
+
+    @property
+    def idle(self) -> bool:
+        return not self._used and not self._waiters
+
+    async def acquire(self, priority: int) -> None:
+        if self._used < self._limit() and not self._waiters:
+            self._used += 1
+            return
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        self._wake()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 已分配连接但等待方被取消, 交给下一个等待者
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self._used -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self._used < self._limit():
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._used += 1
+            future.set_result(None)
+
+
+class _LoopState:
+    def __init__(self, scheduler: "DownloadScheduler") -> None:
+        self.scheduler = scheduler
+        self.slots = _PrioritySlots(lambda: scheduler.max_connections)
+        self.hosts: dict[str, _PrioritySlots] = {}
+
+    def host_slots(self, host: str) -> _PrioritySlots:
+        if (slots := self.hosts.get(host)) is None:
+            slots = self.hosts[host] = _PrioritySlots(lambda: self.scheduler.max_connections_per_host)
+        return slots
+
+
+class DownloadScheduler:
+    """下载连接调度器"""
+
+    def __init__(
+        self,
+        *,
+        max_connections: int | None = None,
+        max_connections_per_host: int | None = None,
+        keepalive_expiry: float = 30,
+    ) -> None:
+        """
+        :param max_connections: 全局最大连接数, 默认使用 GlobalConfig.download_max_connections
+        :param max_connections_per_host: 单个 host 最大连接数, 默认使用 GlobalConfig.download_max_connections_per_host
+        :param keepalive_expiry: 空闲 keep-alive 连接的保留时间 (秒)
+        """
+        self._max_connections = max_connections
+        self._max_connections_per_host = max_connections_per_host
+        self.keepalive_expiry = keepalive_expiry
+        self._states: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState] = weakref.WeakKeyDictionary()
+        self._clients = LoopClients(self._new_client)
+
+    @property
+    def max_connections(self) -> int:
+        return max(1, self._max_connections or GlobalConfig.download_max_connections)
+
+    @property
+    def max_connections_per_host(self) -> int:
+        return max(1, self._max_connections_per_host or GlobalConfig.download_max_connections_per_host)
+
+    @asynccontextmanager
+    async def connection(self, url: str, priority: int = DownloadPriority.DEFAULT) -> AsyncIterator[None]:
+        """占用一个到 url 所在 host 的连接名额, 退出时释放"""
+        state = self._state()
+        host = _host(url)
+        host_slots = state.host_slots(host)
+        await host_slots.acquire(priority)
+        try:
+            await state.slots.acquire(priority)
+            try:
+                yield
+            finally:
+                state.slots.release()
+        finally:
+            host_slots.release()
+            if host_slots.idle:
+                state.hosts.pop(host, None)
+
+    def client(self, proxy: str | httpx.Proxy | None = None) -> httpx.AsyncClient:
+        """当前事件循环中按代理共用的 httpx 客户端, 请求头和超时需在每个请求上设置; 不保存 Cookie"""
+        return self._clients.get(proxy)
+
+    def active(self, url: str | None = None) -> int:
+        """当前事件循环中正在使用的连接数, 指定 url 时只统计该 host"""
+        state = self._state()
+        if url is None:
+            return state.slots.used
+        slots = state.hosts.get(_host(url))
+        return slots.used if slots else 0
+
+    async def aclose(self) -> None:
+        """关闭当前事件循环中的共用客户端"""
+        await self._clients.aclose()
+
+    def _new_client(self, proxy: str | httpx.Proxy | None) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=None,
+            max_keepalive_connections=self.max_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+        return httpx.AsyncClient(
+            proxy=proxy,
+            limits=limits,
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+        )
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        if (state := self._states.get(loop)) is None:
+            state = self._states[loop] = _LoopState(self)
+        return state
+
+
+def _host(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme.lower()}://{(parts.netloc or '').lower()}"
+
+
+default_scheduler = DownloadScheduler()
+"""下载默认使用的全局调度器"""
@@ -0,0 +1,312 @@
+"""下载目标
+
+``SegmentDownloader`` 把数据写入 DownloadSink, 每次下载尝试的流程为
+``open`` -> ``writer`` 写入 -> ``commit`` / ``discard``, 最终失败时调用 ``fail``。
+
+- FileSink: 写入临时文件, 完成后移动到目标路径 (默认)
+- MemorySink: 写入内存, 适合小图片, 超出上限时报错
+- StreamSink: 作为异步字节迭代器交给消费方 (例如直接转发给上传接口), 缓冲区有上限
+"""
+
+import asyncio
+import os
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager
+from io import BytesIO
+from pathlib import Path
+from types import TracebackType
+from typing import ClassVar, Protocol, Self
+
+from ..errors import SinkError
+from .writer import DEFAULT_BUFFER_SIZE, BufferedFileWriter, preallocate
+
+
+class SinkWriter(Protocol):
+    async def write(self, chunk: bytes) -> None: ...
+
+
+class DownloadSink(ABC):
+    """下载目标基类"""
+
+    seekable: ClassVar[bool] = True
+    """是否支持按偏移量写入; 不支持时只使用单连接顺序下载"""
+
+    @abstractmethod
+    async def open(self, filename: str | None, size: int | None) -> None:
+        """开始一次下载尝试
+        :param filename: 从响应头或 URL 获取的文件名
+        :param size: 文件大小, 未知时为 None
+        :raises SinkError: 文件超出大小限制等无法写入的情况
+        """
+
+    @abstractmethod
+    def writer(
+        self, offset: int = 0, *, buffer_size: int = DEFAULT_BUFFER_SIZE
+    ) -> AbstractAsyncContextManager[SinkWriter]:
+        """从 offset 开始顺序写入的写入器, 分片下载时会同时打开多个"""
+
+    @abstractmethod
+    async def commit(self) -> str:
+        """本次下载完成
+        :return: 结果标识, 文件为路径, 其他为文件名
+        """
+
+    @abstractmethod
+    async def discard(self) -> None:
+        """丢弃本次尝试写入的内容"""
+
+    async def reserve(self, size: int) -> None:  # noqa: B027
+        """分片下载开始前调用, 文件大小已经确认; 默认不做处理"""
+
+    async def fail(self, error: BaseException) -> None:  # noqa: B027
+        """下载最终失败, 默认不做处理"""
+
+
+SinkFactory = Callable[[Path], DownloadSink]
+"""根据默认保存路径创建下载目标, 用于 ``ParseResult.download``"""
+
+
+class FileSink(DownloadSink):
+    """写入文件: 先写入同目录下的临时文件, 完成后原子替换目标文件"""
+
+    def __init__(self, save_path: str | Path | None = None) -> None:
+        """
+        :param save_path: 保存路径, 默认保存到 downloads 文件夹, 以 / 结尾时使用响应头或 URL 中的文件名
+        """
+        self.save_path = save_path
+        self.path: Path | None = None
+        self._temp_dir: Path | None = None
+
+    async def open(self, filename: str | None, size: int | None) -> None:
+        save_dir, name = parse_save_path(self.save_path)
+        name = name or filename
+        if not name:
+            raise SinkError("无法获取文件名")
+        self.path = save_dir.joinpath(name)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._temp_dir = self.path.parent.joinpath(f".{self.path.name}.{uuid.uuid4().hex}.parsehub-tmp")
+        self._temp_dir.mkdir(parents=True, exist_ok=False)
+
+    def writer(
+        self, offset: int = 0, *, buffer_size: int = DEFAULT_BUFFER_SIZE
+    ) -> AbstractAsyncContextManager[SinkWriter]:
+        # 每次尝试都使用新的临时文件, 分片写入同一文件时不能截断
+        return BufferedFileWriter(self._temp_path(), offset=offset, buffer_size=buffer_size, truncate=False)
+
+    async def reserve(self, size: int) -> None:
+        # 分片乱序写入时不需要反复扩展文件, 也能提前发现磁盘空间不足
+        await preallocate(self._temp_path(), size)
+
+    async def commit(self) -> str:
+        if self.path is None:
+            raise SinkError("下载路径尚未初始化")
+        temp_path = self._temp_path()
+        if not temp_path.exists():
+            temp_path.touch()
+        os.replace(temp_path, self.path)
+        await self.discard()
+        return str(self.path)
+
+    async def discard(self) -> None:
+        if self._temp_dir:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+        self._temp_dir = None
+
+    def _temp_path(self) -> Path:
+        if self._temp_dir is None:
+            raise SinkError("临时目录尚未初始化")
+        return self._temp_dir.joinpath("complete.tmp")
+
+
+class MemorySink(DownloadSink):
+    """写入内存, 完成后可通过 ``data`` / ``getbuffer()`` 读取"""
+
+    def __init__(self, max_size: int = 20 * 1024 * 1024) -> None:
+        """
+        :param max_size: 最大字节数, 响应声明的大小或实际写入超出时抛出 SinkError
+        """
+        self.max_size = max_size
+        self.filename: str | None = None
+        self.data: bytes | None = None
+        self._buffer = bytearray()
+
+    async def open(self, filename: str | None, size: int | None) -> None:
+        if size is not None and size > self.max_size:
+            raise SinkError(f"文件大小 {size} 超出内存上限 {self.max_size}")
+        self.filename = filename
+        self._buffer = bytearray()
+
+    def writer(self, offset: int = 0, *, buffer_size: int = DEFAULT_BUFFER_SIZE) -> "_MemoryWriter":
+        return _MemoryWriter(self, offset)
+
+    async def commit(self) -> str:
+        self.data = bytes(self._buffer)
+        self._buffer = bytearray()
+        return self.filename or ""
+
+    async def discard(self) -> None:
+        self._buffer = bytearray()
+
+    def getbuffer(self) -> BytesIO:
+        """以 BytesIO 读取下载内容"""
+        if self.data is None:
+            raise SinkError("下载尚未完成")
+        return BytesIO(self.data)
+
+    def _write_at(self, offset: int, chunk: bytes) -> None:
+        end = offset + len(chunk)
+        if end > self.max_size:
+            raise SinkError(f"写入内容超出内存上限 {self.max_size}")
+        if len(self._buffer) < end:
+            self._buffer.extend(bytes(end - len(self._buffer)))
+        self._buffer[offset:end] = chunk
+
+
+class _MemoryWriter:
+    def __init__(self, sink: MemorySink, offset: int) -> None:
+        self.sink = sink
+        self.offset = offset
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        return None
+
+    async def write(self, chunk: bytes) -> None:
+        self.sink._write_at(self.offset, chunk)
+        self.offset += len(chunk)
+
+
+_END = object()
+
+
+class StreamSink(DownloadSink, AsyncIterator[bytes]):
+    """以异步字节迭代器输出下载内容
+
+    下载与消费需在不同任务中同时进行; 缓冲的数据超过 ``max_buffer`` 时下载会等待消费方读取。
+    下载重试时会跳过已经交给消费方的字节, 消费方不会收到重复数据。
+    """
+
+    seekable = False
+
+    def __init__(self, max_buffer: int = 4 * 1024 * 1024) -> None:
+        """
+        :param max_buffer: 最多缓冲的字节数
+        """
+        self.max_buffer = max_buffer
+        self.filename: str | None = None
+        self.size: int | None = None
+        self._queue: asyncio.Queue[object] = asyncio.Queue()
+        self._buffered = 0
+        self._drained = asyncio.Event()
+        self._opened = asyncio.Event()
+        self._delivered = 0
+        self._skip = 0
+        self._closed = False
+
+    async def info(self) -> tuple[str | None, int | None]:
+        """等待下载开始, 返回 (文件名, 文件大小)"""
+        await self._opened.wait()
+        return self.filename, self.size
+
+    async def open(self, filename: str | None, size: int | None) -> None:
+        self._check_closed()
+        self.filename, self.size = filename, size
+        self._skip = self._delivered
+        self._opened.set()
+
+    def writer(self, offset: int = 0, *, buffer_size: int = DEFAULT_BUFFER_SIZE) -> "_StreamWriter":
+        if offset:
+            raise SinkError("StreamSink 只支持顺序写入")
+        return _StreamWriter(self)
+
+    async def commit(self) -> str:
+        self._queue.put_nowait(_END)
+        return self.filename or ""
+
+    async def discard(self) -> None:
+        return None
+
+    async def fail(self, error: BaseException) -> None:
+        self._opened.set()
+        self._queue.put_nowait(error)
+
+    async def aclose(self) -> None:
+        """消费方提前结束读取, 正在进行的下载会以 SinkError 结束"""
+        self._closed = True
+        self._drained.set()
+
+    def __aiter__(self) -> Self:
+        return self
+
+    async def __anext__(self) -> bytes:
+        if self._closed:
+            raise StopAsyncIteration
+        item = await self._queue.get()
+        if isinstance(item, BaseException):
+            raise item
+        if not isinstance(item, bytes):
+            # _END
+            raise StopAsyncIteration
+        self._buffered -= len(item)
+        self._drained.set()
+        return item
+
+    async def _put(self, chunk: bytes) -> None:
+        if self._skip:
+            skipped = min(self._skip, len(chunk))
+            self._skip -= skipped
+            chunk = chunk[skipped:]
+            if not chunk:
+                return
+        while self._buffered and self._buffered + len(chunk) > self.max_buffer:
+            self._check_closed()
+            self._drained.clear()
+            await self._drained.wait()
+        self._check_closed()
+        self._buffered += len(chunk)
+        self._delivered += len(chunk)
+        self._queue.put_nowait(chunk)
+
+    def _check_closed(self) -> None:
+        if self._closed:
+            raise SinkError("消费方已停止读取")
+
+
+class _StreamWriter:
+    def __init__(self, sink: StreamSink) -> None:
+        self.sink = sink
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        return None
+
+    async def write(self, chunk: bytes) -> None:
+        await self.sink._put(chunk)
+
+
+def parse_save_path(save_path: str | Path | None) -> tuple[Path, str | None]:
+    """解析保存路径，返回 (目录, 文件名或 None)"""
+    if not save_path:
+        return Path.cwd().joinpath("downloads"), None
+
+    save_path_str = str(save_path)
+    save_dir_str, filename = os.path.split(save_path_str)
+    save_dir = Path(os.path.abspath(save_dir_str)) if save_dir_str else Path.cwd().joinpath("downloads")
+    return save_dir, filename if filename else None
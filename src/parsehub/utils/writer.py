@@ -0,0 +1,167 @@
+"""下载写入阶段
+
+网络分块先在内存中攒成较大的缓冲区, 再交给专用 I/O 线程用 ``os.pwritev`` 按偏移量写入,
+每个缓冲区只切换一次线程; 未完成的写入数量有上限, 磁盘跟不上时会反压网络读取。
+分片下载开始前用 ``preallocate`` 按文件大小预先分配空间, 各分片写入时不再扩展文件。
+"""
+
+import asyncio
+import os
+import threading
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import TracebackType
+from typing import Self
+
+DEFAULT_BUFFER_SIZE = 2 * 1024 * 1024
+
+_IO_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="parsehub-io")
+_IOV_MAX = os.sysconf("SC_IOV_MAX") if hasattr(os, "sysconf") and "SC_IOV_MAX" in os.sysconf_names else 1024
+_SEEK_LOCK = threading.Lock()
+
+
+class BufferedFileWriter:
+    """按偏移量写入文件的缓冲写入器
+
+    多个写入器可以同时写入同一个文件的不同区间 (例如分片下载直接写入最终文件)。
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        offset: int = 0,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        max_pending: int = 1,
+        truncate: bool = True,
+    ) -> None:
+        """
+        :param path: 文件路径, 不存在时创建
+        :param offset: 起始写入位置
+        :param buffer_size: 缓冲区大小, 攒够后提交给 I/O 线程; 小于等于 0 时每个分块都立即提交
+        :param max_pending: 最多同时进行的写入数, 超出时 write 会等待
+        :param truncate: 打开时是否清空文件
+        """
+        self.path = Path(path)
+        self.offset = offset
+        self.buffer_size = buffer_size
+        self.truncate = truncate
+        self._fd: int | None = None
+        self._chunks: list[bytes] = []
+        self._buffered = 0
+        self._pending: set[asyncio.Future[None]] = set()
+        self._slots = asyncio.Semaphore(max(1, max_pending))
+
+    async def __aenter__(self) -> Self:
+        flags = os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0)
+        if self.truncate:
+            flags |= os.O_TRUNC
+        self._fd = await asyncio.get_running_loop().run_in_executor(_IO_EXECUTOR, os.open, self.path, flags, 0o644)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        try:
+            if exc_type is None:
+                await self.flush()
+            else:
+                await asyncio.gather(*self._pending, return_exceptions=True)
+        finally:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    async def write(self, chunk: bytes) -> None:
+        """写入分块, 缓冲区满时提交写入
+        :raises OSError: 之前提交的写入失败
+        """
+        if not chunk:
+            return
+        self._chunks.append(chunk)
+        self._buffered += len(chunk)
+        if self._buffered >= self.buffer_size:
+            await self._submit()
+
+    async def flush(self) -> None:
+        """提交剩余缓冲区并等待所有写入完成"""
+        if self._chunks:
+            await self._submit()
+        if self._pending:
+            await asyncio.gather(*self._pending)
+
+    async def _submit(self) -> None:
+        if self._fd is None:
+            raise ValueError("写入器尚未打开")
+        chunks, offset = self._chunks, self.offset
+        self._chunks = []
+        self.offset += self._buffered
+        self._buffered = 0
+
+        await self._slots.acquire()
+        self._raise_failed()
+        future = asyncio.get_running_loop().run_in_executor(_IO_EXECUTOR, write_at, self._fd, chunks, offset)
+        self._pending.add(future)
+        future.add_done_callback(self._on_done)
+
+    def _on_done(self, future: asyncio.Future[None]) -> None:
+        self._slots.release()
+        if future.cancelled() or future.exception() is None:
+            self._pending.discard(future)
+
+    def _raise_failed(self) -> None:
+        for future in self._pending:
+            if future.done() and (error := future.exception()) is not None:
+                raise error
+
+
+async def preallocate(path: str | Path, size: int) -> None:
+    """在 I/O 线程中创建文件并预先分配 size 字节
+    :param path: 文件路径, 已存在时保留内容
+    :param size: 文件大小
+    """
+    await asyncio.get_running_loop().run_in_executor(_IO_EXECUTOR, _preallocate, path, size)
+
+
+def _preallocate(path: str | Path, size: int) -> None:
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        if size <= 0:
+            return
+        if hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(fd, 0, size)
+                return
+            except OSError:
+                # 文件系统不支持时退化为设置文件长度 (稀疏文件)
+                pass
+        os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+
+
+def write_at(fd: int, chunks: Sequence[bytes], offset: int) -> None:
+    """在 offset 处写入全部分块, 处理部分写入"""
+    if len(chunks) > _IOV_MAX:
+        chunks = [b"".join(chunks)]
+    views = [memoryview(chunk) for chunk in chunks]
+    while views:
+        written = _pwritev(fd, views, offset)
+        offset += written
+        while views and written >= len(views[0]):
+            written -= len(views.pop(0))
+        if views and written:
+            views[0] = views[0][written:]
+
+
+def _pwritev(fd: int, views: list[memoryview], offset: int) -> int:
+    if hasattr(os, "pwritev"):
+        return os.pwritev(fd, views, offset)
+    # Windows 没有 pwrite / pwritev, 退化为加锁的 lseek + write
+    with _SEEK_LOCK:
+        os.lseek(fd, offset, os.SEEK_SET)
+        return os.write(fd, views[0])
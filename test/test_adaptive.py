@@ -0,0 +1,84 @@
+import unittest
+
+from parsehub.utils import adaptive
+from parsehub.utils.adaptive import AdaptiveSplitter
+
+MiB = 1024 * 1024
+URL = "https://cdn.example.com/video.mp4"
+
+
+class AdaptiveSplitterTest(unittest.TestCase):
+    def tearDown(self):
+        adaptive._HOST_HISTORY.clear()
+
+    def test_initial_split_uses_size_and_history(self):
+        self.assertEqual(AdaptiveSplitter(URL, 64 * MiB).initial, adaptive.AUTO_DEFAULT_CONNECTIONS)
+        self.assertEqual(AdaptiveSplitter(URL, MiB // 2).initial, 1)
+
+        adaptive._HOST_HISTORY.set("cdn.example.com", 6)
+        splitter = AdaptiveSplitter(URL, 64 * MiB)
+        self.assertEqual(splitter.initial, 6)
+        self.assertEqual(len(splitter.segments), 6)
+        self.assertEqual(splitter.segments[-1].end, 64 * MiB - 1)
+        # 文件太小时不按历史值拆分
+        self.assertEqual(AdaptiveSplitter(URL, 3 * MiB).initial, 3)
+
+    def test_steal_splits_largest_segment(self):
+        splitter = AdaptiveSplitter(URL, 8 * MiB)
+        first, second = splitter.segments
+        self.assertIs(splitter.next_segment(), second)
+
+        first.start += 3 * MiB
+        stolen = splitter.next_segment()
+
+        assert stolen is not None
+        self.assertEqual(stolen.end, 8 * MiB - 1)
+        self.assertEqual(second.end + 1, stolen.start)
+        self.assertEqual(sum(segment.remaining for segment in splitter.segments), 5 * MiB)
+
+    def test_no_steal_below_min_segment(self):
+        splitter = AdaptiveSplitter(URL, 2 * MiB)
+        splitter.next_segment()
+        splitter.segments[0].start = splitter.segments[0].end - 10
+
+        self.assertIsNone(splitter.next_segment())
+
+    def test_throttled_segment_is_given_back(self):
+        splitter = AdaptiveSplitter(URL, 8 * MiB)
+        segment = splitter.next_segment()
+        assert segment is not None
+
+        splitter.give_back(segment)
+
+        self.assertIs(splitter.next_segment(), segment)
+
+    def test_growth_stops_on_plateau_and_records_previous_peak(self):
+        splitter = AdaptiveSplitter(URL, 64 * MiB)
+        for _ in range(3):
+            splitter.enter()
+
+        splitter._sample = (splitter._sample[0] - 1, 0)
+        splitter.received = 10 * MiB
+        self.assertTrue(splitter.should_grow())
+
+        splitter._sample = (splitter._sample[0] - 1, splitter.received)
+        splitter.received += 10 * MiB
+        self.assertFalse(splitter.should_grow())
+        self.assertTrue(splitter.plateaued)
+
+        splitter.record()
+        self.assertEqual(adaptive.history(URL), 2)
+
+    def test_throttle_stops_growth(self):
+        splitter = AdaptiveSplitter(URL, 64 * MiB)
+        splitter.enter()
+        splitter.enter()
+        splitter.throttled = True
+
+        self.assertFalse(splitter.should_grow())
+        splitter.record()
+        self.assertEqual(adaptive.history(URL), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
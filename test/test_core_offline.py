@@ -1,14 +1,20 @@
+import asyncio
+import contextlib
+import threading
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch
 from urllib.parse import parse_qs, urlparse
 
+import httpx
+
 from parsehub import ParseHub
 from parsehub.errors import ParseError, UnknownPlatform
 from parsehub.parsers.base import BaseParser
 from parsehub.parsers.parser.douyin import parse_video_info
 from parsehub.provider_api.douyin import DouyinMobileCrawler, DouyinMobileDevice
 from parsehub.types import ImageParseResult, ImageRef, Platform, VideoParseResult, VideoRef
-from parsehub.utils.helpers import SecretCookie, match_url, run_sync
+from parsehub.utils.helpers import LoopRunner, SecretCookie, match_url, run_sync
 
 
 class DummyParser(BaseParser):
@@ -45,7 +51,17 @@ class ParseErrorParser(BaseParser):
         raise ParseError("already normalized")
 
 
-for _parser in (DummyParser, BrokenParser, ParseErrorParser):
+class RedirectParser(BaseParser):
+    __platform__ = Platform.TIEBA
+    __supported_type__ = ["测试"]
+    __match__ = r"^(https?://)?127\.0\.0\.1"
+    __redirect_keywords__ = ["/s/"]
+
+    async def _do_parse(self, raw_url: str) -> VideoParseResult:
+        return VideoParseResult(video=raw_url)
+
+
+for _parser in (DummyParser, BrokenParser, ParseErrorParser, RedirectParser):
     if _parser in BaseParser._registry:
         BaseParser._registry.remove(_parser)
 
@@ -109,6 +125,84 @@ class TestBaseParserUrlCleaning(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(result.raw_url, "https://dummy.com/items/42?keep=stay")
 
 
+class RedirectHandler(BaseHTTPRequestHandler):
+    requests: list[tuple[str, str]] = []
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+    def do_GET(self) -> None:
+        self.__class__.requests.append(("GET", self.path))
+        if self.path.startswith("/s/"):
+            self.send_response(302)
+            self.send_header("Location", "/hop?tracking=1")
+            self.end_headers()
+        elif self.path.startswith("/hop"):
+            self.send_response(301)
+            self.send_header("Location", "/items/42?keep=1&tracking=2")
+            self.end_headers()
+        else:
+            self.send_response(200)
+            self.send_header("Content-Length", str(1024 * 1024))
+            self.end_headers()
+            with contextlib.suppress(OSError):
+                self.wfile.write(b"x" * 1024 * 1024)
+
+
+@contextlib.contextmanager
+def redirect_server():
+    class Handler(RedirectHandler):
+        requests = []
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}", Handler
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
+
+
+class TestRedirectResolution(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        BaseParser._redirect_cache.clear()
+
+    async def test_get_raw_url_follows_location_hops_and_caches_short_link(self):
+        with redirect_server() as (base, handler):
+            parser = RedirectParser()
+
+            first = await parser.get_raw_url(f"{base}/s/abc")
+            second = await parser.get_raw_url(f"{base}/s/abc")
+
+        self.assertEqual(first, f"{base}/items/42")
+        self.assertEqual(second, first)
+        self.assertEqual(
+            [path for _, path in handler.requests], ["/s/abc", "/hop?tracking=1", "/items/42?keep=1&tracking=2"]
+        )
+
+    async def test_redirect_cache_is_keyed_by_proxy(self):
+        async def follow(parser: BaseParser, url: str, headers: dict) -> httpx.Request:
+            return httpx.Request("GET", f"https://example.com/{parser.proxy or 'direct'}")
+
+        with patch.object(BaseParser, "_follow_redirects", autospec=True, side_effect=follow) as follow_mock:
+            direct = await RedirectParser().get_raw_url("https://short.example/s/abc")
+            proxied = await RedirectParser(proxy="http://proxy.example:8080").get_raw_url("https://short.example/s/abc")
+            again = await RedirectParser(proxy="http://proxy.example:8080").get_raw_url("https://short.example/s/abc")
+
+        self.assertEqual(direct, "https://example.com/direct")
+        self.assertEqual(proxied, "https://example.com/http://proxy.example:8080")
+        self.assertEqual(again, proxied)
+        self.assertEqual(follow_mock.call_count, 2)
+
+    async def test_get_raw_url_wraps_redirect_failures(self):
+        parser = RedirectParser()
+
+        with self.assertRaisesRegex(ParseError, "获取原始链接"):
+            await parser.get_raw_url("http://127.0.0.1:1/s/abc")
+
+
 class TestParserRegistry(unittest.TestCase):
     def test_parsehub_reports_platform_metadata_without_network_calls(self):
         parsehub = ParseHub()
@@ -434,6 +528,54 @@ class TestPlatformUrlMatching(unittest.TestCase):
                 self.assertIsNone(parsehub.get_platform(url))
 
 
+class TestLoopRunner(unittest.TestCase):
+    def test_runner_reuses_one_loop_across_calls_and_threads(self):
+        async def current_loop():
+            await asyncio.sleep(0.01)
+            return asyncio.get_running_loop()
+
+        runner = LoopRunner()
+        try:
+            loops = [run_sync(current_loop(), runner) for _ in range(2)]
+            threads = [threading.Thread(target=lambda: loops.append(runner.run(current_loop()))) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(len(loops), 10)
+            self.assertEqual({id(loop) for loop in loops}, {id(runner.loop)})
+        finally:
+            runner.close()
+        self.assertFalse(runner.running)
+        self.assertTrue(loops[0].is_closed())
+
+    def test_runner_cancels_coroutine_on_timeout(self):
+        cancelled = threading.Event()
+
+        async def wait_forever():
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with contextlib.closing(LoopRunner()) as runner:
+            with self.assertRaises(TimeoutError):
+                runner.run(wait_forever(), timeout=0.05)
+            self.assertTrue(cancelled.wait(5))
+
+    def test_parsehub_sync_api_uses_its_runner(self):
+        with ParseHub() as parsehub:
+            parsehub.parsers = [DummyParser]
+
+            result = parsehub.parse_sync("https://dummy.com/items/1")
+
+            self.assertIs(result.runner, parsehub.runner)
+            self.assertTrue(parsehub.runner.running)
+        self.assertFalse(parsehub.runner.running)
+
+
 class TestRunSyncInsideEventLoop(unittest.IsolatedAsyncioTestCase):
     async def test_run_sync_raises_inside_existing_event_loop(self):
         async def get_value():
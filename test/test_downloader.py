@@ -1,20 +1,51 @@
+import asyncio
 import contextlib
 import threading
+import time
 import unittest
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from typing import ClassVar
-
-from parsehub.errors import DownloadError
+from unittest.mock import patch
+
+from parsehub.config import GlobalConfig
+from parsehub.errors import DownloadError, SinkError
+from parsehub.parsers.base.ytdlp import YtVideoInfo, YtVideoParseResult, _direct_format
+from parsehub.types import (
+    ImageParseResult,
+    ImageRef,
+    LivePhotoFile,
+    LivePhotoRef,
+    MemorySink,
+    MultimediaParseResult,
+    StreamSink,
+    VideoFile,
+    VideoRef,
+)
+from parsehub.utils import adaptive, writer
 from parsehub.utils.downloader import download
+from parsehub.utils.instrumentation import MetricsRecorder, add_instrument, remove_instrument
+from parsehub.utils.media_info import MediaInfoReader
+from parsehub.utils.media_store import MediaStore
+from parsehub.utils.scheduler import DownloadScheduler
 
 
 class RangeTestHandler(BaseHTTPRequestHandler):
     content: ClassVar[bytes] = b""
     support_range: ClassVar[bool] = True
     fail_all: ClassVar[bool] = False
+    fail_status: ClassVar[int] = 500
+    filename: ClassVar[str | None] = None
     requests: ClassVar[list[tuple[str, str | None]]] = []
+    if_ranges: ClassVar[list[str | None]] = []
+    user_agents: ClassVar[list[str | None]] = []
+    active: ClassVar[int] = 0
+    max_active: ClassVar[int] = 0
+    lock: ClassVar[threading.Lock] = threading.Lock()
+    throttle_above: ClassVar[int | None] = None
+    chunk_delay: ClassVar[float] = 0
+    throttled: ClassVar[int] = 0
 
     def log_message(self, format: str, *args: object) -> None:
         return
@@ -32,10 +63,30 @@ class RangeTestHandler(BaseHTTPRequestHandler):
         self.end_headers()
 
     def do_GET(self) -> None:
+        cls = self.__class__
+        with cls.lock:
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+            throttle = cls.throttle_above is not None and cls.active > cls.throttle_above
+            cls.throttled += throttle
+        try:
+            if throttle:
+                self.send_response(429)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self._do_get()
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def _do_get(self) -> None:
         range_header = self.headers.get("Range")
         self.__class__.requests.append(("GET", range_header))
+        self.__class__.if_ranges.append(self.headers.get("If-Range"))
+        self.__class__.user_agents.append(self.headers.get("User-Agent"))
         if self.fail_all:
-            self.send_response(500)
+            self.send_response(self.fail_status)
             self.end_headers()
             return
 
@@ -53,15 +104,31 @@ class RangeTestHandler(BaseHTTPRequestHandler):
             self.send_header("Content-Length", str(len(body)))
             self.send_header("Content-Range", f"bytes {start}-{end}/{len(self.content)}")
             self.send_header("Accept-Ranges", "bytes")
+            self.send_header("ETag", '"v1"')
+            self._send_filename()
             self.end_headers()
-            self.wfile.write(body)
+            self._write_body(body)
             return
 
         self.send_response(200)
         self.send_header("Content-Length", str(len(self.content)))
         self.send_header("Accept-Ranges", "none")
+        self._send_filename()
         self.end_headers()
-        self.wfile.write(self.content)
+        self._write_body(self.content)
+
+    def _send_filename(self) -> None:
+        if self.filename:
+            self.send_header("Content-Disposition", f'attachment; filename="{self.filename}"')
+
+    def _write_body(self, body: bytes) -> None:
+        # 客户端读够第一个分片后会主动断开
+        with contextlib.suppress(ConnectionError):
+            step = 16 * 1024 if self.chunk_delay else 1024
+            for i in range(0, len(body), step):
+                self.wfile.write(body[i : i + step])
+                if self.chunk_delay:
+                    time.sleep(self.chunk_delay)
 
     @staticmethod
     def _parse_range(header: str) -> tuple[int, int]:
@@ -69,18 +136,36 @@ class RangeTestHandler(BaseHTTPRequestHandler):
         if not header.startswith(prefix):
             return 0, 0
         start_text, end_text = header.removeprefix(prefix).split("-", 1)
-        return int(start_text), int(end_text)
+        return int(start_text), int(end_text) if end_text else 2**63
 
 
 @contextlib.contextmanager
-def range_server(*, content: bytes, support_range: bool = True, fail_all: bool = False):
+def range_server(
+    *,
+    content: bytes,
+    support_range: bool = True,
+    fail_all: bool = False,
+    fail_status: int = 500,
+    filename: str | None = None,
+    throttle_above: int | None = None,
+    chunk_delay: float = 0,
+):
     class Handler(RangeTestHandler):
         pass
 
     Handler.content = content
     Handler.support_range = support_range
     Handler.fail_all = fail_all
+    Handler.fail_status = fail_status
+    Handler.filename = filename
     Handler.requests = []
+    Handler.if_ranges = []
+    Handler.user_agents = []
+    Handler.active = Handler.max_active = 0
+    Handler.lock = threading.Lock()
+    Handler.throttle_above = throttle_above
+    Handler.chunk_delay = chunk_delay
+    Handler.throttled = 0
 
     server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
     thread = threading.Thread(target=server.serve_forever, daemon=True)
@@ -101,7 +186,11 @@ class DownloaderTest(unittest.IsolatedAsyncioTestCase):
         async def progress(current: int, total: int) -> None:
             progresses.append((current, total))
 
-        with TemporaryDirectory() as tmp, range_server(content=content, support_range=True) as (url, handler):
+        with (
+            TemporaryDirectory() as tmp,
+            range_server(content=content, support_range=True) as (url, handler),
+            patch.object(writer, "_preallocate", wraps=writer._preallocate) as allocate,
+        ):
             target = Path(tmp) / "video.bin"
 
             path = await download(
@@ -113,11 +202,20 @@ class DownloaderTest(unittest.IsolatedAsyncioTestCase):
                 chunk_size=128,
             )
 
+            self.assertEqual(allocate.call_args.args[1], len(content))
             self.assertEqual(Path(path), target)
             self.assertEqual(target.read_bytes(), content)
             self.assertEqual(progresses[-1], (len(content), len(content)))
-            range_gets = [range_header for method, range_header in handler.requests if method == "GET" and range_header]
-            self.assertGreaterEqual(len(range_gets), 2)
+            self.assertEqual(
+                sorted(handler.requests),
+                [
+                    ("GET", "bytes=0-"),
+                    ("GET", "bytes=1255-2509"),
+                    ("GET", "bytes=2510-3764"),
+                    ("GET", "bytes=3765-5019"),
+                ],
+            )
+            self.assertEqual(handler.if_ranges.count('"v1"'), 3)
             self.assertFalse(list(Path(tmp).glob(".*.parsehub-tmp")))
 
     async def test_download_falls_back_to_single_request_when_range_is_ignored(self):
@@ -129,10 +227,40 @@ class DownloaderTest(unittest.IsolatedAsyncioTestCase):
             await download(url, target, connections=4, min_split_size=10, chunk_size=32)
 
             self.assertEqual(target.read_bytes(), content)
-            self.assertIn(("GET", "bytes=0-0"), handler.requests)
-            self.assertIn(("GET", None), handler.requests)
+            self.assertEqual(handler.requests, [("GET", "bytes=0-")])
             self.assertFalse(list(Path(tmp).glob(".*.parsehub-tmp")))
 
+    async def test_progress_is_coalesced_and_ends_at_total(self):
+        content = bytes(range(256)) * 64
+        progresses: list[tuple[int, int]] = []
+
+        async def progress(current: int, total: int) -> None:
+            progresses.append((current, total))
+
+        with TemporaryDirectory() as tmp, range_server(content=content) as (url, _):
+            await download(
+                url,
+                Path(tmp) / "a.bin",
+                progress=progress,
+                connections=4,
+                min_split_size=1024,
+                chunk_size=64,
+                progress_interval=60,
+            )
+
+        self.assertLessEqual(len(progresses), 2)
+        self.assertEqual(progresses[-1], (len(content), len(content)))
+
+    async def test_small_file_is_downloaded_with_one_request(self):
+        content = b"small-image" * 10
+
+        with TemporaryDirectory() as tmp, range_server(content=content, filename="photo.jpg") as (url, handler):
+            path = await download(url, f"{tmp}/", connections=4)
+
+            self.assertEqual(Path(path), Path(tmp) / "photo.jpg")
+            self.assertEqual(Path(path).read_bytes(), content)
+            self.assertEqual(handler.requests, [("GET", "bytes=0-")])
+
     async def test_download_keeps_existing_file_when_request_fails(self):
         with TemporaryDirectory() as tmp, range_server(content=b"new", support_range=True, fail_all=True) as (url, _):
             target = Path(tmp) / "video.bin"
@@ -156,6 +284,380 @@ class DownloaderTest(unittest.IsolatedAsyncioTestCase):
             range_gets = [range_header for method, range_header in handler.requests if method == "GET" and range_header]
             self.assertEqual(range_gets, [])
 
+    async def test_rate_limit_slows_download(self):
+        content = bytes(range(256)) * 256
+
+        with TemporaryDirectory() as tmp, range_server(content=content) as (url, _):
+            start = asyncio.get_running_loop().time()
+            path = await download(url, Path(tmp) / "a.bin", connections=2, min_split_size=1024, rate_limit=32 * 1024)
+
+            self.assertGreaterEqual(asyncio.get_running_loop().time() - start, 0.9)
+            self.assertEqual(Path(path).read_bytes(), content)
+
+
+class AdaptiveDownloadTest(unittest.IsolatedAsyncioTestCase):
+    def tearDown(self):
+        adaptive._HOST_HISTORY.clear()
+
+    async def test_auto_adds_connections_while_throughput_rises(self):
+        content = bytes(range(256)) * 4096 * 8
+
+        with TemporaryDirectory() as tmp, range_server(content=content, chunk_delay=0.01) as (url, handler):
+            path = await download(url, Path(tmp) / "a.bin", connections="auto")
+
+            self.assertEqual(Path(path).read_bytes(), content)
+            self.assertGreater(handler.max_active, adaptive.AUTO_DEFAULT_CONNECTIONS)
+            self.assertIsNotNone(adaptive.history(url))
+
+    async def test_auto_stops_growing_when_throttled(self):
+        content = bytes(range(256)) * 4096 * 8
+
+        with (
+            TemporaryDirectory() as tmp,
+            range_server(content=content, chunk_delay=0.01, throttle_above=2) as (url, handler),
+        ):
+            path = await download(url, Path(tmp) / "a.bin", connections="auto")
+
+            self.assertEqual(Path(path).read_bytes(), content)
+            self.assertGreater(handler.throttled, 0)
+            self.assertEqual(adaptive.history(url), 2)
+
+    async def test_waiting_connections_are_dropped_when_host_is_saturated(self):
+        content = bytes(range(256)) * 4096 * 8
+        scheduler = DownloadScheduler(max_connections_per_host=2)
+
+        with TemporaryDirectory() as tmp, range_server(content=content) as (url, handler):
+            try:
+                paths = await asyncio.wait_for(
+                    asyncio.gather(
+                        *(
+                            download(url, Path(tmp) / f"{i}.bin", connections="auto", scheduler=scheduler)
+                            for i in range(3)
+                        )
+                    ),
+                    timeout=10,
+                )
+            finally:
+                await scheduler.aclose()
+
+            self.assertTrue(all(Path(path).read_bytes() == content for path in paths))
+            self.assertLessEqual(handler.max_active, 2)
+
+    async def test_small_file_is_not_split_in_auto_mode(self):
+        content = b"x" * 1024
+
+        with TemporaryDirectory() as tmp, range_server(content=content) as (url, handler):
+            await download(url, Path(tmp) / "a.bin", connections="auto")
+
+            self.assertEqual(handler.requests, [("GET", "bytes=0-")])
+
+
+class SinkDownloadTest(unittest.IsolatedAsyncioTestCase):
+    async def test_multipart_download_into_memory(self):
+        content = bytes(range(251)) * 40
+
+        with TemporaryDirectory() as tmp, range_server(content=content) as (url, _):
+            sink = MemorySink()
+            name = await download(
+                url, Path(tmp) / "a.bin", connections=4, min_split_size=1024, chunk_size=512, sink=sink
+            )
+
+            self.assertEqual(name, "file.bin")
+            self.assertEqual(sink.data, content)
+            self.assertEqual(sink.getbuffer().read(), content)
+            self.assertEqual(list(Path(tmp).iterdir()), [])
+
+    async def test_declared_size_over_limit_is_rejected_without_retry(self):
+        with range_server(content=b"x" * 4096) as (url, handler):
+            with self.assertRaises(SinkError):
+                await download(url, sink=MemorySink(max_size=1024), max_retries=3)
+
+            self.assertEqual(len(handler.requests), 1)
+
+    async def test_parse_result_download_to_memory(self):
+        content = b"\x89PNG\r\n\x1a\n" + b"\0\0\0\rIHDR" + (3).to_bytes(4, "big") + (2).to_bytes(4, "big") + b"\0" * 20
+
+        threads: list[str] = []
+        original = MediaInfoReader.read_bytes
+
+        def read_bytes(data: bytes):
+            threads.append(threading.current_thread().name)
+            return original(data)
+
+        with (
+            TemporaryDirectory() as tmp,
+            range_server(content=content) as (url, _),
+            patch.object(MediaInfoReader, "read_bytes", side_effect=read_bytes),
+        ):
+            result = ImageParseResult(title="memory", photo=[ImageRef(url=url)])
+            downloaded = await result.download(tmp, sink=lambda _: MemorySink())
+
+            # 宽高在下载流程中已经在线程池中读取
+            self.assertEqual(len(threads), 1)
+            self.assertNotEqual(threads[0], threading.current_thread().name)
+            assert isinstance(downloaded.media, list)
+            media = downloaded.media[0]
+            self.assertEqual(media.data, content)
+            self.assertTrue(media.exists())
+            self.assertEqual((media.width, media.height), (3, 2))
+            self.assertEqual(list(Path(tmp).iterdir()), [])
+            downloaded.delete()
+
+    async def test_stream_sink_yields_content_in_order(self):
+        content = bytes(range(251)) * 40
+
+        with range_server(content=content) as (url, handler):
+            sink = StreamSink(max_buffer=1024)
+            task = asyncio.create_task(download(url, sink=sink, connections=4, min_split_size=1024, chunk_size=256))
+            received = [chunk async for chunk in sink]
+            await task
+
+            self.assertEqual(b"".join(received), content)
+            self.assertEqual(await sink.info(), ("file.bin", len(content)))
+            # 不支持随机写入, 只使用第一个请求
+            self.assertEqual(handler.requests, [("GET", "bytes=0-")])
+
+    async def test_download_error_is_raised_to_consumer(self):
+        with range_server(content=b"data", fail_all=True) as (url, _):
+            sink = StreamSink()
+            task = asyncio.create_task(download(url, sink=sink, max_retries=0))
+
+            with self.assertRaisesRegex(DownloadError, "HTTP错误: 500"):
+                async for _ in sink:
+                    pass
+            with self.assertRaises(DownloadError):
+                await task
+
+
+class MediaStoreDownloadTest(unittest.IsolatedAsyncioTestCase):
+    async def test_repeated_download_is_served_from_store(self):
+        content = bytes(range(251)) * 40
+
+        with TemporaryDirectory() as tmp, range_server(content=content) as (url, handler):
+            GlobalConfig.media_store = MediaStore(Path(tmp) / "store")
+            try:
+                result = ImageParseResult(title="store", photo=[ImageRef(url=url)])
+                first = await result.download(Path(tmp) / "out")
+                requests = len(handler.requests)
+                second = await result.download(Path(tmp) / "out")
+            finally:
+                GlobalConfig.media_store = None
+
+            assert isinstance(first.media, list) and isinstance(second.media, list)
+            self.assertNotEqual(first.output_dir, second.output_dir)
+            self.assertEqual(Path(second.media[0].path).read_bytes(), content)
+            self.assertEqual(len(handler.requests), requests)
+
+    async def test_concurrent_downloads_of_same_url_hit_cdn_once(self):
+        content = bytes(range(251)) * 40
+
+        with TemporaryDirectory() as tmp, range_server(content=content, chunk_delay=0.01) as (url, handler):
+            GlobalConfig.media_store = MediaStore(Path(tmp) / "store")
+            try:
+                result = ImageParseResult(title="store", photo=[ImageRef(url=url)])
+                downloads = await asyncio.gather(*(result.download(Path(tmp) / "out", connections=1) for _ in range(3)))
+            finally:
+                GlobalConfig.media_store = None
+
+            self.assertEqual(len(handler.requests), 1)
+            for downloaded in downloads:
+                assert isinstance(downloaded.media, list)
+                self.assertEqual(Path(downloaded.media[0].path).read_bytes(), content)
+
+
+class LivePhotoDownloadTest(unittest.IsolatedAsyncioTestCase):
+    async def test_image_and_video_are_downloaded_concurrently(self):
+        content = b"x" * 64 * 1024
+
+        with TemporaryDirectory() as tmp, range_server(content=content, chunk_delay=0.05) as (url, handler):
+            photo = LivePhotoRef(url=f"{url}?image", video_url=f"{url}?video")
+            result = ImageParseResult(title="live", photo=[photo])
+            downloaded = await result.download(tmp, connections=1)
+
+            assert isinstance(downloaded.media, list)
+            media = downloaded.media[0]
+            assert isinstance(media, LivePhotoFile) and media.video_path
+            self.assertEqual(Path(media.path).read_bytes(), content)
+            self.assertEqual(Path(media.video_path).read_bytes(), content)
+            self.assertEqual(handler.max_active, 2)
+
+    async def test_failed_image_cancels_video_and_cleans_up(self):
+        with (
+            TemporaryDirectory() as tmp,
+            range_server(content=b"x" * 1024, fail_all=True, fail_status=404) as (bad_url, _),
+            range_server(content=b"x" * 64 * 1024, chunk_delay=0.2) as (video_url, _),
+        ):
+            result = ImageParseResult(title="live", photo=[LivePhotoRef(url=bad_url, video_url=video_url)])
+
+            with self.assertRaises(DownloadError):
+                await result.download(tmp, connections=1)
+
+            self.assertEqual(list(Path(tmp).iterdir()), [])
+
+
+class ThumbnailDownloadTest(unittest.IsolatedAsyncioTestCase):
+    async def test_thumb_variant_skips_originals(self):
+        with (
+            TemporaryDirectory() as tmp,
+            range_server(content=b"thumb") as (thumb_url, _),
+            range_server(content=b"video") as (video_url, video_handler),
+        ):
+            result = MultimediaParseResult(
+                title="post",
+                media=[
+                    VideoRef(url=video_url, thumb_url=thumb_url),
+                    ImageRef(url=thumb_url),
+                    VideoRef(url=video_url),
+                ],
+            )
+            downloaded = await result.download(tmp, variant="thumb")
+
+            assert isinstance(downloaded.media, list)
+            self.assertEqual(
+                [Path(m.path).name for m in downloaded.media], ["001_post_thumb.jpg", "002_post_thumb.jpg"]
+            )
+            self.assertTrue(all(Path(m.path).read_bytes() == b"thumb" for m in downloaded.media))
+            self.assertEqual(video_handler.requests, [])
+
+    async def test_preview_returns_thumbs_before_originals(self):
+        video = b"v" * 64 * 1024
+
+        with (
+            TemporaryDirectory() as tmp,
+            range_server(content=b"thumb") as (thumb_url, _),
+            range_server(content=video, chunk_delay=0.2) as (video_url, _),
+        ):
+            result = MultimediaParseResult(title="post", media=[VideoRef(url=video_url, thumb_url=thumb_url)])
+            preview = await result.download(tmp, connections=1, variant="preview")
+
+            assert isinstance(preview.media, list) and preview.originals
+            self.assertFalse(preview.originals.done())
+            self.assertEqual(Path(preview.media[0].path).read_bytes(), b"thumb")
+
+            originals = await preview.originals
+            assert isinstance(originals.media, list)
+            original = originals.media[0]
+            assert isinstance(original, VideoFile)
+            self.assertEqual(Path(original.path).read_bytes(), video)
+            self.assertEqual(originals.output_dir, preview.output_dir)
+
+            preview.delete()
+            self.assertFalse(preview.output_dir.exists())
+
+
+class YtDirectDownloadTest(unittest.IsolatedAsyncioTestCase):
+    def test_only_single_http_format_is_direct(self):
+        progressive = {"url": "https://cdn.example.com/v.mp4", "protocol": "https", "ext": "mp4"}
+
+        self.assertIs(_direct_format(progressive), progressive)
+        self.assertIsNone(_direct_format({**progressive, "protocol": "m3u8_native"}))
+        self.assertIsNone(_direct_format({"requested_formats": [progressive, progressive]}))
+        self.assertIsNone(_direct_format({**progressive, "downloader_options": {"http_chunk_size": 10485760}}))
+
+    async def test_progressive_format_is_downloaded_natively(self):
+        content = bytes(range(256)) * 4096
+
+        with TemporaryDirectory() as tmp, range_server(content=content) as (url, handler):
+            info = {"url": url, "protocol": "http", "ext": "mp4", "http_headers": {"User-Agent": "format-ua"}}
+            result = YtVideoParseResult(
+                dl=YtVideoInfo(title="t", description="", thumbnail="", url=url, info_json=info),
+                title="t",
+                video=VideoRef(url=url),
+            )
+            progress: list[tuple[int, int, str]] = []
+
+            async def callback(current: int, total: int, unit: str) -> None:
+                progress.append((current, total, unit))
+
+            downloaded = await result.download(tmp, callback=callback)
+
+            self.assertEqual(Path(downloaded.media.path).read_bytes(), content)
+            self.assertTrue(downloaded.media.path.endswith(".mp4"))
+            self.assertEqual(set(handler.user_agents), {"format-ua"})
+            self.assertEqual(progress[-1], (len(content), len(content), "bytes"))
+
+
+class SchedulerDownloadTest(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_downloads_respect_per_host_limit(self):
+        content = bytes(range(251)) * 400
+        scheduler = DownloadScheduler(max_connections_per_host=2)
+
+        with TemporaryDirectory() as tmp, range_server(content=content) as (url, handler):
+            try:
+                paths = await asyncio.gather(
+                    *(
+                        download(url, Path(tmp) / f"{i}.bin", connections=1, chunk_size=1024, scheduler=scheduler)
+                        for i in range(6)
+                    )
+                )
+            finally:
+                await scheduler.aclose()
+
+            self.assertTrue(all(Path(path).read_bytes() == content for path in paths))
+            self.assertLessEqual(handler.max_active, 2)
+            self.assertEqual(len(handler.requests), 6)
+
+    async def test_saturated_host_does_not_deadlock_multipart_downloads(self):
+        content = bytes(range(251)) * 400
+        scheduler = DownloadScheduler(max_connections_per_host=2)
+
+        with TemporaryDirectory() as tmp, range_server(content=content) as (url, handler):
+            try:
+                # 每个下载都持有一个名额, 其余分片由已持有的名额依次下载
+                paths = await asyncio.wait_for(
+                    asyncio.gather(
+                        *(
+                            download(
+                                url,
+                                Path(tmp) / f"{i}.bin",
+                                connections=4,
+                                min_split_size=1024,
+                                chunk_size=1024,
+                                scheduler=scheduler,
+                            )
+                            for i in range(3)
+                        )
+                    ),
+                    timeout=10,
+                )
+            finally:
+                await scheduler.aclose()
+
+            self.assertTrue(all(Path(path).read_bytes() == content for path in paths))
+            self.assertLessEqual(handler.max_active, 2)
+            self.assertEqual((scheduler.active(), scheduler.active(url)), (0, 0))
+
+
+class DownloadInstrumentationTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.recorder = MetricsRecorder()
+        add_instrument(self.recorder)
+        self.addCleanup(remove_instrument, self.recorder)
+
+    def metrics(self, kind: str) -> dict[tuple[str, str], dict]:
+        return {(item["name"], item["labels"].get("outcome", "")): item for item in self.recorder.snapshot()[kind]}
+
+    async def test_bytes_and_download_span_are_recorded(self):
+        content = bytes(range(251)) * 20
+
+        with TemporaryDirectory() as tmp, range_server(content=content) as (url, _):
+            await download(url, Path(tmp) / "a.bin", connections=4, min_split_size=512)
+
+        counters, spans = self.metrics("counters"), self.metrics("spans")
+        self.assertEqual(counters[("download_bytes", "")]["value"], len(content))
+        self.assertEqual(counters[("download_bytes", "")]["labels"], {"host": "127.0.0.1"})
+        self.assertEqual(spans[("download", "ok")]["count"], 1)
+
+    async def test_file_retries_are_counted(self):
+        with TemporaryDirectory() as tmp, range_server(content=b"x", fail_all=True, fail_status=503) as (url, _):
+            with self.assertRaises(DownloadError):
+                await download(url, Path(tmp) / "a.bin", connections=1, max_retries=1)
+
+        counters, spans = self.metrics("counters"), self.metrics("spans")
+        self.assertEqual(counters[("download_retries", "")]["labels"], {"host": "127.0.0.1", "scope": "file"})
+        self.assertEqual(counters[("download_retries", "")]["value"], 1)
+        self.assertEqual(spans[("download", "error")]["count"], 1)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,149 @@
+import contextlib
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote
+
+import httpx
+
+from parsehub.provider_api.pipix import Pipix
+from parsehub.provider_api.tiktok import TikTokWebCrawler
+from parsehub.utils.embedded_state import extract_embedded_json, fetch_until_script, find_script_text
+
+
+class EmbeddedStateTest(unittest.TestCase):
+    def test_extract_embedded_json_from_bytes_with_js_literals(self):
+        state = '{"note":{"title":"undefined 不应被替换","desc":undefined,"list":[undefined,1]}}'
+        page = f"<html><script>var a = 1;</script><script>window.__INITIAL_STATE__={state}</script></html>".encode()
+
+        data = extract_embedded_json(page, "window.__INITIAL_STATE__=")
+
+        self.assertEqual(data, {"note": {"title": "undefined 不应被替换", "desc": None, "list": [None, 1]}})
+
+    def test_extract_embedded_json_stops_at_end_of_object(self):
+        page = 'window.__APOLLO_STATE__ = {"a": {"b": "}"}};(function(){var x = {"c": 1};})()</script>'
+
+        self.assertEqual(extract_embedded_json(page, "window.__APOLLO_STATE__"), {"a": {"b": "}"}})
+
+    def test_extract_embedded_json_returns_none_without_marker(self):
+        self.assertIsNone(extract_embedded_json(b"<html></html>", "window.__INITIAL_STATE__="))
+
+    def test_extract_embedded_json_allows_control_characters_when_not_strict(self):
+        page = 'window.INIT_STATE = {"caption": "line\nbreak"}</script>'
+
+        with self.assertRaises(json.JSONDecodeError):
+            extract_embedded_json(page, "window.INIT_STATE")
+        self.assertEqual(extract_embedded_json(page, "window.INIT_STATE", strict=False), {"caption": "line\nbreak"})
+
+    def test_find_script_text_returns_tag_content(self):
+        page = b'<script id="RENDER_DATA" type="application/json">%7B%22a%22%3A1%7D</script>'
+
+        self.assertEqual(find_script_text(page, 'id="RENDER_DATA"'), "%7B%22a%22%3A1%7D")
+        self.assertIsNone(find_script_text(page, 'id="MISSING"'))
+
+    def test_tiktok_universal_data_is_extracted_from_raw_bytes(self):
+        payload = {"__DEFAULT_SCOPE__": {"webapp.video-detail": {"itemInfo": {"itemStruct": {"id": "1"}}}}}
+        page = (
+            f'<script id="__UNIVERSAL_DATA_FOR_REHYDRATION__" type="application/json">{json.dumps(payload)}</script>'
+        ).encode()
+
+        self.assertEqual(TikTokWebCrawler._search_universal_data(page), payload["__DEFAULT_SCOPE__"])
+
+    def test_tiktok_universal_data_ignores_quotes_and_attribute_order(self):
+        payload = {"__DEFAULT_SCOPE__": {"webapp.user-detail": {"userInfo": {}}}}
+        data = json.dumps(payload)
+        # 正文中出现的同名文本不是目标标签
+        prefix = '<script>document.getElementById("__UNIVERSAL_DATA_FOR_REHYDRATION__")</script>'
+        tags = [
+            "<script id='__UNIVERSAL_DATA_FOR_REHYDRATION__' type='application/json'>",
+            '<SCRIPT type="application/json" id=__UNIVERSAL_DATA_FOR_REHYDRATION__>',
+        ]
+        for tag in tags:
+            with self.subTest(tag=tag):
+                page = f"{prefix}{tag}{data}</script>".encode()
+                self.assertEqual(TikTokWebCrawler._search_universal_data(page), payload["__DEFAULT_SCOPE__"])
+
+    def test_pipix_render_data_ignores_quotes(self):
+        item = {"item_type": 1, "content": "内容", "cover": {"download_list": [{"url": "https://p/1.jpg"}]}}
+        data = quote(json.dumps({"ppxItemDetail": {"item": item}}))
+        prefix = '<script>var key = "RENDER_DATA";</script>'
+        tags = [
+            '<script id="RENDER_DATA" type="application/json">',
+            "<script id='RENDER_DATA' type='application/json'>",
+            "<script type=application/json id=RENDER_DATA>",
+        ]
+        for tag in tags:
+            with self.subTest(tag=tag):
+                post = Pipix._parse_data(f"{prefix}{tag}{data}</script>".encode())
+                self.assertEqual(post.content, "内容")
+                self.assertEqual(post.img_url, ["https://p/1.jpg"])
+
+
+@contextlib.contextmanager
+def page_server(page: bytes, chunk_size: int = 1024):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args: object) -> None:
+            return
+
+        def do_GET(self) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(page)))
+            self.end_headers()
+            # 客户端提前断开时写入会失败
+            with contextlib.suppress(ConnectionError):
+                for i in range(0, len(page), chunk_size):
+                    self.wfile.write(page[i : i + chunk_size])
+                    self.wfile.flush()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/page"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
+
+
+class FetchUntilScriptTest(unittest.IsolatedAsyncioTestCase):
+    async def test_stops_after_target_script_is_captured(self):
+        state = json.dumps({"note": {"title": "标题" * 500}}, ensure_ascii=False)
+        page = f"<html><script>window.__INITIAL_STATE__={state}</script>{'<div></div>' * 400_000}</html>".encode()
+
+        with page_server(page) as url:
+            async with httpx.AsyncClient() as client:
+                result = await fetch_until_script(client, url, ["window.__INITIAL_STATE__="])
+
+        self.assertFalse(result.complete)
+        self.assertLess(result.bytes_read, len(page) // 2)
+        self.assertEqual(result.bytes_saved, len(page) - result.bytes_read)
+        self.assertEqual(extract_embedded_json(result.content, "window.__INITIAL_STATE__="), json.loads(state))
+
+    async def test_script_tag_markers_skip_matches_outside_the_tag(self):
+        head = '<script>var id = "RENDER_DATA";</script>' + "<div></div>" * 1000
+        page = f"<html>{head}<script id='RENDER_DATA'>{{\"a\":1}}</script>{'<div></div>' * 400_000}</html>".encode()
+
+        with page_server(page) as url:
+            async with httpx.AsyncClient() as client:
+                result = await fetch_until_script(client, url, ["RENDER_DATA"], script_tag=True)
+
+        self.assertFalse(result.complete)
+        self.assertEqual(find_script_text(result.content, "RENDER_DATA"), '{"a":1}')
+
+    async def test_reads_whole_page_when_marker_is_missing(self):
+        page = b"<html>" + b"<div></div>" * 10_000 + b"</html>"
+
+        with page_server(page) as url:
+            async with httpx.AsyncClient() as client:
+                result = await fetch_until_script(client, url, ["window.INIT_STATE", "window.__APOLLO_STATE__"])
+
+        self.assertTrue(result.complete)
+        self.assertEqual(result.content, page)
+        self.assertEqual(result.bytes_saved, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
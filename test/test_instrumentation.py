@@ -0,0 +1,139 @@
+import contextlib
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from parsehub.parsers.base.base import BaseParser
+from parsehub.types import ImageParseResult
+from parsehub.types.platform import Platform
+from parsehub.utils import instrumentation
+from parsehub.utils.instrumentation import (
+    HTTPX_EVENT_HOOKS,
+    MetricsRecorder,
+    add_instrument,
+    count,
+    remove_instrument,
+    span,
+)
+
+
+class RedirectHandler(BaseHTTPRequestHandler):
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+    def do_GET(self) -> None:
+        if self.path.startswith("/short"):
+            self.send_response(302)
+            self.send_header("Location", "/short/hop" if self.path == "/short" else "/post/1?from=share")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+@contextlib.contextmanager
+def redirect_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RedirectHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
+
+
+class FakeParser(BaseParser, register=False):
+    __platform__ = Platform.WEIXIN
+    __redirect_keywords__ = ["/short"]
+
+    async def _do_parse(self, raw_url: str) -> ImageParseResult:
+        return ImageParseResult(title=raw_url)
+
+
+class MetricsRecorderTest(unittest.TestCase):
+    def setUp(self):
+        self.recorder = MetricsRecorder()
+        add_instrument(self.recorder)
+        self.addCleanup(remove_instrument, self.recorder)
+
+    def test_exporters(self):
+        count("download_bytes", 100, host="a.com")
+        count("download_bytes", 28, host="a.com")
+        with span("sign", platform='x"y'):
+            pass
+        with self.assertRaises(ValueError), span("sign", platform='x"y'):
+            raise ValueError
+
+        text = self.recorder.prometheus()
+        self.assertIn("# TYPE parsehub_download_bytes_total counter", text)
+        self.assertIn('parsehub_download_bytes_total{host="a.com"} 128', text)
+        self.assertIn("# TYPE parsehub_sign_seconds summary", text)
+        self.assertIn('parsehub_sign_seconds_count{outcome="ok",platform="x\\"y"} 1', text)
+        self.assertIn('parsehub_sign_seconds_count{outcome="error",platform="x\\"y"} 1', text)
+
+        data = json.loads(self.recorder.json())
+        self.assertEqual(data["counters"], [{"name": "download_bytes", "labels": {"host": "a.com"}, "value": 128}])
+        self.assertEqual([item["count"] for item in data["spans"]], [1, 1])
+
+    def test_span_as_decorator(self):
+        @span("sign", cpu=True, platform="demo")
+        def work() -> int:
+            return sum(range(10000))
+
+        self.assertEqual(work(), 49995000)
+        self.assertEqual(work(), 49995000)
+        (item,) = self.recorder.snapshot()["spans"]
+        self.assertEqual((item["count"], item["labels"]), (2, {"outcome": "ok", "platform": "demo"}))
+
+    def test_nothing_is_recorded_without_instruments(self):
+        remove_instrument(self.recorder)
+        with span("sign"):
+            count("download_bytes", 1)
+        self.assertFalse(instrumentation.enabled())
+        self.assertEqual(self.recorder.prometheus(), "")
+
+
+class ParserInstrumentationTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.recorder = MetricsRecorder()
+        add_instrument(self.recorder)
+        self.addCleanup(remove_instrument, self.recorder)
+        self.addCleanup(BaseParser._redirect_cache.clear)
+
+    async def test_parse_stages_and_redirect_are_recorded(self):
+        with redirect_server() as base:
+            result = await FakeParser().parse(f"{base}/short")
+
+        self.assertEqual(result.title, f"{base}/post/1")
+        spans = {(item["name"], item["labels"].get("stage")): item for item in self.recorder.snapshot()["spans"]}
+        for stage in ("raw_url", "parse", "clean"):
+            self.assertEqual(spans["parse_stage", stage]["labels"]["platform"], "weixin")
+        self.assertEqual(spans["redirect", None]["labels"], {"host": "127.0.0.1", "outcome": "ok"})
+        self.assertGreaterEqual(spans["parse_stage", "raw_url"]["sum"], spans["redirect", None]["sum"])
+
+        counters = [(item["name"], item["labels"], item["value"]) for item in self.recorder.snapshot()["counters"]]
+        self.assertIn(("redirect_hops", {"host": "127.0.0.1"}, 2), counters)
+        self.assertIn(("provider_requests", {"host": "127.0.0.1", "status": "302"}, 2), counters)
+        self.assertIn(("provider_requests", {"host": "127.0.0.1", "status": "200"}, 1), counters)
+
+    async def test_httpx_hooks_record_status_per_host(self):
+        with redirect_server() as base:
+            async with httpx.AsyncClient(event_hooks=HTTPX_EVENT_HOOKS) as client:
+                await client.get(f"{base}/post/1")
+                await client.get(f"{base}/short")
+
+        counters = {
+            item["labels"]["status"]: item["value"]
+            for item in self.recorder.snapshot()["counters"]
+            if item["name"] == "provider_requests"
+        }
+        self.assertEqual(counters, {"200": 1, "302": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import asyncio
+import contextlib
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from parsehub.provider_api import kuaishou
+from parsehub.provider_api.kuaishou import KuaishouParser
+
+VALID_PAGE = '<script>window.__APOLLO_STATE__={"defaultClient":{"VisionVideoSetRepresentation:1":{"url":"u"}}}</script>'
+BLOCKED_PAGE = '{"result": 2}'
+
+
+class FakeKuaishouParser(KuaishouParser):
+    """按 (路由 URL, User-Agent) 返回预设的页面和延迟"""
+
+    pages: dict[tuple[str, str], tuple[float, str | None]] = {}
+    calls: list[tuple[str, str]] = []
+
+    async def _fetch_html_with_headers(self, url, headers):
+        key = (url, headers["User-Agent"])
+        self.calls.append(key)
+        delay, page = self.pages.get(key, (0, None))
+        await asyncio.sleep(delay)
+        return page
+
+
+class KuaishouHedgeTest(unittest.IsolatedAsyncioTestCase):
+    url = "https://www.kuaishou.com/short-video/abc"
+    fw_url = "https://v.m.chenzhongtech.com/fw/photo/abc"
+
+    def setUp(self):
+        kuaishou._ROUTE_WINNERS.clear()
+        FakeKuaishouParser.calls = []
+        self.full_ua = KuaishouParser(self.url).headers["User-Agent"]
+
+    async def test_slow_route_is_hedged_and_winner_remembered(self):
+        FakeKuaishouParser.pages = {
+            (self.url, self.full_ua): (5, VALID_PAGE),
+            (self.url, "Mozilla/5.0"): (0, BLOCKED_PAGE),
+            (self.fw_url, self.full_ua): (0.01, VALID_PAGE),
+        }
+
+        with mock.patch.object(kuaishou, "HEDGE_DELAY", 0.05):
+            start = time.monotonic()
+            parser = await FakeKuaishouParser.create(self.url)
+
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(parser.page_type, "VIDEO")
+        self.assertEqual(parser.real_url, self.fw_url)
+        self.assertEqual(kuaishou._ROUTE_WINNERS.get("www.kuaishou.com"), ("fw", "full"))
+
+        # 下一次直接从上次成功的组合开始
+        FakeKuaishouParser.calls = []
+        await FakeKuaishouParser.create(self.url)
+        self.assertEqual(FakeKuaishouParser.calls[0], (self.fw_url, self.full_ua))
+
+    async def test_all_routes_failing_leaves_unknown_state(self):
+        FakeKuaishouParser.pages = {}
+
+        parser = await FakeKuaishouParser.create(self.url)
+
+        self.assertEqual(parser.page_type, "UNKNOWN")
+        self.assertEqual(len(FakeKuaishouParser.calls), 4)
+        self.assertIsNone(kuaishou._ROUTE_WINNERS.get("www.kuaishou.com"))
+
+
+@contextlib.contextmanager
+def page_server(page: bytes):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args: object) -> None:
+            return
+
+        def do_GET(self) -> None:
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(page)))
+            self.end_headers()
+            with contextlib.suppress(ConnectionError):
+                for i in range(0, len(page), 1024):
+                    self.wfile.write(page[i : i + 1024])
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/short-video/abc"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
+
+
+class KuaishouFetchTest(unittest.IsolatedAsyncioTestCase):
+    async def test_apollo_state_after_init_state_is_read_completely(self):
+        apollo = '{"defaultClient":{"VisionVideoSetRepresentation:1":{"url":"' + "u" * 200_000 + '"}}}'
+        page = (
+            '<script>window.INIT_STATE = {"fallback": 1}</script>'
+            + "<div></div>" * 1000
+            + f"<script>window.__APOLLO_STATE__={apollo}</script>"
+            + "<div></div>" * 100_000
+        ).encode()
+
+        with page_server(page) as url:
+            parser = KuaishouParser(url)
+            content = await parser._fetch_html_with_headers(url, parser.headers)
+
+        self.assertLess(len(content), len(page))
+        page_type, data = KuaishouParser._identify_and_parse_data(content)
+        self.assertEqual(page_type, "VIDEO")
+        self.assertEqual(len(data["defaultClient"]["VisionVideoSetRepresentation:1"]["url"]), 200_000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import asyncio
+import unittest
+
+import httpx
+
+from parsehub import ParseHub
+from parsehub.utils.helpers import LoopRunner, run_sync
+from parsehub.utils.loop_clients import LoopClients, aclose_loop_clients
+
+
+def _clients() -> LoopClients:
+    return LoopClients(lambda proxy: httpx.AsyncClient(proxy=proxy))
+
+
+class LoopClientsTest(unittest.IsolatedAsyncioTestCase):
+    async def test_clients_are_shared_per_proxy(self):
+        clients = _clients()
+        try:
+            self.assertIs(clients.get(), clients.get(None))
+            self.assertIsNot(clients.get(), clients.get("http://127.0.0.1:1"))
+        finally:
+            await clients.aclose()
+
+    async def test_closed_client_is_recreated(self):
+        clients = _clients()
+        client = clients.get()
+        await client.aclose()
+
+        self.assertIsNot(clients.get(), client)
+        await clients.aclose()
+
+    async def test_aclose_loop_clients_closes_every_registry(self):
+        first, second = _clients(), _clients()
+        clients = [first.get(), second.get(), second.get("http://127.0.0.1:1")]
+
+        await ParseHub(runner=LoopRunner()).aclose()
+
+        self.assertTrue(all(client.is_closed for client in clients))
+        self.assertFalse(first._clients)
+        self.assertFalse(second._clients)
+
+    async def test_other_loops_are_not_affected(self):
+        clients = _clients()
+        runner = LoopRunner()
+        try:
+
+            async def get() -> httpx.AsyncClient:
+                return clients.get()
+
+            other = runner.run(get())
+            await aclose_loop_clients()
+            self.assertFalse(other.is_closed)
+        finally:
+            runner.close()
+
+
+class LoopShutdownTest(unittest.TestCase):
+    def test_runner_close_closes_clients(self):
+        clients = _clients()
+
+        async def get() -> httpx.AsyncClient:
+            return clients.get()
+
+        runner = LoopRunner()
+        client = runner.run(get())
+        runner.close()
+
+        self.assertTrue(client.is_closed)
+        self.assertFalse(clients._clients)
+
+    def test_temporary_loop_closes_clients(self):
+        clients = _clients()
+
+        async def get() -> httpx.AsyncClient:
+            await asyncio.sleep(0)
+            return clients.get()
+
+        client = run_sync(get())
+
+        self.assertTrue(client.is_closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import copy
+import pickle
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from parsehub.types import DownloadResult, ImageFile, LivePhotoFile, VideoFile
+from parsehub.utils.media_info import MediaHeaderProbe, MediaInfo, MediaInfoReader
+
+
+class MediaHeaderProbeTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_probe_reads_image_headers(self):
+        image = Image.new("RGB", (123, 77))
+        for name, kwargs in {
+            "a.png": {},
+            "a.jpg": {},
+            "a.webp": {},
+            "lossless.webp": {"lossless": True},
+        }.items():
+            with self.subTest(name=name):
+                path = self.tmp / name
+                image.save(path, **kwargs)
+
+                self.assertEqual(MediaHeaderProbe.probe(path), MediaInfo(width=123, height=77))
+
+    def test_probe_sums_gif_frame_delays_like_pillow(self):
+        path = self.tmp / "a.gif"
+        frames = [Image.new("RGB", (50, 40), (i * 10, 0, 0)) for i in range(25)]
+        frames[0].save(path, save_all=True, append_images=frames[1:], duration=[100 + i * 10 for i in range(25)])
+
+        self.assertEqual(MediaHeaderProbe.probe(path), MediaInfoReader.read_gif(path))
+        self.assertEqual(MediaHeaderProbe.probe(path), MediaInfo(width=50, height=40, duration=6))
+
+    def test_probe_reads_video_container_headers(self):
+        for name, fourcc in {"a.mp4": "mp4v", "a.mkv": "XVID"}.items():
+            with self.subTest(name=name):
+                path = self.tmp / name
+                writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*fourcc), 25, (320, 240))
+                for i in range(130):
+                    writer.write(np.full((240, 320, 3), i, np.uint8))
+                writer.release()
+
+                self.assertEqual(MediaHeaderProbe.probe(path), MediaInfo(width=320, height=240, duration=6))
+
+    def test_probe_returns_none_for_truncated_or_unknown_files(self):
+        gif = self.tmp / "broken.gif"
+        Image.new("RGB", (10, 10)).save(gif)
+        gif.write_bytes(gif.read_bytes()[:30])
+        unknown = self.tmp / "unknown.bin"
+        unknown.write_bytes(b"not a media file")
+
+        self.assertIsNone(MediaHeaderProbe.probe(gif))
+        self.assertIsNone(MediaHeaderProbe.probe(unknown))
+
+    def test_probe_does_not_raise_on_truncated_headers(self):
+        webp_lossless = b"RIFF\x00\x00\x00\x00WEBPVP8L\x00\x00\x00\x00"
+        gif_extension = b"GIF89a\x01\x00\x01\x00\x00\x00\x00!\xf9"
+        self.assertIsNone(MediaHeaderProbe.probe_bytes(webp_lossless))
+        self.assertIsNone(MediaHeaderProbe.probe_bytes(gif_extension))
+
+        image = Image.new("RGB", (30, 20))
+        files = []
+        for name, kwargs in {"a.png": {}, "a.jpg": {}, "a.webp": {}, "b.webp": {"lossless": True}}.items():
+            image.save(self.tmp / name, **kwargs)
+            files.append(self.tmp / name)
+        frames = [Image.new("RGB", (30, 20), (i * 50, 0, 0)) for i in range(3)]
+        frames[0].save(self.tmp / "a.gif", save_all=True, append_images=frames[1:], duration=100)
+        files.append(self.tmp / "a.gif")
+        writer = cv2.VideoWriter(str(self.tmp / "a.mp4"), cv2.VideoWriter_fourcc(*"mp4v"), 25, (32, 24))
+        writer.write(np.zeros((24, 32, 3), np.uint8))
+        writer.release()
+        files.append(self.tmp / "a.mp4")
+
+        for path in files:
+            data = path.read_bytes()
+            truncated = self.tmp / f"truncated{path.suffix}"
+            with self.subTest(name=path.name):
+                for end in range(len(data)):
+                    MediaHeaderProbe.probe_bytes(data[:end])
+                    truncated.write_bytes(data[:end])
+                    MediaHeaderProbe.probe(truncated)
+
+    def test_read_falls_back_when_header_is_not_recognized(self):
+        path = self.tmp / "a.bmp"
+        Image.new("RGB", (31, 17)).save(path)
+
+        self.assertIsNone(MediaHeaderProbe.probe(path))
+        self.assertEqual(MediaInfoReader.read(path), MediaInfo(width=31, height=17))
+
+
+class LazyMediaFileTest(unittest.IsolatedAsyncioTestCase):
+    async def test_media_file_does_not_read_file_until_accessed(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "a.png"
+
+            image = ImageFile(path=path)
+            Image.new("RGB", (64, 48)).save(path)
+
+            self.assertEqual((image.width, image.height), (64, 48))
+
+    async def test_known_dimensions_skip_probe(self):
+        video = VideoFile(path="/nonexistent/video.mp4", width=1920, height=1080, duration=30)
+
+        self.assertEqual((video.width, video.height, video.duration), (1920, 1080, 30))
+
+    async def test_download_result_probe_resolves_in_thread_pool(self):
+        with TemporaryDirectory() as tmp:
+            gif = Path(tmp) / "a.gif"
+            frames = [Image.new("RGB", (20, 10), (i, 0, 0)) for i in range(3)]
+            frames[0].save(gif, save_all=True, append_images=frames[1:], duration=500)
+            live = LivePhotoFile(path=Path(tmp) / "a.jpg", video_path=gif)
+            image = ImageFile(path=gif)
+
+            with patch.object(MediaInfoReader, "read", wraps=MediaInfoReader.read) as read:
+                result = await DownloadResult([live, image], tmp).probe()
+                self.assertEqual(read.call_count, 2)
+                self.assertEqual((live.width, live.height, live.duration), (20, 10, 2))
+                self.assertEqual((image.width, image.height), (20, 10))
+                self.assertEqual(read.call_count, 2)
+
+            self.assertIs(result.media[0], live)
+
+    async def test_repr_compare_and_copy_do_not_probe(self):
+        with patch.object(MediaInfoReader, "read") as read:
+            video = VideoFile(path="/nonexistent/video.mp4")
+            other = VideoFile(path="/nonexistent/video.mp4")
+
+            self.assertEqual(repr(video), "VideoFile(path='/nonexistent/video.mp4')")
+            self.assertEqual(video, other)
+            for clone in (copy.deepcopy(video), pickle.loads(pickle.dumps(video))):
+                self.assertEqual(clone, video)
+            read.assert_not_called()
+
+        known = ImageFile(path="/nonexistent/a.png", width=3, height=2)
+        clone = pickle.loads(pickle.dumps(known))
+        self.assertEqual((clone.width, clone.height), (3, 2))
+        self.assertIs(await clone.probe(), clone)
+
+
+if __name__ == "__main__":
+    unittest.main()
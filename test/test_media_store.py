@@ -0,0 +1,112 @@
+import asyncio
+import hashlib
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from parsehub.utils.media_store import MediaStore
+
+
+async def write_in_parts(store: MediaStore, url: str, save_path: Path, content: bytes, parts: int = 3) -> str:
+    """模拟分片下载: 后面的分片先写入"""
+    sink = store.sink(url, save_path)
+    await sink.open(save_path.name, len(content))
+    step = -(-len(content) // parts)
+    for start in reversed(range(0, len(content), step)):
+        async with sink.writer(start, buffer_size=0) as f:
+            for i in range(start, min(start + step, len(content)), 100):
+                await f.write(content[i : min(i + 100, start + step, len(content))])
+    return await sink.commit()
+
+
+class MediaStoreTest(unittest.IsolatedAsyncioTestCase):
+    async def test_hash_is_computed_across_out_of_order_parts(self):
+        content = os.urandom(5000)
+
+        with TemporaryDirectory() as tmp:
+            store = MediaStore(Path(tmp) / "store")
+            path = await write_in_parts(store, "https://cdn.example.com/a.jpg", Path(tmp) / "out" / "a.jpg", content)
+
+            self.assertEqual(Path(path).read_bytes(), content)
+            obj = store.lookup("https://CDN.example.com:443/a.jpg#frag")
+            assert obj is not None
+            self.assertEqual(obj.name, hashlib.sha256(content).hexdigest())
+            self.assertEqual(store.size, len(content))
+
+    async def test_hit_is_linked_into_target(self):
+        content = os.urandom(1000)
+
+        with TemporaryDirectory() as tmp:
+            store = MediaStore(Path(tmp) / "store")
+            await write_in_parts(store, "https://cdn.example.com/a.jpg?b=2&a=1", Path(tmp) / "1" / "a.jpg", content)
+
+            target = Path(tmp) / "2" / "a.jpg"
+            hit = await store.fetch("https://cdn.example.com/a.jpg?a=1&b=2", target)
+
+            self.assertEqual(hit, target)
+            self.assertEqual(target.read_bytes(), content)
+            self.assertIsNone(await store.fetch("https://cdn.example.com/b.jpg", Path(tmp) / "3" / "b.jpg"))
+
+    async def test_same_content_from_other_url_is_stored_once(self):
+        content = os.urandom(1000)
+
+        with TemporaryDirectory() as tmp:
+            store = MediaStore(Path(tmp) / "store")
+            await write_in_parts(store, "https://a.example.com/x.jpg", Path(tmp) / "1" / "x.jpg", content)
+            await write_in_parts(store, "https://b.example.com/y.jpg", Path(tmp) / "2" / "y.jpg", content)
+
+            self.assertEqual(store.lookup("https://a.example.com/x.jpg"), store.lookup("https://b.example.com/y.jpg"))
+            self.assertEqual(store.size, len(content))
+
+    async def test_least_recently_used_objects_are_evicted(self):
+        with TemporaryDirectory() as tmp:
+            store = MediaStore(Path(tmp) / "store", max_size=2500)
+            urls = [f"https://cdn.example.com/{i}.jpg" for i in range(3)]
+            for i, url in enumerate(urls[:2]):
+                await write_in_parts(store, url, Path(tmp) / "out" / f"{i}.jpg", os.urandom(1000))
+                obj = store.lookup(url)
+                assert obj is not None
+                os.utime(obj, (1000 + i, 1000 + i))
+
+            # 访问第一个文件后, 第二个文件成为最久未使用
+            self.assertIsNotNone(store.lookup(urls[0]))
+            await write_in_parts(store, urls[2], Path(tmp) / "out" / "2.jpg", os.urandom(1000))
+
+            self.assertIsNotNone(store.lookup(urls[0]))
+            self.assertIsNone(store.lookup(urls[1]))
+            self.assertIsNotNone(store.lookup(urls[2]))
+            self.assertEqual(store.size, 2000)
+
+    async def test_waiter_downloads_itself_when_first_download_fails(self):
+        url = "https://cdn.example.com/a.jpg"
+        content = os.urandom(1000)
+        calls: list[str] = []
+
+        with TemporaryDirectory() as tmp:
+            store = MediaStore(Path(tmp) / "store")
+
+            async def failing(sink) -> str:
+                calls.append("failing")
+                await asyncio.sleep(0.05)
+                raise OSError("CDN error")
+
+            async def working(sink) -> str:
+                calls.append("working")
+                target = Path(sink.save_path)
+                return await write_in_parts(store, url, target, content)
+
+            first, second = await asyncio.gather(
+                store.download(url, Path(tmp) / "1" / "a.jpg", failing),
+                store.download(url, Path(tmp) / "2" / "a.jpg", working),
+                return_exceptions=True,
+            )
+
+            self.assertIsInstance(first, OSError)
+            self.assertEqual(second, (str(Path(tmp) / "2" / "a.jpg"), False))
+            self.assertEqual(calls, ["failing", "working"])
+            self.assertEqual(store._inflight, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
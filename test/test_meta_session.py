@@ -0,0 +1,133 @@
+import asyncio
+import contextlib
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import ClassVar
+
+from parsehub.provider_api.instagram import InstagramAPI
+from parsehub.provider_api.meta import MetaSessionManager
+
+
+class MetaTestHandler(BaseHTTPRequestHandler):
+    bootstraps: ClassVar[int] = 0
+    token: ClassVar[str] = ""
+    lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+    def do_GET(self) -> None:
+        cls = self.__class__
+        with cls.lock:
+            cls.bootstraps += 1
+            cls.token = f"token{cls.bootstraps}"
+        self.send_response(200)
+        self.send_header("Set-Cookie", f"csrftoken={cls.token}; Path=/")
+        self.send_header("Set-Cookie", "mid=m1; Path=/")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.headers.get("x-csrftoken") != self.token:
+            body = b'{"message": "CSRF token missing or incorrect", "status": "fail"}'
+            self.send_response(403)
+        else:
+            media = {"shortcode": "abc", "__typename": "XDTGraphImage", "is_video": False, "display_url": "u"}
+            body = json.dumps({"data": {"xdt_shortcode_media": media}, "status": "ok"}).encode()
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@contextlib.contextmanager
+def meta_server():
+    class Handler(MetaTestHandler):
+        pass
+
+    Handler.bootstraps = 0
+    Handler.token = ""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/", Handler
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
+
+
+class MetaSessionManagerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_session_is_bootstrapped_once_and_shared(self):
+        with meta_server() as (url, handler):
+            manager = MetaSessionManager(url)
+            try:
+                results = await asyncio.gather(*(manager.cookies(base={"ig_pr": "1"}) for _ in range(5)))
+                again = await manager.cookies(base={"ig_pr": "1"})
+            finally:
+                await manager.aclose()
+
+        self.assertEqual(handler.bootstraps, 1)
+        self.assertEqual(again, {"ig_pr": "1", "csrftoken": "token1", "mid": "m1"})
+        self.assertTrue(all(result == again for result in results))
+
+    async def test_finished_bootstraps_are_not_kept(self):
+        with meta_server() as (url, handler):
+            manager = MetaSessionManager(url)
+            try:
+                for i in range(20):
+                    await manager.cookies(base={"sessionid": str(i)})
+                await manager.cookies(base={"sessionid": "0"}, refresh=True)
+                await asyncio.sleep(0)
+                self.assertEqual(manager._state().bootstraps, {})
+            finally:
+                await manager.aclose()
+
+        self.assertEqual(handler.bootstraps, 21)
+
+    async def test_sessions_are_keyed_by_cookie_identity(self):
+        with meta_server() as (url, handler):
+            manager = MetaSessionManager(url)
+            try:
+                anonymous = await manager.cookies(base={"sessionid": ""})
+                logged_in = await manager.cookies(base={"sessionid": "s"})
+                # 用户 Cookie 自带 csrftoken 时不访问首页
+                own = await manager.cookies(base={"sessionid": "t", "csrftoken": "own"})
+            finally:
+                await manager.aclose()
+
+        self.assertEqual(handler.bootstraps, 2)
+        self.assertEqual(anonymous["csrftoken"], "token1")
+        self.assertEqual(logged_in["csrftoken"], "token2")
+        self.assertEqual(own["csrftoken"], "own")
+
+
+class InstagramSessionTest(unittest.IsolatedAsyncioTestCase):
+    async def test_stale_token_is_refreshed_on_csrf_failure(self):
+        with meta_server() as (url, handler):
+
+            class API(InstagramAPI):
+                GRAPHQL_URL = f"{url}graphql/query"
+                SESSIONS = MetaSessionManager(url)
+
+            try:
+                await API().get_post("abc")
+                await API().get_post("abc")
+                self.assertEqual(handler.bootstraps, 1)
+
+                # 服务端轮换 token 后, 下一次请求返回 403 并重新获取
+                handler.token = "rotated"
+                post = await API().get_post("abc")
+            finally:
+                await API.SESSIONS.aclose()
+
+        self.assertEqual(post.shortcode, "abc")
+        self.assertEqual(handler.bootstraps, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
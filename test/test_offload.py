@@ -0,0 +1,61 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from parsehub.config import GlobalConfig
+from parsehub.provider_api.weixin import WX
+from parsehub.utils.offload import LoopLagMonitor, offload_stats, run_cpu_bound, shutdown_executors
+
+ARTICLE = '<h1 class="rich_media_title"> 标题 </h1><div class="rich_media_content"><p><strong>正文</strong></p></div>'
+
+
+def blocking_work(seconds: float) -> str:
+    time.sleep(seconds)
+    return threading.current_thread().name
+
+
+class RunCpuBoundTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.addCleanup(setattr, GlobalConfig, "cpu_offload", GlobalConfig.cpu_offload)
+        self.addCleanup(setattr, GlobalConfig, "cpu_offload_threshold", GlobalConfig.cpu_offload_threshold)
+        self.addCleanup(shutdown_executors)
+        GlobalConfig.cpu_offload = "thread"
+        GlobalConfig.cpu_offload_threshold = 1000
+        offload_stats(reset=True)
+
+    async def test_small_input_runs_inline(self):
+        thread = await run_cpu_bound(blocking_work, 0, size=999)
+
+        self.assertEqual(thread, threading.current_thread().name)
+        stats = offload_stats()
+        self.assertEqual((stats.inline_calls, stats.offloaded_calls), (1, 0))
+
+    async def test_large_input_does_not_block_loop(self):
+        async with LoopLagMonitor() as inline:
+            GlobalConfig.cpu_offload = None
+            await run_cpu_bound(blocking_work, 0.2, size=1000)
+        async with LoopLagMonitor() as offloaded:
+            GlobalConfig.cpu_offload = "thread"
+            thread = await run_cpu_bound(blocking_work, 0.2, size=1000)
+
+        self.assertTrue(thread.startswith("parsehub-cpu"))
+        self.assertGreater(inline.max_lag, 0.15)
+        self.assertLess(offloaded.max_lag, 0.1)
+        stats = offload_stats()
+        self.assertEqual((stats.inline_calls, stats.offloaded_calls), (1, 1))
+        self.assertGreater(stats.inline_max_seconds, 0.15)
+
+    async def test_process_pool_runs_converter(self):
+        GlobalConfig.cpu_offload = "process"
+        GlobalConfig.cpu_offload_threshold = 0
+
+        results = await asyncio.gather(*(run_cpu_bound(WX._parse_html, ARTICLE, size=len(ARTICLE)) for _ in range(2)))
+
+        for wx in results:
+            self.assertEqual((wx.title, wx.markdown_content.strip()), ("标题", "**正文**"))
+            self.assertEqual(wx.text_content.strip(), "正文")
+
+
+if __name__ == "__main__":
+    unittest.main()
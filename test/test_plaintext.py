@@ -0,0 +1,146 @@
+import random
+import unittest
+from unittest import mock
+
+from bs4 import BeautifulSoup
+from markdown import markdown
+from markdownify import MarkdownConverter
+
+from parsehub.provider_api.weixin import WXConverter
+from parsehub.types import RichTextParseResult
+from parsehub.utils import plaintext
+from parsehub.utils.plaintext import markdown_to_text
+
+SAMPLES = [
+    "",
+    "plain text",
+    "# 标题\n\n正文段落\n\n## 二级 ##\n\n正文",
+    "Setext\n======\n\n小标题\n---",
+    "* 一\n* 二\n\n1. 步骤一\n2. 步骤二\n   续行",
+    "* 松散列表\n\n* 第二项\n\n  嵌套段落\n\n    * 子列表",
+    "> 引用第一行  \n> 第二行\n>\n> > 嵌套引用",
+    "    缩进代码\n    第二行\n\n```\nfenced\n```",
+    "**粗体** *斜体* ***都有*** __下划线__ snake_case_name 5 \\* 3",
+    '[链接 **文字**](https://example.com "title") ![图片](https://i/1.jpg) <https://auto.link>',
+    "`code **not bold**` &amp; &lt;tag&gt; &copy; \\_escaped\\_ <span>html</span>",
+    "行尾两个空格  \n换行  \n   ![alt](https://i/2.jpg)图片后",
+    "---\n\n| A | B |\n| --- | --- |\n| 1 | 2 |",
+    "中文，**加粗。**紧跟文字 *强调*！emoji 😀 #话题#",
+    "**文字****！！** *文字**！*",
+    "[外层 [内层](https://a) 文字](https://b) *[[嵌套](https://a)](https://b)*",
+    "*斜体  \n*\n\n_  \n_\n\n`code`  \n# 标题",
+    '\t\n正文 &#65 &#1; &#X41; <tag>  <span a="1">x</span>',
+    "    \n> 空代码块",
+]
+
+WORDS = ["文字", "中文", "！！", "。", "，", "“引号”", "hello", "x_y", "foo*bar", "2*3", "*", "_", "**", " ", "  "]
+WORDS += ["1.", "(", ")", "[", "]", "#", "-", "+", ">", "&", "<", "😀", "\\", "&copy;", "&#65", "<tag>", "</b>"]
+INLINE_TAGS = ["b", "strong", "em", "i", "span", "a", "code", "img", "br", "del"]
+BLOCK_TAGS = ["p", "h2", "h3", "blockquote", "ul", "ol", "pre", "section", "div"]
+
+
+def random_inline(rng: random.Random, depth: int = 0) -> str:
+    parts = []
+    for _ in range(rng.randint(1, 4)):
+        tag = rng.choice(INLINE_TAGS)
+        if depth > 2 or rng.random() < 0.45:
+            words = "".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3)))
+            parts.append(words.replace("&", "&amp;").replace("<", "&lt;"))
+        elif tag == "img":
+            parts.append(f'<img src="https://i/{rng.randint(1, 9)}.jpg" alt="{rng.choice(["", "图"])}">')
+        elif tag == "br":
+            parts.append("<br>")
+        elif tag == "a":
+            parts.append(f'<a href="https://l/{rng.randint(1, 9)}">{random_inline(rng, depth + 1)}</a>')
+        else:
+            parts.append(f"<{tag}>{random_inline(rng, depth + 1)}</{tag}>")
+    return "".join(parts)
+
+
+def random_html(rng: random.Random) -> str:
+    blocks = []
+    for _ in range(rng.randint(2, 6)):
+        tag = rng.choice(BLOCK_TAGS)
+        if tag in ("ul", "ol"):
+            items = "".join(f"<li>{random_inline(rng)}</li>" for _ in range(rng.randint(1, 3)))
+            blocks.append(f"<{tag}>{items}</{tag}>")
+        elif tag == "pre":
+            blocks.append(f"<pre><code>{random_inline(rng, 3)}</code></pre>")
+        elif tag == "blockquote":
+            blocks.append(f"<blockquote><p>{random_inline(rng)}</p></blockquote>")
+        else:
+            blocks.append(f"<{tag}>{random_inline(rng)}</{tag}>")
+    return "".join(blocks)
+
+
+ARTICLE = """
+<div class="rich_media_content"><section>
+<h2><strong>小标题</strong></h2>
+<p><span>正文, 包含<strong>加粗</strong>、<em>斜体</em>和<a href="https://mp.weixin.qq.com/s/1">链接</a>。</span></p>
+<p><img class="rich_pages" data-src="https://mmbiz.qpic.cn/1.jpg"></p>
+<blockquote><p>引用<br>第二行 &amp; 特殊字符</p></blockquote>
+<ul><li><p>列表项 <code>inline_code()</code></p></li><li>第二项</li></ul>
+<pre><code>def main():
+    print("hello")</code></pre>
+</section></div>
+"""
+
+
+def legacy(markdown_content: str) -> str:
+    return "".join(BeautifulSoup(markdown(markdown_content), "lxml").find_all(string=True))
+
+
+class MarkdownToTextTest(unittest.TestCase):
+    def test_matches_rendered_html_text(self):
+        for sample in SAMPLES:
+            with self.subTest(sample=sample):
+                self.assertEqual(markdown_to_text(sample), legacy(sample))
+
+    def test_matches_converted_article(self):
+        markdown_content = WXConverter(heading_style="ATX").convert(ARTICLE)
+
+        text = markdown_to_text(markdown_content)
+
+        self.assertEqual(text, legacy(markdown_content))
+        self.assertIn("正文, 包含加粗、斜体和链接。", text)
+        self.assertNotIn("mmbiz", text)
+
+    def test_matches_markdownify_output(self):
+        converter = MarkdownConverter(heading_style="ATX")
+        rng = random.Random(48)
+        for i in range(400):
+            page = random_html(rng) if i % 4 else f"<p>{random_inline(rng)}</p>"
+            markdown_content = converter.convert(page)
+            with self.subTest(page=page):
+                self.assertEqual(markdown_to_text(markdown_content), legacy(markdown_content))
+
+    def test_falls_back_to_rendered_html_for_raw_html(self):
+        for sample in [
+            "<div>\n块级 HTML\n</div>\n\n正文",
+            "a </b>  <i>b",
+            "注释 <!-- c --> 之后",
+            "<a title='x>y'>z</a>",
+        ]:
+            with (
+                self.subTest(sample=sample),
+                mock.patch.object(plaintext, "_render_html", wraps=plaintext._render_html) as render,
+            ):
+                self.assertEqual(markdown_to_text(sample), legacy(sample))
+                render.assert_called_once()
+
+
+class PlaintextContentCacheTest(unittest.TestCase):
+    def test_conversion_is_cached_until_markdown_changes(self):
+        with mock.patch("parsehub.types.result.markdown_to_text", wraps=plaintext.markdown_to_text) as convert:
+            result = RichTextParseResult(title="t", markdown_content="**旧**正文")
+            self.assertEqual(result.content, "旧正文")
+            self.assertEqual(result.plaintext_content, "旧正文")
+            self.assertEqual(convert.call_count, 1)
+
+            result.markdown_content = "# 新正文"
+            self.assertEqual(result.plaintext_content, "新正文")
+            self.assertEqual(convert.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import asyncio
+import unittest
+
+from parsehub.utils.progress import ProgressAggregator
+
+
+class ProgressAggregatorTest(unittest.IsolatedAsyncioTestCase):
+    async def test_updates_within_interval_are_coalesced_and_final_value_is_sent(self):
+        calls: list[tuple[int, int, str]] = []
+
+        async def callback(current: int, total: int, unit: str) -> None:
+            calls.append((current, total, unit))
+
+        aggregator = ProgressAggregator(callback, args=("bytes",), min_interval=60)
+        for current in range(1, 1001):
+            aggregator.update(current, 1000)
+            await asyncio.sleep(0)
+        await aggregator.finish()
+
+        self.assertEqual(calls, [(1, 1000, "bytes"), (1000, 1000, "bytes")])
+
+    async def test_min_delta_skips_small_changes(self):
+        calls: list[int] = []
+
+        async def callback(current: int, total: int) -> None:
+            calls.append(current)
+
+        aggregator = ProgressAggregator(callback, min_interval=0, min_delta=10)
+        for current in range(1, 36):
+            aggregator.update(current, 35)
+            await asyncio.sleep(0)
+        await aggregator.finish()
+
+        self.assertEqual(calls, [1, 11, 21, 31, 35])
+
+    async def test_slow_callback_does_not_block_updates(self):
+        calls: list[int] = []
+        release = asyncio.Event()
+
+        async def callback(current: int, total: int) -> None:
+            calls.append(current)
+            await release.wait()
+
+        aggregator = ProgressAggregator(callback, min_interval=0)
+        aggregator.update(1, 100)
+        await asyncio.sleep(0)
+        for current in range(2, 101):
+            aggregator.update(current, 100)
+        release.set()
+        await aggregator.finish()
+
+        self.assertEqual(calls, [1, 100])
+
+    async def test_callback_error_is_raised_on_finish(self):
+        async def callback(current: int, total: int) -> None:
+            raise ValueError("callback failed")
+
+        aggregator = ProgressAggregator(callback)
+        aggregator.update(1, 2)
+
+        with self.assertRaisesRegex(ValueError, "callback failed"):
+            await aggregator.finish()
+
+    async def test_finish_does_not_repeat_last_value(self):
+        calls: list[int] = []
+
+        async def callback(current: int, total: int) -> None:
+            calls.append(current)
+
+        aggregator = ProgressAggregator(callback)
+        aggregator.update(5, 5)
+        await aggregator.finish(5, 5)
+
+        self.assertEqual(calls, [5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import asyncio
+import time
+import unittest
+
+from parsehub.config import GlobalConfig
+from parsehub.utils.ratelimit import RateLimit, TokenBucket, effective_rate, rate_limit_for
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_burst_is_free_then_debt_is_waited(self):
+        bucket = TokenBucket(1000, burst=500)
+
+        self.assertEqual(bucket.reserve(500), 0)
+        self.assertAlmostEqual(bucket.reserve(250), 0.25, delta=0.01)
+        # 等待时间按扣除顺序累加
+        self.assertAlmostEqual(bucket.reserve(250), 0.5, delta=0.01)
+
+
+class RateLimitTest(unittest.IsolatedAsyncioTestCase):
+    async def test_downloads_share_bandwidth_fairly(self):
+        shared = TokenBucket(200_000, burst=1)
+        received = {"multi": 0, "single": 0}
+
+        async def connection(limit: RateLimit, name: str) -> None:
+            while True:
+                await limit.consume(1000)
+                received[name] += 1000
+
+        multi, single = RateLimit([shared]), RateLimit([shared])
+        # multi 有 4 个连接, single 只有 1 个, 两者仍应平分带宽
+        tasks = [asyncio.create_task(connection(multi, "multi")) for _ in range(4)]
+        tasks.append(asyncio.create_task(connection(single, "single")))
+        await asyncio.sleep(0.3)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        total = received["multi"] + received["single"]
+        self.assertLess(total, 200_000 * 0.3 * 1.5)
+        self.assertAlmostEqual(received["multi"] / total, 0.5, delta=0.1)
+
+    async def test_slowest_bucket_wins(self):
+        limit = RateLimit([TokenBucket(1_000_000, burst=1), TokenBucket(10_000, burst=1)])
+
+        start = time.monotonic()
+        for _ in range(3):
+            await limit.consume(1000)
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.25)
+
+
+class RateLimitConfigTest(unittest.TestCase):
+    def tearDown(self):
+        GlobalConfig.download_rate_limit = None
+        GlobalConfig.proxy_rate_limits = {}
+
+    def test_global_and_proxy_limits_are_shared(self):
+        GlobalConfig.download_rate_limit = 1_000_000
+        GlobalConfig.proxy_rate_limits = {"http://proxy:8080": 500_000}
+
+        first = rate_limit_for("http://proxy:8080", 100_000)
+        second = rate_limit_for("http://proxy:8080")
+
+        self.assertEqual(len(first.buckets), 3)
+        self.assertEqual(first.buckets[:2], second.buckets)
+        self.assertEqual(len(rate_limit_for().buckets), 1)
+        GlobalConfig.download_rate_limit = None
+        self.assertFalse(rate_limit_for())
+
+    def test_effective_rate_for_external_downloader(self):
+        GlobalConfig.download_rate_limit = 1_000_000
+        GlobalConfig.proxy_rate_limits = {"http://proxy:8080": 500_000}
+
+        self.assertEqual(effective_rate(), 1_000_000)
+        self.assertEqual(effective_rate("http://proxy:8080"), 500_000)
+        self.assertEqual(effective_rate("http://proxy:8080", 100_000), 100_000)
+        GlobalConfig.download_rate_limit = None
+        GlobalConfig.proxy_rate_limits = {}
+        self.assertIsNone(effective_rate())
+
+
+if __name__ == "__main__":
+    unittest.main()
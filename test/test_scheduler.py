@@ -0,0 +1,81 @@
+import asyncio
+import unittest
+
+from parsehub.utils.scheduler import DownloadPriority, DownloadScheduler
+
+
+class DownloadSchedulerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_waiters_are_served_by_priority(self):
+        scheduler = DownloadScheduler(max_connections=1)
+        order: list[str] = []
+        release = asyncio.Event()
+
+        async def job(name: str, url: str, priority: int) -> None:
+            async with scheduler.connection(url, priority):
+                order.append(name)
+                await release.wait()
+
+        holder = asyncio.create_task(job("holder", "https://a.example.com/0", DownloadPriority.DEFAULT))
+        await asyncio.sleep(0)
+        video = asyncio.create_task(job("video", "https://b.example.com/1.mp4", DownloadPriority.VIDEO))
+        await asyncio.sleep(0)
+        image = asyncio.create_task(job("image", "https://c.example.com/2.jpg", DownloadPriority.IMAGE))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(holder, video, image)
+
+        self.assertEqual(order, ["holder", "image", "video"])
+
+    async def test_per_host_limit_does_not_block_other_hosts(self):
+        scheduler = DownloadScheduler(max_connections=10, max_connections_per_host=2)
+        release = asyncio.Event()
+
+        async def job(url: str) -> None:
+            async with scheduler.connection(url):
+                await release.wait()
+
+        tasks = [asyncio.create_task(job("https://a.example.com/x")) for _ in range(4)]
+        tasks.append(asyncio.create_task(job("https://b.example.com/x")))
+        await asyncio.sleep(0.01)
+
+        self.assertEqual(scheduler.active("https://a.example.com/y"), 2)
+        self.assertEqual(scheduler.active("https://b.example.com/y"), 1)
+        self.assertEqual(scheduler.active(), 3)
+
+        release.set()
+        await asyncio.gather(*tasks)
+        self.assertEqual(scheduler.active(), 0)
+
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        scheduler = DownloadScheduler(max_connections=1)
+        release = asyncio.Event()
+
+        async def job() -> None:
+            async with scheduler.connection("https://a.example.com/x"):
+                await release.wait()
+
+        holder = asyncio.create_task(job())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(job())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        release.set()
+        await holder
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+
+        self.assertEqual(scheduler.active(), 0)
+        async with scheduler.connection("https://a.example.com/x"):
+            self.assertEqual(scheduler.active(), 1)
+
+    async def test_client_is_shared_per_proxy(self):
+        scheduler = DownloadScheduler()
+        try:
+            self.assertIs(scheduler.client(), scheduler.client(None))
+            self.assertIsNot(scheduler.client(), scheduler.client("http://127.0.0.1:1"))
+        finally:
+            await scheduler.aclose()
+
+
+if __name__ == "__main__":
+    unittest.main()
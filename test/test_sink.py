@@ -0,0 +1,41 @@
+import asyncio
+import unittest
+
+from parsehub.errors import SinkError
+from parsehub.types import MemorySink, StreamSink
+
+
+class MemorySinkTest(unittest.IsolatedAsyncioTestCase):
+    async def test_written_size_over_limit_is_rejected(self):
+        sink = MemorySink(max_size=8)
+        await sink.open("a.bin", None)
+
+        with self.assertRaises(SinkError):
+            async with sink.writer(0) as f:
+                await f.write(b"x" * 6)
+                await f.write(b"x" * 6)
+
+
+class StreamSinkTest(unittest.IsolatedAsyncioTestCase):
+    async def test_buffer_limit_applies_backpressure(self):
+        sink = StreamSink(max_buffer=10)
+        await sink.open(None, None)
+
+        async def produce() -> None:
+            async with sink.writer() as f:
+                for _ in range(5):
+                    await f.write(b"x" * 6)
+            await sink.commit()
+
+        task = asyncio.create_task(produce())
+        await asyncio.sleep(0.05)
+        self.assertFalse(task.done())
+        self.assertLessEqual(sink._buffered, 10)
+
+        received = b"".join([chunk async for chunk in sink])
+        await task
+        self.assertEqual(received, b"x" * 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import contextlib
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import ClassVar
+from urllib.parse import parse_qs
+
+from parsehub.provider_api.tieba import TieBa
+from parsehub.utils.cache import TTLCache
+
+
+class TiebaHandler(BaseHTTPRequestHandler):
+    tbs_requests: ClassVar[int] = 0
+    valid_tbs: ClassVar[str] = ""
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+    def do_GET(self) -> None:
+        cls = self.__class__
+        cls.tbs_requests += 1
+        cls.valid_tbs = f"tbs{cls.tbs_requests}"
+        self._send({"tbs": cls.valid_tbs, "is_login": 0})
+
+    def do_POST(self) -> None:
+        form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        if form["tbs"][0] != self.valid_tbs:
+            self._send({"error_code": 220034, "error_msg": "tbs check fail"})
+        else:
+            self._send({"error_code": 0, "error_msg": "", "kz": form["kz"][0]})
+
+    def _send(self, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@contextlib.contextmanager
+def tieba_server():
+    class Handler(TiebaHandler):
+        pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    class LocalTieBa(TieBa):
+        TBS_URL = f"{base}/dc/common/tbs"
+        PAGE_URL = f"{base}/c/f/pb/page_pc"
+        _tbs_cache = TTLCache(maxsize=8, ttl=60)
+
+    try:
+        yield LocalTieBa, Handler
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
+
+
+class TieBaTbsTest(unittest.IsolatedAsyncioTestCase):
+    async def test_tbs_is_cached_between_posts(self):
+        with tieba_server() as (api, handler):
+            first = await api().fetch_post_data("https://tieba.baidu.com/p/1")
+            second = await api().fetch_post_data("https://tieba.baidu.com/p/2")
+
+        self.assertEqual(handler.tbs_requests, 1)
+        self.assertEqual((first["kz"], second["kz"]), ("1", "2"))
+
+    async def test_stale_tbs_is_refreshed_once(self):
+        with tieba_server() as (api, handler):
+            await api().fetch_post_data("https://tieba.baidu.com/p/1")
+            handler.valid_tbs = "rotated"
+
+            result = await api().fetch_post_data("https://tieba.baidu.com/p/3")
+
+        self.assertEqual(handler.tbs_requests, 2)
+        self.assertEqual(result["kz"], "3")
+
+
+if __name__ == "__main__":
+    unittest.main()
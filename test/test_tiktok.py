@@ -0,0 +1,117 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+from parsehub.provider_api import tiktok
+from parsehub.provider_api.tiktok import PathStats, TikTokWebCrawler
+
+URL = "https://www.tiktok.com/@user/video/123"
+
+
+class FakeCrawler(TikTokWebCrawler):
+    def __init__(self, *, feed_delay: float, feed_ok: bool = True, **kwargs):
+        super().__init__(**kwargs)
+        self.feed_delay = feed_delay
+        self.feed_ok = feed_ok
+        self.web_calls = 0
+
+    async def fetch_one_video(self, aweme_id):
+        await asyncio.sleep(self.feed_delay)
+        if not self.feed_ok:
+            raise RuntimeError("feed down")
+        return {"aweme_id": aweme_id, "source": "feed"}
+
+    async def fetch_video_from_web(self, url_or_text, expected_aweme_id=None):
+        self.web_calls += 1
+        await asyncio.sleep(0.01)
+        return {"aweme_id": expected_aweme_id, "source": "web"}
+
+
+class TikTokHedgeTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(tiktok, "_PATH_STATS", PathStats())
+        self.stats = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_web_path_wins_when_feed_is_slow(self):
+        crawler = FakeCrawler(feed_delay=5, hedge_delay=0.05)
+
+        start = time.monotonic()
+        item = await crawler.parse(URL)
+
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(item, {"aweme_id": "123", "source": "web"})
+        self.assertLess(self.stats.success_rate["feed"], 1.0)
+        self.assertEqual(self.stats.success_rate["web"], 1.0)
+
+    async def test_slow_feed_losing_to_web_shortens_next_delay(self):
+        crawler = FakeCrawler(feed_delay=5, hedge_delay=1)
+
+        start = time.monotonic()
+        await crawler.parse(URL)
+        first = time.monotonic() - start
+        start = time.monotonic()
+        item = await crawler.parse(URL)
+        second = time.monotonic() - start
+
+        # 第一次输给 web 记为 feed 失败, 第二次更早启动 web
+        self.assertEqual(item["source"], "web")
+        self.assertAlmostEqual(self.stats.hedge_delay(1), 0.64)
+        self.assertLess(second, first - 0.1)
+
+    async def test_fast_feed_does_not_start_web(self):
+        crawler = FakeCrawler(feed_delay=0, hedge_delay=0.5)
+
+        item = await crawler.parse(URL)
+
+        self.assertEqual(item["source"], "feed")
+        self.assertEqual(crawler.web_calls, 0)
+
+    async def test_failed_feed_starts_web_immediately_and_lowers_delay(self):
+        crawler = FakeCrawler(feed_delay=0, feed_ok=False, hedge_delay=5)
+
+        start = time.monotonic()
+        item = await crawler.parse(URL)
+
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(item["source"], "web")
+        self.assertLess(self.stats.hedge_delay(1), 1)
+
+    async def test_without_hedge_delay_web_runs_after_feed(self):
+        crawler = FakeCrawler(feed_delay=0, feed_ok=False)
+
+        item = await crawler.parse(URL)
+
+        self.assertEqual(item["source"], "web")
+        self.assertEqual(crawler.web_calls, 1)
+
+
+class PathStatsTest(unittest.TestCase):
+    def test_delay_follows_success_rates(self):
+        stats = PathStats(alpha=0.5)
+        self.assertEqual(stats.hedge_delay(1), 1)
+
+        stats.record("feed", False, 1)
+        self.assertAlmostEqual(stats.hedge_delay(1), 0.5)
+
+        for _ in range(10):
+            stats.record("web", False, 1)
+        self.assertEqual(stats.hedge_delay(1), 2)
+
+    def test_delay_follows_feed_latency(self):
+        stats = PathStats(alpha=0.5)
+
+        stats.record("feed", True, 0.1)
+        self.assertAlmostEqual(stats.hedge_delay(1), 0.25)
+
+        stats.record("feed", True, 0.7)
+        self.assertAlmostEqual(stats.hedge_delay(1), 0.8)
+
+        for _ in range(10):
+            stats.record("feed", True, 10)
+        self.assertEqual(stats.hedge_delay(1), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import asyncio
+import contextlib
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import ClassVar
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+from parsehub.parsers.parser.twitter import TwitterParser
+from parsehub.provider_api import twitter
+from parsehub.provider_api.twitter import Twitter
+from parsehub.types import ParseError
+
+
+def tweet_result(tweet_id: str) -> dict:
+    if tweet_id == "404":
+        return {}
+    return {"result": {"rest_id": tweet_id, "legacy": {"full_text": f"text {tweet_id}", "entities": {}}}}
+
+
+class TweetHandler(BaseHTTPRequestHandler):
+    requested: ClassVar[list[list[str]]] = []
+    active: ClassVar[int] = 0
+    max_active: ClassVar[int] = 0
+    batch_status: ClassVar[int] = 200
+    lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        variables = json.loads(parse_qs(url.query)["variables"][0])
+        batch = url.path.endswith("/batch")
+        ids = variables["tweetIds"] if batch else [variables["tweetId"]]
+        cls = self.__class__
+        with cls.lock:
+            cls.requested.append(ids)
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        time.sleep(0.05)
+        with cls.lock:
+            cls.active -= 1
+        if batch and cls.batch_status != 200:
+            self.send_error(cls.batch_status)
+            return
+        results = [tweet_result(tweet_id) for tweet_id in ids]
+        body = json.dumps({"data": {"tweetResult": results if batch else results[0]}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@contextlib.contextmanager
+def tweet_server(batch_status: int = 200):
+    class Handler(TweetHandler):
+        pass
+
+    Handler.requested = []
+    Handler.active = Handler.max_active = 0
+    Handler.batch_status = batch_status
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_port}/graphql"
+    try:
+        with (
+            mock.patch.object(twitter, "TWEET_RESULT_URL", f"{base}/single"),
+            mock.patch.object(twitter, "TWEET_RESULTS_URL", f"{base}/batch"),
+        ):
+            yield Handler
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
+
+
+class FetchTweetTest(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_fetches_are_batched(self):
+        ids = [str(i) for i in range(10)]
+        with tweet_server() as handler:
+            tweets = await asyncio.gather(*(Twitter().fetch_tweet(f"https://x.com/u/status/{i}") for i in ids))
+
+        self.assertEqual(handler.requested, [ids])
+        self.assertEqual([tweet.full_text for tweet in tweets], [f"text {i}" for i in ids])
+
+    async def test_batches_are_limited_in_size_and_concurrency(self):
+        ids = [str(i) for i in range(30)]
+        with tweet_server() as handler, mock.patch.object(twitter, "MAX_BATCH_SIZE", 4):
+            tweets = await Twitter().fetch_tweets(ids)
+
+        self.assertEqual([len(batch) for batch in handler.requested], [4, 4, 4, 4, 4, 4, 4, 2])
+        self.assertLessEqual(handler.max_active, twitter.MAX_CONCURRENCY)
+        self.assertEqual(list(tweets), ids)
+
+    async def test_batch_is_deduplicated_and_demultiplexed(self):
+        with tweet_server() as handler:
+            tweets = await Twitter().fetch_tweets(["1", "2", "404", "1"])
+
+        self.assertEqual(handler.requested, [["1", "2", "404"]])
+        self.assertEqual(list(tweets), ["1", "2", "404"])
+        first, second = tweets["1"], tweets["2"]
+        assert not isinstance(first, Exception) and not isinstance(second, Exception)
+        self.assertEqual(first.full_text, "text 1")
+        self.assertEqual(second.full_text, "text 2")
+        self.assertIsInstance(tweets["404"], ParseError)
+
+    async def test_single_tweet_uses_single_endpoint(self):
+        with tweet_server() as handler:
+            tweet = await Twitter().fetch_tweet("https://x.com/user/status/7")
+
+        self.assertEqual(handler.requested, [["7"]])
+        self.assertEqual(tweet.full_text, "text 7")
+
+    async def test_missing_tweet_raises(self):
+        with tweet_server(), self.assertRaises(ParseError):
+            await Twitter().fetch_tweet("https://x.com/user/status/404")
+
+    async def test_unavailable_batch_endpoint_falls_back_to_single_requests(self):
+        with tweet_server(batch_status=404) as handler:
+            first = await Twitter().fetch_tweets(["1", "2"])
+            second = await Twitter().fetch_tweets(["3", "4"])
+
+        self.assertEqual(handler.requested[0], ["1", "2"])
+        # 批量接口失效后不再尝试
+        self.assertEqual(sorted(handler.requested[1:]), [["1"], ["2"], ["3"], ["4"]])
+        self.assertFalse(any(isinstance(tweet, Exception) for tweet in [*first.values(), *second.values()]))
+
+    async def test_concurrent_callers_share_inflight_request(self):
+        with tweet_server() as handler:
+            url = "https://x.com/user/status/7"
+            tweets = await asyncio.gather(*(Twitter().fetch_tweet(url) for _ in range(3)))
+
+        self.assertEqual(handler.requested, [["7"]])
+        self.assertTrue(all(tweet.full_text == "text 7" for tweet in tweets))
+
+
+class TwitterParserBatchTest(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_parses_share_one_request(self):
+        urls = [f"https://x.com/user/status/{i}" for i in range(5)]
+        with tweet_server() as handler:
+            results = await asyncio.gather(*(TwitterParser()._do_parse(url) for url in urls))
+
+        self.assertEqual(handler.requested, [[str(i) for i in range(5)]])
+        self.assertEqual([result.content for result in results], [f"text {i}" for i in range(5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
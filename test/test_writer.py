@@ -0,0 +1,82 @@
+import asyncio
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from parsehub.utils import writer
+from parsehub.utils.writer import BufferedFileWriter, preallocate, write_at
+
+
+class BufferedFileWriterTest(unittest.IsolatedAsyncioTestCase):
+    async def test_small_chunks_are_flushed_in_buffers(self):
+        chunks = [bytes([i % 256]) * 100 for i in range(500)]
+
+        with TemporaryDirectory() as tmp, patch.object(writer, "write_at", wraps=write_at) as spy:
+            path = Path(tmp) / "a.bin"
+            async with BufferedFileWriter(path, buffer_size=10_000) as f:
+                for chunk in chunks:
+                    await f.write(chunk)
+
+            self.assertEqual(path.read_bytes(), b"".join(chunks))
+            self.assertEqual(spy.call_count, 5)
+
+    async def test_concurrent_writers_fill_their_own_ranges(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "a.bin"
+            path.write_bytes(b"\0" * 3000)
+
+            async def fill(index: int) -> None:
+                async with BufferedFileWriter(path, offset=index * 1000, buffer_size=64, truncate=False) as f:
+                    for _ in range(100):
+                        await f.write(str(index).encode() * 10)
+                        await asyncio.sleep(0)
+
+            await asyncio.gather(*(fill(i) for i in range(3)))
+
+            self.assertEqual(path.read_bytes(), b"0" * 1000 + b"1" * 1000 + b"2" * 1000)
+
+    async def test_preallocated_file_is_filled_without_truncation(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "a.bin"
+            await preallocate(path, 3000)
+            self.assertEqual(path.stat().st_size, 3000)
+
+            async with BufferedFileWriter(path, offset=1000, truncate=False) as f:
+                await f.write(b"x" * 2000)
+            async with BufferedFileWriter(path, truncate=False) as f:
+                await f.write(b"y" * 1000)
+
+            self.assertEqual(path.read_bytes(), b"y" * 1000 + b"x" * 2000)
+
+    async def test_write_error_is_raised(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "a.bin"
+            with patch.object(writer, "write_at", side_effect=OSError("disk full")):
+                with self.assertRaisesRegex(OSError, "disk full"):
+                    async with BufferedFileWriter(path, buffer_size=0) as f:
+                        await f.write(b"data")
+
+
+class WriteAtTest(unittest.TestCase):
+    def test_partial_writes_are_resumed(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "a.bin"
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT)
+            real_pwritev = os.pwritev
+
+            def short_pwritev(fd: int, buffers: list, offset: int) -> int:
+                return real_pwritev(fd, [buffers[0][:3]], offset)
+
+            try:
+                with patch("os.pwritev", side_effect=short_pwritev):
+                    write_at(fd, [b"hello", b" ", b"world"], 2)
+            finally:
+                os.close(fd)
+
+            self.assertEqual(path.read_bytes(), b"\0\0hello world")
+
+
+if __name__ == "__main__":
+    unittest.main()